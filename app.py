@@ -10,18 +10,35 @@ and financial information using Flask and Yahoo Finance API.
 та фінансової інформації за допомогою Flask та Yahoo Finance API.
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, render_template, jsonify, request
 import pandas as pd
 import numpy as np
-import yfinance as yf
-import plotly
-import plotly.express as px
-import json
 import logging
 import traceback
 import datetime
-import random
-import requests
+import time
+import zlib
+import os
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import TTLCache, make_key
+from ohlcv_store import OHLCVStore, bars_to_frame, period_start, period_covering, slice_frame
+from downsample import RESAMPLE_INTERVALS, downsample_ohlc, downsample_trend, resample_ohlc
+from indicators import IndicatorEngine
+from streaming import QuoteHub, DemoQuoteSource, frame_quote
+from upstream import Upstream, CircuitBreaker
+from fixtures import StaticFixtures, DEFAULT_FIXTURE
+from instrumentation import Registry, PROMETHEUS_MIMETYPE
+from prefetch import PrefetchScheduler, RequestTracker, parse_watchlist
+from portfolio import AlignedPrices, portfolio_report
+from export import EXPORT_FORMATS, export_available, make_writer
+from screener import HISTORY_PERIOD, LOOKBACK, ScreenerIndex, parse_filter, parse_sort
+from serialization import (FORMATS, JSON_MIMETYPE, ARROW_MIMETYPE, MIN_COMPRESS_SIZE,
+                           COMPRESSIBLE_MIMETYPES, format_dates, frame_to_columns, frame_etag, dumps_json,
+                           arrow_available, frame_to_arrow, choose_encoding, compress_body)
 
 # Configure logging
 # Налаштування логування
@@ -29,9 +46,169 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+# Routes live on a blueprint registered by create_app()
+# Маршрути знаходяться в blueprint, який реєструє create_app()
+bp = Blueprint('dashboard', __name__)
+
+# Instance folder for on-disk data, independent of any app object
+# Папка екземпляра для дискових даних, незалежна від об'єкта застосунку
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+def yahoo_download(*args, **kwargs):
+    """
+    Call yfinance.download, importing yfinance on first use.
+    Keeps the import (and requests/curl_cffi behind it) out of worker startup.
+    
+    Викликає yfinance.download, імпортуючи yfinance при першому використанні.
+    Виключає цей імпорт (та requests/curl_cffi за ним) із запуску воркера.
+    """
+    import yfinance as yf
+    return yf.download(*args, **kwargs)
+
+# Upstream downloader; replaceable with a fake in tests
+# Завантажувач даних; може бути замінений на фейковий у тестах
+downloader = yahoo_download
+
+# Guarded upstream access: per-call deadline, bounded pool, circuit breaker
+# Захищений доступ до джерела: крайній термін, обмежений пул, запобіжник
+upstream = Upstream(
+    lambda *args, **kwargs: downloader(*args, **kwargs),
+    timeout=float(os.environ.get('UPSTREAM_TIMEOUT', 10)),
+    max_workers=int(os.environ.get('UPSTREAM_MAX_WORKERS', 8)),
+    max_pending=int(os.environ.get('UPSTREAM_MAX_PENDING', 16)),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get('BREAKER_FAILURES', 5)),
+        reset_timeout=float(os.environ.get('BREAKER_RESET_SECONDS', 30))
+    )
+)
+
+# Persistent on-disk OHLCV store shared by all workers
+# Постійне дискове сховище OHLCV, спільне для всіх воркерів
+ohlcv_store = OHLCVStore(
+    os.environ.get('OHLCV_STORE_DIR', os.path.join(INSTANCE_PATH, 'ohlcv')),
+    fetch=upstream.call,
+    min_refresh=float(os.environ.get('OHLCV_REFRESH_SECONDS', 60))
+)
+
+# Shared cache for upstream stock data
+# Спільний кеш для даних акцій з зовнішнього джерела
+stock_cache = TTLCache(
+    maxsize=int(os.environ.get('STOCK_CACHE_SIZE', 256)),
+    ttl=float(os.environ.get('STOCK_CACHE_TTL', 60)),
+    stale_ttl=float(os.environ.get('STOCK_CACHE_STALE_TTL', 300))
+)
+
+# Request metrics exposed at /metrics. Each gunicorn worker keeps its own
+# registry, so every sample carries the worker's pid; sum over workers with
+# sum without (worker) (...)
+# Метрики запитів, доступні за адресою /metrics. Кожен воркер gunicorn має
+# власний реєстр, тому кожне значення містить pid воркера; сума за воркерами:
+# sum without (worker) (...)
+metrics = Registry(labels=lambda: {'worker': os.getpid()})
+stage_seconds = metrics.histogram(
+    'stock_data_stage_seconds', 'Time spent in each stage of serving stock data, by endpoint',
+    ('endpoint', 'stage'))
+source_total = metrics.counter(
+    'stock_data_source_total', 'Stock data loads by endpoint and data source', ('endpoint', 'source'))
+fallback_total = metrics.counter(
+    'stock_data_fallback_total', 'Fallbacks to static data by endpoint and reason', ('endpoint', 'reason'))
+request_seconds = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint',))
+requests_total = metrics.counter(
+    'http_requests_total', 'HTTP requests by endpoint and status', ('endpoint', 'status'))
+metrics.callback('stock_cache_events_total', 'Stock cache lookups and loads by outcome',
+                 lambda: {(key,): value for key, value in stock_cache.stats().items()
+                          if key in ('hits', 'stale_hits', 'misses', 'evictions', 'load_errors', 'stale_on_error')},
+                 ('event',), kind='counter')
+metrics.callback('stock_cache_entries', 'Entries in the stock cache', lambda: len(stock_cache))
+metrics.callback('screener_symbols', 'Symbols in the live screener index', lambda: len(screener_index))
+metrics.callback('upstream_calls_total', 'Upstream calls by outcome',
+                 lambda: {(key,): value for key, value in upstream.stats().items()
+                          if key in ('calls', 'successes', 'failures', 'timeouts', 'busy')},
+                 ('outcome',), kind='counter')
+metrics.callback('upstream_in_flight', 'Upstream calls currently running', lambda: upstream.stats()['in_flight'])
+metrics.callback('upstream_breaker_open', 'Whether the upstream circuit breaker rejects calls (1) or not (0)',
+                 lambda: upstream.breaker.stats()['state'] == CircuitBreaker.OPEN)
+
+# Endpoint that data loads running outside the request thread are attributed to
+# Ендпоінт, якому приписуються завантаження даних поза потоком запиту
+load_endpoint = contextvars.ContextVar('load_endpoint', default=None)
+
+def metric_endpoint():
+    """
+    Endpoint label for stage and source metrics: the endpoint the current
+    load runs for, or 'background' for prefetch and cache refreshes.
+    
+    Мітка ендпоінту для метрик етапів і джерел: ендпоінт, для якого виконується
+    поточне завантаження, або 'background' для попереднього завантаження та оновлень кешу.
+    """
+    endpoint = load_endpoint.get()
+    if endpoint is None and has_request_context():
+        endpoint = request.endpoint
+    return endpoint or 'background'
+
+def for_endpoint(func):
+    """
+    Wrap ``func`` so metrics it records in executor threads, or after the
+    request context is gone (streamed exports), keep the current endpoint label.
+    
+    Обгортає ``func``, щоб метрики, записані нею в потоках виконавця або після
+    завершення контексту запиту (потокові експорти), зберігали мітку поточного ендпоінту.
+    """
+    endpoint = metric_endpoint()
+    
+    def run(*args):
+        token = load_endpoint.set(endpoint)
+        try:
+            return func(*args)
+        finally:
+            load_endpoint.reset(token)
+    return run
+
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@bp.after_app_request
+def record_request_metrics(response):
+    """
+    Record request latency; registered first so it runs after compression.
+    
+    Записує затримку запиту; зареєстровано першим, тому виконується після стиснення.
+    """
+    started = g.pop('request_started', None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unknown'
+        request_seconds.observe(elapsed, endpoint=endpoint)
+        requests_total.inc(endpoint=endpoint, status=response.status_code)
+        if endpoint == 'dashboard.stock_data':
+            stage_seconds.observe(elapsed, endpoint=endpoint, stage='total')
+    return response
+
+@bp.after_app_request
+def compress_response(response):
+    """
+    Compress API responses with brotli or gzip when the client accepts it.
+    
+    Стискає відповіді API за допомогою brotli або gzip, якщо клієнт це підтримує.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    encoding = choose_encoding(request.accept_encodings)
+    body = response.get_data()
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return response
+    
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
 
-@app.route('/')
+@bp.route('/')
 def index():
     """
     Render the home page.
@@ -40,7 +217,7 @@ def index():
     """
     return render_template('index.html')
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 def dashboard():
     """
     Render the main dashboard page.
@@ -49,13 +226,266 @@ def dashboard():
     """
     return render_template('dashboard.html')
 
-def generate_demo_data(symbol, period):
+# Screener summaries: live rows are updated as daily bars are fetched,
+# demo and static rows are built on first use
+# Зведення скринера: живі рядки оновлюються під час завантаження денних барів,
+# демо- та статичні рядки будуються при першому використанні
+SCREENER_MAX_ROWS = int(os.environ.get('SCREENER_MAX_ROWS', 5000))
+screener_index = ScreenerIndex(max_rows=SCREENER_MAX_ROWS)
+demo_screener = ScreenerIndex(max_rows=SCREENER_MAX_ROWS)
+static_screener = ScreenerIndex(max_rows=SCREENER_MAX_ROWS)
+SCREENER_MAX_LIMIT = int(os.environ.get('SCREENER_MAX_LIMIT', 1000))
+SCREENER_MAX_SYMBOLS = int(os.environ.get('SCREENER_MAX_SYMBOLS', 500))
+SCREENER_DEMO_SEED = int(os.environ.get('SCREENER_DEMO_SEED', 2024))
+
+# Symbols whose stored daily bars are too short for a screener row are
+# backfilled to HISTORY_PERIOD in the background, never inside a request
+# Символи, збережених денних барів яких замало для рядка скринера,
+# доповнюються до HISTORY_PERIOD у фоні, ніколи всередині запиту
+screener_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('SCREENER_BACKFILL_WORKERS', 1)),
+                                       thread_name_prefix='screener')
+screener_backfills = set()
+screener_backfills_lock = threading.Lock()
+
+# Thread pool for multi-symbol requests
+# Пул потоків для запитів з кількома символами
+BATCH_MAX_SYMBOLS = int(os.environ.get('BATCH_MAX_SYMBOLS', 100))
+batch_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('BATCH_MAX_WORKERS', 8)),
+                                    thread_name_prefix='batch')
+
+def fetch_stock_history(symbol, period, interval='1d'):
+    """
+    Fetch stock history through the shared cache and the on-disk store.
+    Concurrent misses for the same (symbol, period, interval) share one
+    store lookup, which downloads only bars newer than the stored ones.
+    
+    Args:
+        symbol (str): Stock symbol (e.g., 'AAPL')
+        period (str): Time period (e.g., '1mo', '3mo')
+        interval (str): Bar interval (e.g., '1d')
+        
+    Returns:
+        DataFrame: Copy of the downloaded data, safe to modify
+        
+    Отримує історію акцій через спільний кеш та дискове сховище.
+    Одночасні промахи для однакових (symbol, period, interval) використовують
+    один запит до сховища, яке завантажує лише бари, новіші за збережені.
+    
+    Аргументи:
+        symbol (str): Символ акції (напр., 'AAPL')
+        period (str): Часовий період (напр., '1mo', '3mo')
+        interval (str): Інтервал бару (напр., '1d')
+        
+    Повертає:
+        DataFrame: Копія завантажених даних, яку можна змінювати
+    """
+    key = make_key(symbol, period, interval)
+    
+    data = stock_cache.get_or_load(key, lambda: load_history(key))
+    return data.copy() if data is not None else None
+
+def load_history(key):
+    """
+    Cache loader: read (symbol, period, interval) from the store and, for
+    daily bars, refresh the symbol's screener row from the stored history.
+    
+    Завантажувач кешу: читає (symbol, period, interval) зі сховища та для
+    денних барів оновлює рядок скринера символу зі збереженої історії.
+    """
+    data = ohlcv_store.get(*key)
+    if key[2] == '1d':
+        update_screener(key[0])
+    return data
+
+def update_screener(symbol):
+    """
+    Recompute the screener row of ``symbol`` from the last stored daily bars.
+    Only what is already on disk is read; if it is shorter than LOOKBACK and
+    does not reach back HISTORY_PERIOD, a background backfill is scheduled.
+    
+    Перераховує рядок скринера для ``symbol`` з останніх збережених денних барів.
+    Читається лише те, що вже є на диску; якщо барів менше за LOOKBACK і вони
+    не сягають HISTORY_PERIOD, планується фонове доповнення.
+    """
+    try:
+        bars, meta = ohlcv_store.load(symbol, '1d')
+        if bars is None:
+            return
+        screener_index.update(symbol, bars_to_frame(bars[-LOOKBACK:]))
+        if len(bars) < LOOKBACK and meta.get('coverage_start', 0) > period_start(HISTORY_PERIOD):
+            schedule_screener_backfill(symbol)
+    except Exception as e:
+        logger.warning("Screener update failed for %s: %s", symbol, e)
+
+def schedule_screener_backfill(symbol):
+    """
+    Queue one background backfill of ``symbol``; repeated calls while it is pending are ignored.
+    
+    Ставить у чергу одне фонове доповнення ``symbol``; повторні виклики, поки воно очікує, ігноруються.
+    """
+    with screener_backfills_lock:
+        if symbol in screener_backfills:
+            return
+        screener_backfills.add(symbol)
+    screener_executor.submit(backfill_screener, symbol)
+
+def backfill_screener(symbol):
+    """
+    Extend the stored daily bars of ``symbol`` to HISTORY_PERIOD and recompute its screener row.
+    
+    Доповнює збережені денні бари ``symbol`` до HISTORY_PERIOD і перераховує його рядок скринера.
+    """
+    try:
+        screener_index.update(symbol, ohlcv_store.get(symbol, HISTORY_PERIOD, '1d'))
+    except Exception as e:
+        logger.warning("Screener backfill failed for %s: %s", symbol, e)
+    finally:
+        with screener_backfills_lock:
+            screener_backfills.discard(symbol)
+
+def warm_stock_history(symbol, period, interval='1d'):
+    """
+    Refresh one cache entry from the store, keeping the old value served meanwhile.
+    
+    Оновлює один запис кешу зі сховища, залишаючи старе значення доступним.
+    """
+    key = make_key(symbol, period, interval)
+    stock_cache.refresh(key, lambda: load_history(key))
+
+# Request frequencies recorded by /api/stock-data, used to prioritize prefetching
+# Частоти запитів, що записує /api/stock-data, для пріоритету попереднього завантаження
+request_tracker = RequestTracker(half_life=float(os.environ.get('PREFETCH_HALF_LIFE', 3600)))
+
+# Background warming of the watchlist and the hottest symbols (PREFETCH_ENABLED=true).
+# With several workers prefer the sidecar: python prefetch.py --watchlist ...
+# Фонове прогрівання списку спостереження та найпопулярніших символів (PREFETCH_ENABLED=true).
+# З кількома воркерами краще використовувати окремий процес: python prefetch.py --watchlist ...
+prefetcher = PrefetchScheduler(
+    warm_stock_history,
+    parse_watchlist(os.environ.get('PREFETCH_WATCHLIST', '')),
+    tracker=request_tracker,
+    top_n=int(os.environ.get('PREFETCH_TOP', 20)),
+    max_concurrency=int(os.environ.get('PREFETCH_CONCURRENCY', 4)),
+    jitter=float(os.environ.get('PREFETCH_JITTER', 5)),
+    open_interval=float(os.environ.get('PREFETCH_INTERVAL', 300))
+)
+
+@bp.before_app_request
+def start_prefetcher():
+    """
+    Start the prefetcher in the serving process, after any worker fork.
+    
+    Запускає попереднє завантаження в обслуговуючому процесі, після створення воркерів.
+    """
+    if os.environ.get('PREFETCH_ENABLED', 'false').lower() == 'true':
+        prefetcher.start()
+
+# Minutes per bar for intraday demo intervals
+# Кількість хвилин на бар для внутрішньоденних демо-інтервалів
+INTRADAY_MINUTES = {'1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60}
+
+# Regular trading session length in minutes (9:30-16:00)
+# Тривалість основної торгової сесії у хвилинах (9:30-16:00)
+SESSION_MINUTES = 390
+
+# Bump when generate_demo_frame() output changes, so compiled static fixtures are rebuilt
+# Збільшуйте, коли змінюється результат generate_demo_frame(), щоб статичні фікстури перекомпілювалися
+DEMO_GENERATOR_VERSION = 1
+
+def generate_demo_frame(symbol, period, interval='1d', seed=None, end=None):
+    """
+    Generate simulated OHLCV bars as a geometric random walk.
+    All bars are produced at once with NumPy arrays.
+    
+    Args:
+        symbol (str): Stock symbol (e.g., 'AAPL')
+        period (str): Time period (e.g., '1mo', '5y')
+        interval (str): Bar interval (e.g., '1d', '5m')
+        seed (int): Optional seed; combined with the symbol it makes
+            the output deterministic per symbol
+        end (datetime): Last date to generate, defaults to now
+        
+    Returns:
+        DataFrame: OHLCV columns with a DatetimeIndex named 'Date'
+        
+    Генерує симульовані бари OHLCV як геометричне випадкове блукання.
+    Усі бари створюються одразу за допомогою масивів NumPy.
+    
+    Аргументи:
+        symbol (str): Символ акції (напр., 'AAPL')
+        period (str): Часовий період (напр., '1mo', '5y')
+        interval (str): Інтервал бару (напр., '1d', '5m')
+        seed (int): Необов'язкове зерно; разом із символом робить
+            результат детермінованим для кожного символу
+        end (datetime): Остання дата генерації, за замовчуванням зараз
+        
+    Повертає:
+        DataFrame: Стовпці OHLCV з DatetimeIndex на ім'я 'Date'
+    """
+    if seed is None:
+        rng = np.random.default_rng()
+    else:
+        rng = np.random.default_rng([int(seed), zlib.crc32(symbol.upper().encode())])
+    
+    # Define date range based on period
+    # Визначення діапазону дат на основі періоду
+    end_date = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    try:
+        start = period_start('10y' if period == 'max' else period, end_date)
+        start_date = pd.Timestamp(start)
+    except ValueError:
+        start_date = end_date - pd.Timedelta(days=30)  # Default
+    # Business days only; np.is_busday avoids pandas' per-day offset loop
+    # Лише робочі дні; np.is_busday уникає поденного циклу зсувів pandas
+    days = np.arange(start_date.to_datetime64().astype('datetime64[D]'),
+                     end_date.to_datetime64().astype('datetime64[D]') + 1)
+    days = pd.DatetimeIndex(days[np.is_busday(days)].astype('datetime64[ns]'))
+    if len(days) == 0:
+        days = pd.bdate_range(end=end_date.normalize(), periods=1)  # Weekend: last business day
+    
+    # Generate timestamps, intraday bars cover the regular session
+    # Генерація міток часу, внутрішньоденні бари охоплюють основну сесію
+    minutes = INTRADAY_MINUTES.get(interval)
+    if minutes is None:
+        index = days
+        bars_per_day = 1
+    else:
+        bars_per_day = -(-SESSION_MINUTES // minutes)
+        offsets = (np.timedelta64(570, 'm') + np.arange(bars_per_day) * np.timedelta64(minutes, 'm'))
+        stamps = days.values[:, None] + offsets[None, :].astype('timedelta64[ns]')
+        index = pd.DatetimeIndex(stamps.ravel())
+        index = index[index <= max(end_date, index[bars_per_day - 1])]  # No bars in the future
+    n = len(index)
+    
+    # Log returns scaled to the bar length, daily volatility about 1.7%
+    # Логарифмічні прибутковості, масштабовані до довжини бару, денна волатильність близько 1.7%
+    scale = 1.0 / np.sqrt(bars_per_day)
+    base_price = rng.uniform(50, 500)  # Random starting price / Випадкова початкова ціна
+    close = base_price * np.exp(np.cumsum(rng.normal(0.0, 0.017 * scale, n)))
+    open_ = np.empty(n)
+    open_[:1] = base_price
+    open_[1:] = close[:-1]  # Each bar opens at the previous close / Бар відкривається за попереднім закриттям
+    high = np.maximum(open_, close) * (1 + rng.uniform(0.001, 0.02, n) * scale)
+    low = np.minimum(open_, close) * (1 - rng.uniform(0.001, 0.02, n) * scale)
+    volume = (rng.uniform(1000000, 10000000, n) / bars_per_day).astype(np.int64)
+    
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume
+    }, index=pd.DatetimeIndex(index, name='Date'))
+
+def generate_demo_data(symbol, period, interval='1d', seed=None):
     """
     Generate simulated stock data for demonstration purposes.
     
     Args:
         symbol (str): Stock symbol (e.g., 'AAPL')
         period (str): Time period (e.g., '1mo', '3mo')
+        interval (str): Bar interval (e.g., '1d', '5m')
+        seed (int): Optional seed for deterministic output per symbol
         
     Returns:
         list: List of dictionaries with simulated stock data
@@ -65,64 +495,279 @@ def generate_demo_data(symbol, period):
     Аргументи:
         symbol (str): Символ акції (напр., 'AAPL')
         period (str): Часовий період (напр., '1mo', '3mo')
+        interval (str): Інтервал бару (напр., '1d', '5m')
+        seed (int): Необов'язкове зерно для детермінованого результату
         
     Повертає:
         list: Список словників із симульованими даними акцій
     """
-    logger.info(f"Generating demo data for {symbol}")
+    logger.debug("Generating demo data for %s", symbol)
+    return frame_to_records(generate_demo_frame(symbol, period, interval, seed), is_demo=True)
+
+def frame_to_records(data, is_demo=False):
+    """
+    Convert a downloaded DataFrame into a list of JSON-ready records.
+    Flattens MultiIndex columns, formats dates and converts NaN to None.
     
-    # Define date range based on period
-    # Визначення діапазону дат на основі періоду
-    end_date = datetime.datetime.now()
-    if period == '1mo':
-        days = 30
-    elif period == '3mo':
-        days = 90
-    elif period == '6mo':
-        days = 180
-    elif period == '1y':
-        days = 365
-    else:
-        days = 30  # Default
-    
-    start_date = end_date - datetime.timedelta(days=days)
-    
-    # Generate dates
-    # Генерація дат
-    date_range = pd.date_range(start=start_date, end=end_date, freq='B')  # Business days only
-    
-    # Generate random stock data
-    # Генерація випадкових даних акцій
-    base_price = random.uniform(50, 500)  # Random starting price
-    
-    data = []
-    current_price = base_price
-    
-    for date in date_range:
-        # Random daily change -3% to +3%
-        # Випадкова денна зміна від -3% до +3%
-        change = current_price * random.uniform(-0.03, 0.03)
-        open_price = current_price
-        close_price = current_price + change
-        high_price = max(open_price, close_price) * random.uniform(1.001, 1.02)
-        low_price = min(open_price, close_price) * random.uniform(0.98, 0.999)
-        volume = int(random.uniform(1000000, 10000000))
-        
-        data.append({
-            'Date': date.strftime('%Y-%m-%d'),
-            'Open': open_price,
-            'High': high_price,
-            'Low': low_price,
-            'Close': close_price,
-            'Volume': volume,
-            'IsDemo': True  # Flag indicating this is demo data / Позначка, що це демо-дані
-        })
-        
-        current_price = close_price  # Next day starts at previous close
+    Args:
+        data (DataFrame): Stock data as returned by the downloader
+        is_demo (bool): Value of the IsDemo flag on every record
+        
+    Returns:
+        list: List of dictionaries with stock data
+        
+    Перетворює завантажений DataFrame на список записів, готових для JSON.
+    Сплющує багаторівневі стовпці, форматує дати та перетворює NaN на None.
     
-    return data
+    Аргументи:
+        data (DataFrame): Дані акцій у форматі завантажувача
+        is_demo (bool): Значення позначки IsDemo у кожному записі
+        
+    Повертає:
+        list: Список словників з даними акцій
+    """
+    # Handle multi-level columns if they exist
+    # Обробка багаторівневих стовпців, якщо вони існують
+    if isinstance(data.columns, pd.MultiIndex):
+        logger.debug("Found MultiIndex columns, flattening them")
+        data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+    
+    # Convert to format suitable for JSON
+    # Конвертація у формат, придатний для JSON
+    dates = format_dates(data.index)
+    data.reset_index(inplace=True)
+    data['Date'] = dates
+    data['IsDemo'] = is_demo  # Flag indicating demo or real data / Позначка демо- чи реальних даних
+    
+    # Convert NaN values to None for JSON serialization
+    # Конвертація значень NaN в None для серіалізації JSON
+    return data.where(pd.notnull(data), None).to_dict(orient='records')
+
+def load_stock_frame(symbol, period, interval='1d', use_demo=False, use_static=False, seed=None):
+    """
+    Load stock data from the requested source, falling back to
+    static data when live data is empty or unavailable.
+    
+    Args:
+        symbol (str): Stock symbol (e.g., 'AAPL')
+        period (str): Time period (e.g., '1mo', '3mo')
+        interval (str): Bar interval (e.g., '1d')
+        use_demo (bool): Generate demo data instead of fetching
+        use_static (bool): Use static data instead of fetching
+        seed (int): Optional seed for deterministic demo data
+        
+    Returns:
+        tuple: (data, source, error) where data is an OHLCV DataFrame
+            indexed by 'Date' and source is one of
+            'live', 'demo', 'static' or 'fallback'
+        
+    Завантажує дані акцій із запитаного джерела, повертаючись до
+    статичних даних, якщо реальні дані порожні або недоступні.
+    
+    Аргументи:
+        symbol (str): Символ акції (напр., 'AAPL')
+        period (str): Часовий період (напр., '1mo', '3mo')
+        interval (str): Інтервал бару (напр., '1d')
+        use_demo (bool): Згенерувати демо-дані замість завантаження
+        use_static (bool): Використати статичні дані замість завантаження
+        seed (int): Необов'язкове зерно для детермінованих демо-даних
+        
+    Повертає:
+        tuple: (data, source, error), де data - DataFrame з OHLCV та
+            індексом 'Date', а source - одне з
+            'live', 'demo', 'static' або 'fallback'
+    """
+    if use_demo:
+        logger.debug("Using demo data as requested")
+        source_total.inc(endpoint=metric_endpoint(), source='demo')
+        return generate_demo_frame(symbol, period, interval, seed), 'demo', None
+    
+    if use_static:
+        logger.debug("Using static data for %s", symbol)
+        source_total.inc(endpoint=metric_endpoint(), source='static')
+        return static_fixtures.frame(symbol, period), 'static', None
+    
+    try:
+        # Fetch stock data from Yahoo Finance
+        # Отримання даних акцій з Yahoo Finance
+        with stage_seconds.time(endpoint=metric_endpoint(), stage='fetch'):
+            data = fetch_stock_history(symbol, period, interval)
+        
+        if data is None or data.empty:
+            logger.warning(f"No data found for symbol {symbol}, falling back to static data")
+            source_total.inc(endpoint=metric_endpoint(), source='fallback')
+            fallback_total.inc(endpoint=metric_endpoint(), reason='empty')
+            return static_fixtures.frame(symbol, period), 'fallback', "No data found"
+        
+        # Handle multi-level columns if they exist
+        # Обробка багаторівневих стовпців, якщо вони існують
+        if isinstance(data.columns, pd.MultiIndex):
+            logger.debug("Found MultiIndex columns, flattening them")
+            data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+        
+        logger.debug("Successfully retrieved %d data points for %s", len(data), symbol)
+        source_total.inc(endpoint=metric_endpoint(), source='live')
+        return data, 'live', None
+    
+    except Exception as e:
+        logger.error(f"Error fetching data for {symbol}: {str(e)}")
+        logger.error(traceback.format_exc())
+        
+        # Return static data instead of demo data for more realistic appearance
+        # Повернення статичних даних замість демо-даних для більш реалістичного вигляду
+        logger.info("Falling back to static data due to error")
+        source_total.inc(endpoint=metric_endpoint(), source='fallback')
+        fallback_total.inc(endpoint=metric_endpoint(), reason='error')
+        return static_fixtures.frame(symbol, period), 'fallback', str(e)
+
+def is_simulated(symbol, source):
+    """
+    Whether data loaded from ``source`` is simulated: demo data, or static
+    and fallback bars of a symbol without curated fixture rows.
+    
+    Чи є дані з ``source`` симульованими: демо-дані або статичні та
+    запасні бари символу без підібраних рядків фікстури.
+    """
+    return source == 'demo' or (source in ('static', 'fallback') and static_fixtures.is_synthetic(symbol))
+
+def load_interval_frame(symbol, period, interval='1d', use_demo=False, use_static=False, seed=None):
+    """
+    load_stock_frame() for any interval: calendar intervals (RESAMPLE_INTERVALS)
+    are aggregated from daily bars, as stock_data() does.
+    
+    load_stock_frame() для будь-якого інтервалу: календарні інтервали
+    (RESAMPLE_INTERVALS) агрегуються з денних барів, як у stock_data().
+    """
+    if interval not in RESAMPLE_INTERVALS:
+        return load_stock_frame(symbol, period, interval, use_demo, use_static, seed)
+    data, source, error = load_stock_frame(symbol, period, '1d', use_demo, use_static, seed)
+    return resample_ohlc(data, interval), source, error
+
+def parse_date(name, value):
+    """
+    Parse a date query parameter into a naive UTC Timestamp.
+    
+    Args:
+        name (str): Parameter name used in the error message
+        value (str): Date or timestamp, or None
+        
+    Returns:
+        Timestamp: Parsed value, or None when the parameter is missing
+        
+    Розбирає параметр запиту з датою у Timestamp в UTC без поясу.
+    
+    Аргументи:
+        name (str): Назва параметра для повідомлення про помилку
+        value (str): Дата або мітка часу, або None
+        
+    Повертає:
+        Timestamp: Розібране значення або None, якщо параметр відсутній
+    """
+    if not value:
+        return None
+    try:
+        stamp = pd.Timestamp(value)
+    except ValueError:
+        stamp = pd.NaT
+    if stamp is pd.NaT:
+        raise ValueError(f"Parameter '{name}' must be a date such as 2024-01-31")
+    if stamp.tz is not None:
+        stamp = stamp.tz_convert('UTC').tz_localize(None)
+    return stamp
+
+def parse_date_range(start, end):
+    """
+    Parse the start= and end= query parameters into a half-open range.
+    Both bounds are inclusive for the caller: a date-only end covers the whole day.
+    
+    Args:
+        start (str): First date or timestamp, or None
+        end (str): Last date or timestamp, or None
+        
+    Returns:
+        tuple: (start, end) Timestamps, end exclusive; either may be None
+        
+    Розбирає параметри запиту start= та end= у напіввідкритий діапазон.
+    Для користувача обидві межі включні: кінцева дата без часу охоплює весь день.
+    
+    Аргументи:
+        start (str): Перша дата або мітка часу, або None
+        end (str): Остання дата або мітка часу, або None
+        
+    Повертає:
+        tuple: (start, end) як Timestamp, end виключна; будь-яка може бути None
+    """
+    start = parse_date('start', start)
+    end = parse_date('end', end)
+    if end is not None:
+        end = end + pd.Timedelta(days=1) if end == end.normalize() else end + pd.Timedelta(1, 'ns')
+    if start is not None and end is not None and start >= end:
+        raise ValueError("Parameter 'start' must not be after 'end'")
+    return start, end
 
-@app.route('/api/stock-data')
+def stock_payload(data, is_demo, fmt):
+    """
+    Build the JSON payload for stock data in the requested format.
+    
+    Args:
+        data (DataFrame): OHLCV data indexed by 'Date'
+        is_demo (bool): Value of the IsDemo flag, see is_simulated()
+        fmt (str): 'records' or 'columns'
+        
+    Returns:
+        object: List of records or a dictionary of columns
+        
+    Формує JSON-дані акцій у запитаному форматі.
+    
+    Аргументи:
+        data (DataFrame): Дані OHLCV з індексом 'Date'
+        is_demo (bool): Значення позначки IsDemo, див. is_simulated()
+        fmt (str): 'records' або 'columns'
+        
+    Повертає:
+        object: Список записів або словник стовпців
+    """
+    if fmt == 'columns':
+        return frame_to_columns(data, is_demo)
+    
+    records = frame_to_records(data, is_demo)
+    
+    # Log sample data for debugging; skipped entirely unless DEBUG is enabled
+    # Логування зразка даних для налагодження; повністю пропускається без рівня DEBUG
+    if records and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sample record: %s", records[0])
+    return records
+
+def json_response(payload, status=200):
+    """
+    Return a JSON response encoded with the fastest available encoder.
+    
+    Повертає JSON-відповідь, закодовану найшвидшим доступним кодувальником.
+    """
+    return Response(dumps_json(payload), status=status, mimetype=JSON_MIMETYPE)
+
+def static_response(symbol, period, fmt):
+    """
+    Return pre-serialized static data with an ETag, or 304 if the client copy matches.
+    
+    Повертає заздалегідь серіалізовані статичні дані з ETag або 304, якщо копія клієнта збігається.
+    """
+    body, etag = static_fixtures.payload(symbol, period, fmt)
+    response = Response(body, mimetype=JSON_MIMETYPE)
+    response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+def not_modified(etag):
+    """
+    Return an empty 304 response carrying ``etag``.
+    
+    Повертає порожню відповідь 304 з ``etag``.
+    """
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+@bp.route('/api/stock-data')
 def stock_data():
     """
     API endpoint that provides stock price data.
@@ -131,14 +776,54 @@ def stock_data():
     - Static pre-defined data
     - Generated demo data
     
+    Supports multiple response formats (format=):
+    - records: one object per bar (default)
+    - columns: one array per field and a single IsDemo flag
+    - arrow: Apache Arrow IPC stream (requires pyarrow)
+    
+    start= and end= (inclusive dates) select a slice of the history by
+    binary search; start= replaces period=. interval=1wk, 1mo or 1q
+    builds weekly, monthly or quarterly bars from daily data.
+    
+    since=<last date the client has> returns only bars from that date on,
+    so the still-forming bar is refreshed; a series downsampled by
+    max_points= is always returned whole (X-Downsampled: true). Responses carry an ETag of the
+    full series version; a matching If-None-Match gets 304 before any
+    payload is built.
+    
+    With max_points= long histories are downsampled on the server:
+    candlestick bars are bucket-aggregated and, for format=columns, a
+    'Trend' close-price series is selected with LTTB.
+    
     API-ендпоінт, який надає дані про ціни акцій.
     Підтримує декілька джерел даних:
     - Реальні дані з Yahoo Finance API
     - Статичні попередньо визначені дані
     - Згенеровані демо-дані
+    
+    Підтримує декілька форматів відповіді (format=):
+    - records: один об'єкт на бар (за замовчуванням)
+    - columns: один масив на поле та єдина позначка IsDemo
+    - arrow: потік Apache Arrow IPC (потребує pyarrow)
+    
+    start= та end= (включні дати) вибирають зріз історії двійковим
+    пошуком; start= замінює period=. interval=1wk, 1mo або 1q будує
+    тижневі, місячні або квартальні бари з денних даних.
+    
+    since=<остання дата клієнта> повертає лише бари, починаючи з цієї дати,
+    тому незавершений бар оновлюється; ряд, зменшений через max_points=,
+    завжди повертається повністю (X-Downsampled: true). Відповіді містять слабкий ETag версії
+    повного ряду; за збігу If-None-Match повертається 304 ще до побудови
+    даних відповіді.
+    
+    З max_points= довгі історії зменшуються на сервері: бари свічок
+    агрегуються по бакетах, а для format=columns ряд цін закриття
+    'Trend' вибирається алгоритмом LTTB.
     """
     symbol = request.args.get('symbol', 'AAPL')
     period = request.args.get('period', '1mo')
+    interval = request.args.get('interval', '1d')
+    fmt = request.args.get('format', 'records').lower()
     
     # Add parameter to force demo data
     # Параметр для примусового використання демо-даних
@@ -148,77 +833,586 @@ def stock_data():
     # Новий параметр для використання локальних статичних даних замість API
     use_static = request.args.get('static', 'false').lower() == 'true'
     
-    logger.info(f"Fetching stock data for {symbol} over period {period}. Demo: {use_demo}, Static: {use_static}")
-    
-    if use_demo:
-        logger.info("Using demo data as requested")
-        demo_data = generate_demo_data(symbol, period)
-        return jsonify(demo_data)
+    logger.debug("Fetching stock data for %s over period %s. Demo: %s, Static: %s", symbol, period, use_demo, use_static)
     
-    if use_static:
-        logger.info(f"Using static data for {symbol}")
-        # Sample static data for Apple as fallback
-        # Зразок статичних даних для Apple як запасний варіант
-        static_data = get_static_data(symbol)
-        return jsonify(static_data)
+    seed = request.args.get('seed', type=int)
+    max_points = request.args.get('max_points', type=int)
     
+    if max_points is not None and max_points < 3:
+        return jsonify({"error": "Parameter 'max_points' must be at least 3"}), 400
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unsupported format '{fmt}', expected one of {', '.join(FORMATS)}"}), 400
+    if fmt == 'arrow' and not arrow_available():
+        return jsonify({"error": "Arrow format requires pyarrow to be installed"}), 406
     try:
-        # Fetch stock data from Yahoo Finance
-        # Отримання даних акцій з Yahoo Finance
-        logger.info(f"Calling yfinance.download({symbol}, period={period})")
-        start_time = datetime.datetime.now()
-        data = yf.download(symbol, period=period, progress=False)
-        end_time = datetime.datetime.now()
+        start, end = parse_date_range(request.args.get('start'), request.args.get('end'))
+        since = parse_date('since', request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Calendar intervals are aggregated here from daily bars
+    # Календарні інтервали агрегуються тут з денних барів
+    resample = interval in RESAMPLE_INTERVALS
+    fetch_interval = '1d' if resample else interval
+    if start is not None:
+        period = period_covering(start)
+    
+    # Static bodies are serialized once and revalidated by ETag
+    # Статичні тіла серіалізуються один раз і перевіряються за ETag
+    static_body = (max_points is None and fmt != 'arrow' and not resample
+                   and start is None and end is None and since is None)
+    if use_static and not use_demo and static_body:
+        source_total.inc(endpoint=metric_endpoint(), source='static')
+        return static_response(symbol, period, fmt)
+    
+    if not use_demo and not use_static:
+        request_tracker.record(symbol, period, fetch_interval)
+    
+    data, source, _ = load_stock_frame(symbol, period, fetch_interval, use_demo, use_static, seed)
+    if source == 'fallback' and static_body:
+        return static_response(symbol, period, fmt)
+    
+    with stage_seconds.time(endpoint=metric_endpoint(), stage='transform'):
+        # Cut the requested window, then aggregate only what is returned
+        # Вирізання запитаного вікна, потім агрегація лише того, що повертається
+        if start is not None or end is not None:
+            data = slice_frame(data, start, end)
+        if resample:
+            data = resample_ohlc(data, interval)
         
-        logger.info(f"yfinance API call completed in {(end_time - start_time).total_seconds()} seconds")
-        logger.info(f"yfinance returned DataFrame with shape: {data.shape}")
+        # Version of the whole series; unchanged data costs one hash, not a serialization
+        # Версія всього ряду; незмінені дані коштують одного хешу, а не серіалізації
+        # The tag is weak: the gzip, brotli and identity bodies all share it
+        # Тег слабкий: тіла gzip, brotli та без стиснення мають спільний тег
+        etag = frame_etag(data, source, fmt, max_points)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
         
-        if data is None or data.empty:
-            logger.warning(f"No data found for symbol {symbol}, falling back to static data")
-            static_data = get_static_data(symbol)
-            return jsonify(static_data)
+        # Delta: bars from the client's last date on, including that bar.
+        # A downsampled series is sent whole: its last point is a bucket that
+        # raw delta bars cannot replace, and the buckets shift as bars arrive
+        # Дельта: бари від останньої дати клієнта, включно з цим баром.
+        # Зменшений ряд надсилається повністю: його остання точка - бакет, який
+        # сирі бари дельти не можуть замінити, а бакети зсуваються з новими барами
+        downsampled = max_points is not None and len(data) > max_points
+        if since is not None and not downsampled:
+            data = slice_frame(data, since, None)
         
-        # Handle multi-level columns if they exist
-        # Обробка багаторівневих стовпців, якщо вони існують
-        if isinstance(data.columns, pd.MultiIndex):
-            logger.info("Found MultiIndex columns, flattening them")
-            data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+        # Bound the number of points sent to the charts
+        # Обмеження кількості точок, що надсилаються на графіки
+        trend = None
+        if max_points is not None:
+            if fmt == 'columns':
+                trend = downsample_trend(data, max_points)
+            data = downsample_ohlc(data, max_points)
         
-        # Convert to format suitable for JSON
-        # Конвертація у формат, придатний для JSON
-        data.reset_index(inplace=True)
-        data['Date'] = data['Date'].dt.strftime('%Y-%m-%d')
-        data['IsDemo'] = False  # Flag indicating this is real data / Позначка, що це реальні дані
+        if fmt != 'arrow':
+            payload = stock_payload(data, is_simulated(symbol, source), fmt)
+            if trend is not None:
+                payload['Trend'] = {
+                    'Date': format_dates(trend.index).tolist(),
+                    'Close': trend['Close'].to_numpy(dtype='f8', na_value=np.nan)
+                }
+    
+    with stage_seconds.time(endpoint=metric_endpoint(), stage='serialize'):
+        if fmt == 'arrow':
+            response = Response(frame_to_arrow(data, is_simulated(symbol, source)), mimetype=ARROW_MIMETYPE)
+        else:
+            response = json_response(payload)
+    response.set_etag(etag, weak=True)
+    response.headers['X-Downsampled'] = 'true' if downsampled else 'false'
+    return response
+
+@bp.route('/api/stock-data/batch')
+def stock_data_batch():
+    """
+    API endpoint that provides stock price data for several symbols at once.
+    Symbols are fetched in parallel on a bounded thread pool; a failing
+    symbol falls back to static data without failing the whole batch.
+    Accepts format=records or format=columns; calendar intervals
+    (1wk, 1mo, 1q) are aggregated from daily bars as in /api/stock-data.
+    
+    API-ендпоінт, який надає дані про ціни акцій для кількох символів одразу.
+    Символи завантажуються паралельно в обмеженому пулі потоків; помилка
+    одного символу повертає статичні дані, не зриваючи весь запит.
+    Приймає format=records або format=columns; календарні інтервали
+    (1wk, 1mo, 1q) агрегуються з денних барів, як у /api/stock-data.
+    """
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    symbols = list(dict.fromkeys(symbols))  # Drop duplicates, keep order / Видалення дублікатів
+    period = request.args.get('period', '1mo')
+    interval = request.args.get('interval', '1d')
+    fmt = request.args.get('format', 'records').lower()
+    use_demo = request.args.get('demo', 'false').lower() == 'true'
+    use_static = request.args.get('static', 'false').lower() == 'true'
+    seed = request.args.get('seed', type=int)
+    
+    if not symbols:
+        return jsonify({"error": "Parameter 'symbols' is required"}), 400
+    if len(symbols) > BATCH_MAX_SYMBOLS:
+        return jsonify({"error": f"At most {BATCH_MAX_SYMBOLS} symbols per request"}), 400
+    if fmt not in ('records', 'columns'):
+        return jsonify({"error": "Batch format must be 'records' or 'columns'"}), 400
+    
+    logger.debug("Fetching batch stock data for %d symbols over period %s", len(symbols), period)
+    
+    futures = {
+        symbol: batch_executor.submit(for_endpoint(load_interval_frame), symbol, period, interval, use_demo, use_static, seed)
+        for symbol in symbols
+    }
+    
+    result = {}
+    for symbol, future in futures.items():
+        try:
+            data, source, error = future.result()
+            result[symbol] = {
+                "status": "ok" if source != 'fallback' else "fallback",
+                "source": source,
+                "error": error,
+                "data": stock_payload(data, is_simulated(symbol, source), fmt)
+            }
+        except Exception as e:
+            logger.error(f"Batch: unexpected error for {symbol}: {str(e)}")
+            result[symbol] = {"status": "error", "source": None, "error": str(e), "data": []}
+    
+    return json_response(result)
+
+# Export requests: symbol limit and how many symbols are fetched ahead of the one being written
+# Запити експорту: ліміт символів та скільки символів завантажується наперед від записуваного
+EXPORT_MAX_SYMBOLS = int(os.environ.get('EXPORT_MAX_SYMBOLS', 2000))
+EXPORT_LOOKAHEAD = int(os.environ.get('EXPORT_LOOKAHEAD', 4))
+
+def load_export_frame(symbol, period, interval, use_demo, use_static, seed, start, end):
+    """
+    Load one symbol for export: the stock_data() sources and fallbacks, then the date window and calendar bars.
+    
+    Завантажує один символ для експорту: джерела та запасні варіанти stock_data(), потім вікно дат та календарні бари.
+    """
+    resample = interval in RESAMPLE_INTERVALS
+    data, source, _ = load_stock_frame(symbol, period, '1d' if resample else interval,
+                                       use_demo, use_static, seed)
+    if start is not None or end is not None:
+        data = slice_frame(data, start, end)
+    if resample:
+        data = resample_ohlc(data, interval)
+    return data, source, is_simulated(symbol, source)
+
+def stream_export(writer, symbols, load):
+    """
+    Yield the export body symbol by symbol.
+    At most EXPORT_LOOKAHEAD symbols are loaded ahead of the one being
+    written, so memory stays flat however many symbols are exported.
+    
+    Args:
+        writer (object): Writer from export.make_writer
+        symbols (list): Stock symbols in output order
+        load (callable): Function of a symbol returning (data, source, is_demo)
         
-        # Convert NaN values to None for JSON serialization
-        # Конвертація значень NaN в None для серіалізації JSON
-        records = data.where(pd.notnull(data), None).to_dict(orient='records')
+    Yields:
+        bytes: Chunks of the encoded export
         
-        # Log sample data for debugging
-        # Логування зразка даних для налагодження
-        if records:
-            logger.info(f"Sample record: {records[0]}")
+    Повертає тіло експорту символ за символом.
+    Наперед завантажується не більше EXPORT_LOOKAHEAD символів від
+    записуваного, тому пам'ять не зростає з кількістю символів.
+    
+    Аргументи:
+        writer (object): Записувач з export.make_writer
+        symbols (list): Символи акцій у порядку виводу
+        load (callable): Функція символу, що повертає (data, source, is_demo)
         
-        logger.info(f"Successfully retrieved {len(records)} data points for {symbol}")
-        return jsonify(records)
+    Повертає (yield):
+        bytes: Частини закодованого експорту
+    """
+    pending = deque()
+    queued = iter(symbols)
+    try:
+        yield writer.header()
+        for symbol in queued:
+            pending.append((symbol, batch_executor.submit(load, symbol)))
+            if len(pending) <= EXPORT_LOOKAHEAD:
+                continue
+            symbol, future = pending.popleft()
+            yield from writer.write(symbol, *future.result())
+        while pending:
+            symbol, future = pending.popleft()
+            yield from writer.write(symbol, *future.result())
+        yield writer.close()
+    finally:
+        # Client went away: drop loads that have not started
+        # Клієнт від'єднався: скасування завантажень, що ще не почалися
+        for _, future in pending:
+            future.cancel()
+
+@bp.route('/api/export')
+def export_endpoint():
+    """
+    API endpoint that streams stock data for many symbols as one file.
+    Accepts format=csv (default), ndjson or parquet (requires pyarrow) and
+    the period=, interval=, start=, end=, demo=, static= and seed=
+    parameters of /api/stock-data. Each symbol goes through the same
+    sources and static fallback; IsDemo and Source columns tag every row.
     
-    except Exception as e:
-        logger.error(f"Error fetching data for {symbol}: {str(e)}")
-        logger.error(traceback.format_exc())
+    API-ендпоінт, який передає потоком дані акцій для багатьох символів одним файлом.
+    Приймає format=csv (за замовчуванням), ndjson або parquet (потребує pyarrow)
+    та параметри period=, interval=, start=, end=, demo=, static= і seed=
+    з /api/stock-data. Кожен символ проходить ті самі джерела та статичний
+    запасний варіант; стовпці IsDemo та Source позначають кожен рядок.
+    """
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    symbols = list(dict.fromkeys(symbols))  # Drop duplicates, keep order / Видалення дублікатів
+    period = request.args.get('period', '1mo')
+    interval = request.args.get('interval', '1d')
+    fmt = request.args.get('format', 'csv').lower()
+    use_demo = request.args.get('demo', 'false').lower() == 'true'
+    use_static = request.args.get('static', 'false').lower() == 'true'
+    seed = request.args.get('seed', type=int)
+    
+    if not symbols:
+        return jsonify({"error": "Parameter 'symbols' is required"}), 400
+    if len(symbols) > EXPORT_MAX_SYMBOLS:
+        return jsonify({"error": f"At most {EXPORT_MAX_SYMBOLS} symbols per export"}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+    if not export_available(fmt):
+        return jsonify({"error": "Parquet export requires pyarrow to be installed"}), 406
+    try:
+        start, end = parse_date_range(request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if start is not None:
+        period = period_covering(start)
+    
+    logger.debug("Exporting %d symbols over period %s as %s", len(symbols), period, fmt)
+    
+    writer = make_writer(fmt)
+    body = stream_export(
+        writer, symbols,
+        for_endpoint(lambda symbol: load_export_frame(symbol, period, interval, use_demo, use_static, seed, start, end))
+    )
+    response = Response(body, mimetype=writer.mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="stocks-{period}.{writer.extension}"'
+    return response
+
+# Portfolio requests: symbol limit, fetch chunk size and a cache of aligned price matrices
+# Запити портфеля: ліміт символів, розмір частини завантаження та кеш вирівняних матриць цін
+PORTFOLIO_MAX_SYMBOLS = int(os.environ.get('PORTFOLIO_MAX_SYMBOLS', 500))
+PORTFOLIO_CHUNK_SIZE = int(os.environ.get('PORTFOLIO_CHUNK_SIZE', 32))
+portfolio_cache = TTLCache(
+    maxsize=int(os.environ.get('PORTFOLIO_CACHE_SIZE', 32)),
+    ttl=float(os.environ.get('STOCK_CACHE_TTL', 60)),
+    stale_ttl=float(os.environ.get('STOCK_CACHE_STALE_TTL', 300))
+)
+
+def load_aligned_prices(symbols, period, interval='1d', use_demo=False, use_static=False, seed=None):
+    """
+    Load close prices for many symbols in chunks and align them into one matrix.
+    Each chunk is fetched in parallel and reduced to its close series before
+    the next one starts, bounding both upstream concurrency and memory.
+    Symbols that fell back to static data are excluded when live data exists
+    for others, since their dates do not line up.
+    
+    Args:
+        symbols (list): Stock symbols
+        period (str): Time period (e.g., '1y')
+        interval (str): Bar interval (e.g., '1d')
+        use_demo (bool): Generate demo data instead of fetching
+        use_static (bool): Use static data instead of fetching
+        seed (int): Optional seed for deterministic demo data
         
-        # Return static data instead of demo data for more realistic appearance
-        # Повернення статичних даних замість демо-даних для більш реалістичного вигляду
-        logger.info("Falling back to static data due to error")
-        static_data = get_static_data(symbol)
-        return jsonify(static_data)
+    Returns:
+        AlignedPrices: Forward-filled close matrix
+        
+    Завантажує ціни закриття багатьох символів частинами та вирівнює їх в одну матрицю.
+    Кожна частина завантажується паралельно і зводиться до рядів закриття
+    перед початком наступної, що обмежує і паралельність запитів, і пам'ять.
+    Символи, для яких використано статичні дані, виключаються, якщо для
+    інших є реальні дані, оскільки їхні дати не збігаються.
+    
+    Аргументи:
+        symbols (list): Символи акцій
+        period (str): Часовий період (напр., '1y')
+        interval (str): Інтервал бару (напр., '1d')
+        use_demo (bool): Згенерувати демо-дані замість завантаження
+        use_static (bool): Використати статичні дані замість завантаження
+        seed (int): Необов'язкове зерно для детермінованих демо-даних
+        
+    Повертає:
+        AlignedPrices: Матриця закриттів із заповненими пропусками
+    """
+    series, sources = {}, {}
+    for i in range(0, len(symbols), PORTFOLIO_CHUNK_SIZE):
+        chunk = symbols[i:i + PORTFOLIO_CHUNK_SIZE]
+        futures = [batch_executor.submit(for_endpoint(load_interval_frame), symbol, period, interval, use_demo, use_static, seed)
+                   for symbol in chunk]
+        for symbol, future in zip(chunk, futures):
+            data, source, _ = future.result()
+            sources[symbol] = source
+            series[symbol] = (data.index.values.astype('datetime64[ns]').astype('i8'),
+                              data['Close'].to_numpy(dtype='f8', na_value=np.nan))
+    
+    excluded = {}
+    if any(source != 'fallback' for source in sources.values()):
+        for symbol in [s for s, source in sources.items() if source == 'fallback']:
+            del series[symbol]
+            excluded[symbol] = "upstream unavailable, static fallback data not aligned"
+    aligned = AlignedPrices.from_series(series, sources)
+    aligned.excluded.update(excluded)
+    return aligned
+
+@bp.route('/api/portfolio')
+def portfolio_endpoint():
+    """
+    API endpoint with cross-asset analytics for a portfolio of symbols:
+    returns, rolling volatility, covariance and correlation matrices,
+    betas against a benchmark and portfolio value-at-risk.
+    
+    Parameters: symbols=AAPL,MSFT,... (required), weights=0.5,0.5 (same order,
+    normalized; equal by default), benchmark=SPY, period=1y, interval=1d,
+    window=20, confidence=0.95, horizon=1, matrices=true, plus demo/static/seed.
+    The aligned price matrix is cached, so changing only the weights or
+    risk parameters reuses it.
+    
+    API-ендпоінт з аналітикою портфеля символів: прибутковості, ковзна
+    волатильність, матриці коваріації та кореляції, бети відносно еталону
+    та вартість під ризиком портфеля.
+    
+    Параметри: symbols=AAPL,MSFT,... (обов'язковий), weights=0.5,0.5 (той самий
+    порядок, нормалізуються; рівні за замовчуванням), benchmark=SPY, period=1y,
+    interval=1d, window=20, confidence=0.95, horizon=1, matrices=true, а також
+    demo/static/seed. Вирівняна матриця цін кешується, тому зміна лише ваг
+    або параметрів ризику використовує її повторно.
+    """
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    symbols = list(dict.fromkeys(symbols))  # Drop duplicates, keep order / Видалення дублікатів
+    benchmark = request.args.get('benchmark', 'SPY').strip().upper() or None
+    period = request.args.get('period', '1y')
+    interval = request.args.get('interval', '1d')
+    use_demo = request.args.get('demo', 'false').lower() == 'true'
+    use_static = request.args.get('static', 'false').lower() == 'true'
+    seed = request.args.get('seed', type=int)
+    window = request.args.get('window', 20, type=int)
+    confidence = request.args.get('confidence', 0.95, type=float)
+    horizon = request.args.get('horizon', 1, type=int)
+    matrices = request.args.get('matrices', 'true').lower() == 'true'
+    
+    if not symbols:
+        return jsonify({"error": "Parameter 'symbols' is required"}), 400
+    if len(symbols) > PORTFOLIO_MAX_SYMBOLS:
+        return jsonify({"error": f"At most {PORTFOLIO_MAX_SYMBOLS} symbols per request"}), 400
+    if window < 2:
+        return jsonify({"error": "Parameter 'window' must be at least 2"}), 400
+    if not 0 < confidence < 1:
+        return jsonify({"error": "Parameter 'confidence' must be between 0 and 1"}), 400
+    if horizon < 1:
+        return jsonify({"error": "Parameter 'horizon' must be at least 1"}), 400
+    
+    weights = None
+    if request.args.get('weights'):
+        try:
+            weights = np.array([float(w) for w in request.args['weights'].split(',')])
+        except ValueError:
+            return jsonify({"error": "Parameter 'weights' must be a comma-separated list of numbers"}), 400
+        if len(weights) != len(symbols) or not np.isfinite(weights).all() or weights.sum() == 0:
+            return jsonify({"error": "Parameter 'weights' needs one finite weight per symbol, not summing to zero"}), 400
+        weights = weights / weights.sum()
+    
+    # Cache key ignores order, weights and risk parameters
+    # Ключ кешу не залежить від порядку, ваг та параметрів ризику
+    universe = sorted(set(symbols) | ({benchmark} if benchmark else set()))
+    key = (tuple(universe), period.lower(), interval.lower(), use_demo, use_static, seed)
+    aligned = portfolio_cache.get_or_load(
+        key, lambda: load_aligned_prices(universe, period, interval, use_demo, use_static, seed))
+    
+    missing = [symbol for symbol in symbols if symbol not in aligned.symbols]
+    held = [symbol for symbol in symbols if symbol in aligned.symbols]
+    if not held:
+        return jsonify({"error": "No usable price data for the requested symbols", "excluded": aligned.excluded}), 422
+    if weights is not None and missing:
+        weights = weights[[symbols.index(symbol) for symbol in held]]
+        if weights.sum() == 0:
+            return jsonify({"error": "Weights of the remaining symbols sum to zero", "excluded": aligned.excluded}), 422
+        weights = weights / weights.sum()
+    if benchmark not in aligned.symbols:
+        benchmark = None
+    
+    report = portfolio_report(aligned, held, weights, benchmark, window, confidence, horizon, interval, matrices)
+    report['IsDemo'] = any(is_simulated(symbol, aligned.sources.get(symbol)) for symbol in held)
+    return json_response(report)
+
+def populate_screener(index, symbols, load):
+    """
+    Add rows for the symbols the index does not have yet.
+    The index's max_rows evicts old rows, so arbitrary demo symbols cannot grow it without bound.
+    
+    Додає рядки для символів, яких ще немає в індексі.
+    max_rows індексу витісняє старі рядки, тож довільні демо-символи не можуть збільшувати його безмежно.
+    """
+    for symbol in symbols:
+        if symbol not in index:
+            index.update(symbol, load(symbol))
+
+@bp.route('/api/screener')
+def screener_endpoint():
+    """
+    API endpoint that screens many symbols by their summary statistics.
+    filter= holds comma-separated conditions that must all hold, comparing a
+    field with a number, another field or a scaled field, e.g.
+    filter=return_1mo>0.05,volume>avg_volume_20,close>=high_52w*0.95.
+    sort= lists fields, '-' for descending; limit= caps the results.
+    Live screens cover symbols whose daily bars have been fetched;
+    demo=true and static=true build rows from demo or static data.
+    
+    API-ендпоінт, який відбирає багато символів за їхньою зведеною статистикою.
+    filter= містить умови через кому, які мають виконуватися всі разом і
+    порівнюють поле з числом, іншим полем або масштабованим полем, напр.
+    filter=return_1mo>0.05,volume>avg_volume_20,close>=high_52w*0.95.
+    sort= перелічує поля, '-' для спадання; limit= обмежує кількість результатів.
+    Живий скринінг охоплює символи, денні бари яких вже завантажено;
+    demo=true та static=true будують рядки з демо- або статичних даних.
+    """
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    symbols = list(dict.fromkeys(symbols)) or None  # Drop duplicates, keep order / Видалення дублікатів
+    use_demo = request.args.get('demo', 'false').lower() == 'true'
+    use_static = request.args.get('static', 'false').lower() == 'true'
+    limit = request.args.get('limit', 50, type=int)
+    
+    if not 1 <= limit <= SCREENER_MAX_LIMIT:
+        return jsonify({"error": f"Parameter 'limit' must be between 1 and {SCREENER_MAX_LIMIT}"}), 400
+    if symbols and len(symbols) > SCREENER_MAX_SYMBOLS:
+        return jsonify({"error": f"At most {SCREENER_MAX_SYMBOLS} symbols per request"}), 400
+    try:
+        conditions = parse_filter(request.args.get('filter', ''))
+        sort = parse_sort(request.args.get('sort', '-return_1mo'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if use_demo:
+        source, index = 'demo', demo_screener
+        populate_screener(index, symbols or static_fixtures.symbols(),
+                          lambda symbol: generate_demo_frame(symbol, HISTORY_PERIOD, '1d', SCREENER_DEMO_SEED))
+    elif use_static:
+        source, index = 'static', static_screener
+        populate_screener(index, symbols or static_fixtures.symbols(),
+                          lambda symbol: static_fixtures.frame(symbol, HISTORY_PERIOD))
+    else:
+        source, index = 'live', screener_index
+    
+    result = index.query(conditions, sort, limit, symbols)
+    columns = result.pop('results')
+    columns['as_of'] = format_dates(pd.DatetimeIndex(columns['as_of'])).tolist()
+    names = list(columns)
+    rows = zip(*(values if isinstance(values, list) else values.tolist() for values in columns.values()))
+    
+    result['source'] = source
+    result['missing'] = [symbol for symbol in symbols if symbol not in index] if symbols else []
+    result['results'] = [dict(zip(names, row)) for row in rows]
+    return json_response(result)
 
-def get_static_data(symbol):
+@bp.route('/api/indicators')
+def indicators_endpoint():
+    """
+    API endpoint that provides technical indicators for a symbol.
+    Indicators are listed in ind=, e.g. ind=sma:20,rsi:14,macd:12:26:9.
+    Uses the same data sources, fallbacks and calendar intervals as /api/stock-data.
+    
+    API-ендпоінт, який надає технічні індикатори для символу.
+    Індикатори перелічуються в ind=, напр. ind=sma:20,rsi:14,macd:12:26:9.
+    Використовує ті самі джерела даних, запасні варіанти та календарні інтервали, що й /api/stock-data.
+    """
+    symbol = request.args.get('symbol', 'AAPL')
+    period = request.args.get('period', '1mo')
+    interval = request.args.get('interval', '1d')
+    use_demo = request.args.get('demo', 'false').lower() == 'true'
+    use_static = request.args.get('static', 'false').lower() == 'true'
+    seed = request.args.get('seed', type=int)
+    
+    try:
+        engine = IndicatorEngine(request.args.get('ind', 'sma:20'))
+        data, source, _ = load_interval_frame(symbol, period, interval, use_demo, use_static, seed)
+        values, _ = engine.compute(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    payload = {'Date': format_dates(data.index).tolist()}
+    payload.update(values)
+    payload['IsDemo'] = is_simulated(symbol, source)
+    payload['Source'] = source
+    return json_response(payload)
+
+def live_quote(symbol):
+    """
+    Latest quote for a symbol from the cached live data.
+    
+    Останнє котирування для символу з кешованих реальних даних.
+    """
+    return frame_quote(symbol, fetch_stock_history(symbol, '5d', '1d'))
+
+# One poller per subscribed symbol, shared by all connected clients
+# Один опитувач на підписаний символ, спільний для всіх підключених клієнтів
+STREAM_HEARTBEAT_SECONDS = 15
+quote_hub = QuoteHub(live_quote, poll_interval=float(os.environ.get('STREAM_POLL_SECONDS', 5)))
+demo_quote_hub = QuoteHub(DemoQuoteSource(lambda symbol: generate_demo_frame(symbol, '1mo')),
+                          poll_interval=float(os.environ.get('STREAM_DEMO_POLL_SECONDS', 1)))
+
+@bp.route('/api/stream')
+def quote_stream():
+    """
+    Server-Sent Events stream of quote updates for a symbol.
+    Each 'quote' event carries the latest bar and the change against the
+    previous close; comment lines are sent as keep-alive heartbeats.
+    
+    Потік Server-Sent Events з оновленнями котирувань для символу.
+    Кожна подія 'quote' містить останній бар та зміну відносно
+    попереднього закриття; рядки-коментарі надсилаються як пульс з'єднання.
+    """
+    symbol = request.args.get('symbol', 'AAPL')
+    use_demo = request.args.get('demo', 'false').lower() == 'true'
+    hub = demo_quote_hub if use_demo else quote_hub
+    
+    def generate():
+        subscription = hub.subscribe(symbol)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                quote = subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                if quote is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield 'event: quote\ndata: ' + dumps_json(quote).decode('utf-8') + '\n\n'
+        finally:
+            # Runs when the client disconnects
+            # Виконується, коли клієнт від'єднується
+            hub.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/api/stream/stats')
+def quote_stream_stats():
+    """
+    Report active pollers and subscribers of the quote streams.
+    
+    Звіт про активні опитувачі та підписників потоків котирувань.
+    """
+    return jsonify({"live": quote_hub.stats(), "demo": demo_quote_hub.stats()})
+
+# Static fixture data compiled once and memory-mapped; loaded by create_app()
+# Статичні дані фікстур, скомпільовані один раз та відображені у пам'ять; завантажуються в create_app()
+static_fixtures = StaticFixtures(
+    os.environ.get('STATIC_FIXTURE_PATH', DEFAULT_FIXTURE),
+    os.environ.get('STATIC_FIXTURE_DIR', INSTANCE_PATH),
+    generate=lambda symbol, period, seed, end: generate_demo_frame(symbol, period, '1d', seed, end),
+    generator_version=DEMO_GENERATOR_VERSION
+)
+
+def get_static_data(symbol, period=None):
     """
     Get static stock data for a given symbol.
     Used as a fallback when API access fails.
     
     Args:
         symbol (str): Stock symbol
+        period (str): Optional time period counted back from the last static bar
         
     Returns:
         list: List of dictionaries with stock data
@@ -228,91 +1422,14 @@ def get_static_data(symbol):
     
     Аргументи:
         symbol (str): Символ акції
+        period (str): Необов'язковий період, відрахований від останнього статичного бару
         
     Повертає:
         list: Список словників з даними акцій
     """
-    # Sample data for Apple
-    # Зразок даних для Apple
-    if symbol.upper() == 'AAPL':
-        return [
-            {"Date": "2024-03-24", "Open": 171.32, "High": 173.32, "Low": 170.93, "Close": 172.62, "Volume": 58557100, "IsDemo": False},
-            {"Date": "2024-03-25", "Open": 172.88, "High": 173.96, "Low": 171.51, "Close": 173.72, "Volume": 54567800, "IsDemo": False},
-            {"Date": "2024-03-26", "Open": 173.96, "High": 176.10, "Low": 173.23, "Close": 175.39, "Volume": 61912600, "IsDemo": False},
-            {"Date": "2024-03-27", "Open": 176.15, "High": 177.72, "Low": 175.80, "Close": 176.72, "Volume": 51016800, "IsDemo": False},
-            {"Date": "2024-03-28", "Open": 177.33, "High": 178.28, "Low": 175.40, "Close": 175.78, "Volume": 59256000, "IsDemo": False},
-            {"Date": "2024-03-29", "Open": 176.36, "High": 178.40, "Low": 175.98, "Close": 178.22, "Volume": 48456300, "IsDemo": False},
-            {"Date": "2024-04-01", "Open": 177.84, "High": 180.07, "Low": 177.41, "Close": 179.86, "Volume": 56173000, "IsDemo": False},
-            {"Date": "2024-04-02", "Open": 180.04, "High": 181.58, "Low": 179.02, "Close": 180.92, "Volume": 60134900, "IsDemo": False},
-            {"Date": "2024-04-03", "Open": 181.42, "High": 182.43, "Low": 179.26, "Close": 179.86, "Volume": 59258300, "IsDemo": False},
-            {"Date": "2024-04-04", "Open": 180.32, "High": 182.34, "Low": 179.36, "Close": 182.26, "Volume": 56028100, "IsDemo": False},
-            {"Date": "2024-04-05", "Open": 182.96, "High": 184.46, "Low": 181.33, "Close": 183.38, "Volume": 61110200, "IsDemo": False},
-            {"Date": "2024-04-08", "Open": 183.13, "High": 183.58, "Low": 181.33, "Close": 182.09, "Volume": 45230200, "IsDemo": False},
-            {"Date": "2024-04-09", "Open": 181.17, "High": 182.38, "Low": 179.93, "Close": 181.42, "Volume": 55262400, "IsDemo": False},
-            {"Date": "2024-04-10", "Open": 181.02, "High": 183.40, "Low": 180.88, "Close": 182.70, "Volume": 56365700, "IsDemo": False},
-            {"Date": "2024-04-11", "Open": 182.24, "High": 183.15, "Low": 180.05, "Close": 180.05, "Volume": 49001600, "IsDemo": False},
-            {"Date": "2024-04-12", "Open": 180.28, "High": 181.47, "Low": 175.80, "Close": 176.00, "Volume": 77876500, "IsDemo": False},
-            {"Date": "2024-04-15", "Open": 175.11, "High": 177.67, "Low": 174.76, "Close": 176.03, "Volume": 56409000, "IsDemo": False},
-            {"Date": "2024-04-16", "Open": 177.00, "High": 179.25, "Low": 176.20, "Close": 179.03, "Volume": 50123400, "IsDemo": False},
-            {"Date": "2024-04-17", "Open": 177.51, "High": 179.15, "Low": 176.83, "Close": 178.11, "Volume": 52499900, "IsDemo": False},
-            {"Date": "2024-04-18", "Open": 176.70, "High": 177.99, "Low": 175.50, "Close": 175.67, "Volume": 54947200, "IsDemo": False},
-            {"Date": "2024-04-19", "Open": 175.28, "High": 176.75, "Low": 174.11, "Close": 174.79, "Volume": 65978200, "IsDemo": False}
-        ]
-    # Sample data for Microsoft
-    # Зразок даних для Microsoft
-    elif symbol.upper() == 'MSFT':
-        return [
-            {"Date": "2024-03-24", "Open": 412.84, "High": 414.32, "Low": 409.93, "Close": 413.62, "Volume": 28557100, "IsDemo": False},
-            {"Date": "2024-03-25", "Open": 414.88, "High": 416.96, "Low": 412.51, "Close": 415.72, "Volume": 24567800, "IsDemo": False},
-            {"Date": "2024-03-26", "Open": 415.96, "High": 419.10, "Low": 415.23, "Close": 418.39, "Volume": 31912600, "IsDemo": False},
-            {"Date": "2024-03-27", "Open": 418.15, "High": 420.72, "Low": 417.80, "Close": 419.72, "Volume": 21016800, "IsDemo": False},
-            {"Date": "2024-03-28", "Open": 420.33, "High": 422.28, "Low": 418.40, "Close": 418.78, "Volume": 29256000, "IsDemo": False},
-            {"Date": "2024-03-29", "Open": 419.36, "High": 421.40, "Low": 418.98, "Close": 420.22, "Volume": 28456300, "IsDemo": False},
-            {"Date": "2024-04-01", "Open": 420.84, "High": 424.07, "Low": 420.41, "Close": 423.86, "Volume": 26173000, "IsDemo": False},
-            {"Date": "2024-04-02", "Open": 424.04, "High": 425.58, "Low": 422.02, "Close": 424.92, "Volume": 30134900, "IsDemo": False},
-            {"Date": "2024-04-03", "Open": 425.42, "High": 426.43, "Low": 422.26, "Close": 423.86, "Volume": 29258300, "IsDemo": False},
-            {"Date": "2024-04-04", "Open": 424.32, "High": 426.34, "Low": 422.36, "Close": 425.26, "Volume": 26028100, "IsDemo": False},
-            {"Date": "2024-04-05", "Open": 426.96, "High": 428.46, "Low": 425.33, "Close": 427.38, "Volume": 31110200, "IsDemo": False},
-            {"Date": "2024-04-08", "Open": 427.13, "High": 427.58, "Low": 425.33, "Close": 426.09, "Volume": 25230200, "IsDemo": False},
-            {"Date": "2024-04-09", "Open": 425.17, "High": 426.38, "Low": 423.93, "Close": 425.42, "Volume": 25262400, "IsDemo": False}
-        ]
-    # Default fake data for other symbols
-    # Стандартні штучні дані для інших символів
-    else:
-        base_data = [
-            {"Date": "2024-03-24", "Open": 100.32, "High": 103.32, "Low": 99.93, "Close": 102.62, "Volume": 1557100, "IsDemo": False},
-            {"Date": "2024-03-25", "Open": 102.88, "High": 104.96, "Low": 102.51, "Close": 103.72, "Volume": 1567800, "IsDemo": False},
-            {"Date": "2024-03-26", "Open": 103.96, "High": 105.10, "Low": 103.23, "Close": 104.39, "Volume": 1912600, "IsDemo": False},
-            {"Date": "2024-03-27", "Open": 104.15, "High": 106.72, "Low": 103.80, "Close": 105.72, "Volume": 1016800, "IsDemo": False},
-            {"Date": "2024-03-28", "Open": 105.33, "High": 107.28, "Low": 104.40, "Close": 105.78, "Volume": 1256000, "IsDemo": False},
-            {"Date": "2024-03-29", "Open": 106.36, "High": 108.40, "Low": 105.98, "Close": 107.22, "Volume": 1456300, "IsDemo": False},
-            {"Date": "2024-04-01", "Open": 107.84, "High": 109.07, "Low": 106.41, "Close": 108.86, "Volume": 1173000, "IsDemo": False},
-            {"Date": "2024-04-02", "Open": 109.04, "High": 110.58, "Low": 108.02, "Close": 109.92, "Volume": 1134900, "IsDemo": False},
-            {"Date": "2024-04-03", "Open": 110.42, "High": 111.43, "Low": 109.26, "Close": 109.86, "Volume": 1258300, "IsDemo": False},
-            {"Date": "2024-04-04", "Open": 109.32, "High": 111.34, "Low": 108.36, "Close": 110.26, "Volume": 1028100, "IsDemo": False},
-            {"Date": "2024-04-05", "Open": 110.96, "High": 112.46, "Low": 110.33, "Close": 111.38, "Volume": 1110200, "IsDemo": False},
-            {"Date": "2024-04-08", "Open": 111.13, "High": 112.58, "Low": 110.33, "Close": 111.09, "Volume": 1230200, "IsDemo": False},
-            {"Date": "2024-04-09", "Open": 110.17, "High": 111.38, "Low": 108.93, "Close": 110.42, "Volume": 1262400, "IsDemo": False},
-            {"Date": "2024-04-10", "Open": 110.02, "High": 112.40, "Low": 109.88, "Close": 111.70, "Volume": 1365700, "IsDemo": False},
-            {"Date": "2024-04-11", "Open": 111.24, "High": 112.15, "Low": 108.05, "Close": 109.05, "Volume": 1001600, "IsDemo": False}
-        ]
-        # Modify data for the given symbol to make it look realistic
-        # Модифікація даних для вказаного символу, щоб вони виглядали реалістично
-        for item in base_data:
-            # Use the symbol to create unique but consistent prices
-            # Використання символу для створення унікальних, але консистентних цін
-            seed = sum(ord(c) for c in symbol.upper())
-            factor = (seed % 10) / 10 + 0.5  # Multiplier between 0.5 and 1.5
-            
-            item["Open"] *= factor
-            item["High"] *= factor
-            item["Low"] *= factor
-            item["Close"] *= factor
-            item["Volume"] = int(item["Volume"] * factor)
-            
-        return base_data
+    return static_fixtures.records(symbol, period)
 
-@app.route('/api/check')
+@bp.route('/api/check')
 def health_check():
     """
     Simple endpoint to check API health.
@@ -321,7 +1438,52 @@ def health_check():
     """
     return jsonify({"status": "ok", "message": "API is running"})
 
-@app.route('/api/test-yahoo')
+@bp.route('/metrics')
+def metrics_endpoint():
+    """
+    Prometheus-style metrics: stage timings, data sources, cache and upstream counters.
+    Metrics are per worker process and labelled worker=<pid>; a scrape is answered
+    by whichever worker accepts it, so with several workers scrape each one (or run
+    a single worker) and aggregate with sum without (worker).
+    
+    Метрики у стилі Prometheus: час етапів, джерела даних, лічильники кешу та джерела.
+    Метрики окремі для кожного процесу воркера та мають мітку worker=<pid>; на збір
+    відповідає той воркер, який прийняв з'єднання, тож за кількох воркерів збирайте
+    кожен (або запускайте один воркер) і агрегуйте через sum without (worker).
+    """
+    return Response(metrics.render(), content_type=PROMETHEUS_MIMETYPE)
+
+@bp.route('/api/prefetch/status')
+def prefetch_status():
+    """
+    Report prefetch runs and the most requested symbols.
+    
+    Звіт про запуски попереднього завантаження та найзатребуваніші символи.
+    """
+    status = prefetcher.stats()
+    status["hot"] = [{"key": '{}:{}:{}'.format(*key), "score": score}
+                     for key, score in sorted(request_tracker.scores().items(), key=lambda item: -item[1])[:20]]
+    return jsonify(status)
+
+@bp.route('/api/cache/stats')
+def cache_stats():
+    """
+    Report hit/miss/eviction counters of the stock data cache.
+    
+    Звіт про лічильники влучань/промахів/витіснень кешу даних акцій.
+    """
+    return jsonify(stock_cache.stats())
+
+@bp.route('/api/upstream/status')
+def upstream_status():
+    """
+    Report upstream call counters and the circuit breaker state.
+    
+    Звіт про лічильники викликів джерела та стан запобіжника.
+    """
+    return jsonify(upstream.stats())
+
+@bp.route('/api/test-yahoo')
 def test_yahoo_api():
     """
     Endpoint for testing Yahoo Finance API directly.
@@ -349,13 +1511,12 @@ def test_yahoo_api():
     try:
         # Disable progress output
         # Вимкнення виведення прогресу
-        start_time = datetime.datetime.now()
+        start_time = time.perf_counter()
         # Use a timeout to prevent long hanging requests
         # Використання таймауту для запобігання довгих "зависаючих" запитів
-        data = yf.download(symbol, period=period, progress=False)
-        end_time = datetime.datetime.now()
-        
-        execution_time = (end_time - start_time).total_seconds()
+        data = upstream.call(symbol, period=period, progress=False)
+        execution_time = time.perf_counter() - start_time
+        stage_seconds.observe(execution_time, endpoint=metric_endpoint(), stage='fetch')
         result["execution_time"] = execution_time
         
         logger.info(f"TEST ENDPOINT: yfinance call completed in {execution_time} seconds")
@@ -368,7 +1529,7 @@ def test_yahoo_api():
             # Handle multi-level columns if they exist
             # Обробка багаторівневих стовпців, якщо вони існують
             if isinstance(data.columns, pd.MultiIndex):
-                logger.info("Found MultiIndex columns, flattening them")
+                logger.debug("Found MultiIndex columns, flattening them")
                 data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
                 
             result["success"] = True
@@ -395,7 +1556,7 @@ def test_yahoo_api():
     
     return jsonify(result)
 
-@app.route('/api/check-yahoo-response')
+@bp.route('/api/check-yahoo-response')
 def check_yahoo_response():
     """
     Direct check of Yahoo Finance response by making a direct HTTP request.
@@ -416,6 +1577,7 @@ def check_yahoo_response():
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        import requests
         response = requests.get(yahoo_url, headers=headers, timeout=10)
         
         result = {
@@ -442,7 +1604,7 @@ def check_yahoo_response():
             "traceback": traceback.format_exc()
         }), 500
 
-@app.route('/plotly-test')
+@bp.route('/plotly-test')
 def plotly_test():
     """
     Render the Plotly test page for debugging purposes.
@@ -451,11 +1613,11 @@ def plotly_test():
     Відображення тестової сторінки Plotly для відлагодження.
     Доступно тільки в режимі відлагодження.
     """
-    if not app.debug:
+    if not current_app.debug:
         return "This page is only available in debug mode", 404
     return render_template('plotly_test.html')
 
-@app.route('/simple-test')
+@bp.route('/simple-test')
 def simple_test():
     """
     Render the simple test page for debugging charts.
@@ -464,9 +1626,42 @@ def simple_test():
     Відображення простої тестової сторінки для налагодження графіків.
     Доступно тільки в режимі відлагодження.
     """
-    if not app.debug:
+    if not current_app.debug:
         return "This page is only available in debug mode", 404
     return render_template('simple_test.html')
 
+def create_app(config=None):
+    """
+    Build the Flask application.
+    Importing the module does no heavy work: static fixtures are compiled
+    and mapped on first use, or by gunicorn.conf.py in the master before
+    workers fork, so their pages are shared copy-on-write.
+    
+    Args:
+        config (dict): Optional Flask config overrides
+        
+    Returns:
+        Flask: Configured application
+        
+    Створює застосунок Flask.
+    Імпорт модуля не виконує важкої роботи: статичні фікстури компілюються
+    та відображаються при першому використанні або у gunicorn.conf.py в
+    головному процесі до створення воркерів, тому їхні сторінки спільно
+    використовуються за принципом копіювання при записі.
+    
+    Аргументи:
+        config (dict): Необов'язкові перевизначення конфігурації Flask
+        
+    Повертає:
+        Flask: Налаштований застосунок
+    """
+    flask_app = Flask(__name__)
+    if config:
+        flask_app.config.update(config)
+    flask_app.register_blueprint(bp)
+    return flask_app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', debug=True)
@@ -0,0 +1,92 @@
+"""
+Benchmark for the technical indicator engine.
+
+Measures full-history throughput over many symbols with multi-year daily
+data, and the cost of incremental updates when one bar is appended.
+
+Usage:
+    python benchmarks/bench_indicators.py --symbols 500 --years 10
+
+Бенчмарк для рушія технічних індикаторів.
+
+Вимірює пропускну здатність повного перерахунку для багатьох символів
+з багаторічними денними даними та вартість інкрементального оновлення
+при додаванні одного бару.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import IndicatorEngine
+
+SPECS = 'sma:20,sma:50,sma:200,ema:12,ema:26,rsi:14,macd:12:26:9,bb:20:2,atr:14,vol:20,vwap'
+
+
+def make_frame(n_bars, seed):
+    """
+    Build a random-walk OHLCV frame with ``n_bars`` business days.
+
+    Створює DataFrame з OHLCV випадкового блукання з ``n_bars`` робочих днів.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.017, n_bars)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * 1.01,
+        'Low': np.minimum(open_, close) * 0.99,
+        'Close': close,
+        'Volume': rng.uniform(1e6, 1e7, n_bars)
+    }, index=pd.bdate_range(end='2026-10-16', periods=n_bars, name='Date'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--specs', default=SPECS)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    n_bars = args.years * 252
+    frames = [make_frame(n_bars + 1, seed) for seed in range(args.symbols)]
+    engine = IndicatorEngine(args.specs)
+
+    start = time.perf_counter()
+    states = []
+    for frame in frames:
+        _, state = engine.compute(frame.iloc[:-1])
+        states.append(state)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame, state in zip(frames, states):
+        engine.update(state, frame.iloc[-1:])
+    update_seconds = time.perf_counter() - start
+
+    total_bars = args.symbols * n_bars
+    result = {
+        'symbols': args.symbols,
+        'bars_per_symbol': n_bars,
+        'indicators': len(engine.indicators),
+        'full_seconds': full_seconds,
+        'full_bars_per_second': total_bars / full_seconds,
+        'update_seconds': update_seconds,
+        'update_ms_per_symbol': update_seconds / args.symbols * 1000
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Micro-benchmarks for the stages of the /api/stock-data pipeline.
+
+Times each step applied to downloaded data (MultiIndex flattening, date
+formatting, NaN to None conversion, to_dict, jsonify and the orjson
+encoder), the columnar payload, and the demo and static data helpers,
+for several history lengths. Data comes from the offline fake downloader.
+
+Usage:
+    python benchmarks/bench_stages.py --rows 21,252,1260,2520 --repeat 50
+
+Мікробенчмарки етапів конвеєра /api/stock-data.
+
+Вимірює кожен крок обробки завантажених даних (сплющення MultiIndex,
+форматування дат, перетворення NaN на None, to_dict, jsonify та кодувальник
+orjson), стовпчикове представлення, а також генерацію демо- і статичних
+даних для кількох довжин історії. Дані надходять з офлайн-завантажувача.
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+
+import pandas as pd
+
+from common import save_results, time_call
+from fake_yahoo import FakeDownload
+
+from serialization import dumps_json, format_dates, frame_to_columns
+
+# Period whose daily history is closest to a given number of rows
+# Період, денна історія якого найближча до заданої кількості рядків
+PERIODS = ((21, '1mo'), (63, '3mo'), (126, '6mo'), (252, '1y'), (504, '2y'), (1260, '5y'), (2520, '10y'))
+
+
+def period_for(rows):
+    return min(PERIODS, key=lambda item: abs(item[0] - rows))[1]
+
+
+def flatten(data):
+    data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+    return data
+
+
+def prepared(raw):
+    """
+    Return a flattened copy with formatted dates, as handed to NaN conversion.
+
+    Повертає сплющену копію з відформатованими датами, як перед перетворенням NaN.
+    """
+    data = flatten(raw.copy())
+    dates = format_dates(data.index)
+    data.reset_index(inplace=True)
+    data['Date'] = dates
+    data['IsDemo'] = False
+    return data
+
+
+def bench_rows(dashboard, rows, repeat):
+    """
+    Time every stage for a history of ``rows`` bars.
+
+    Вимірює кожен етап для історії з ``rows`` барів.
+    """
+    raw = FakeDownload(rows=rows).frame('AAPL')
+    flat = flatten(raw.copy())
+    ready = prepared(raw)
+    cleaned = ready.where(pd.notnull(ready), None)
+    records = cleaned.to_dict(orient='records')
+    columns = frame_to_columns(flat)
+
+    def run_jsonify():
+        with dashboard.app.app_context():
+            dashboard.jsonify(records).get_data()
+
+    period = period_for(rows)
+    stages = {
+        'flatten_multiindex': lambda: flatten(raw.copy()),
+        'format_dates': lambda: format_dates(flat.index),
+        'nan_to_none': lambda: ready.where(pd.notnull(ready), None),
+        'to_dict': lambda: cleaned.to_dict(orient='records'),
+        'jsonify': run_jsonify,
+        'dumps_json_records': lambda: dumps_json(records),
+        'frame_to_records_total': lambda: dashboard.frame_to_records(raw.copy()),
+        'columns_payload_total': lambda: dumps_json(frame_to_columns(flat)),
+        'dumps_json_columns': lambda: dumps_json(columns),
+        f'generate_demo_data_{period}': lambda: dashboard.generate_demo_data('AAPL', period, seed=1),
+        f'get_static_data_{period}': lambda: dashboard.get_static_data('NVDA', period)
+    }
+    return {name: time_call(func, repeat) for name, func in stages.items()}
+
+
+def bench_static(dashboard, repeat):
+    """
+    Time static data lookups for curated, universe and unknown symbols.
+
+    Вимірює пошук статичних даних для підібраних, набірних та невідомих символів.
+    """
+    return {
+        'curated_AAPL': time_call(lambda: dashboard.get_static_data('AAPL'), repeat),
+        'universe_NVDA_5y': time_call(lambda: dashboard.get_static_data('NVDA', '5y'), repeat),
+        'unknown_symbol': time_call(lambda: dashboard.get_static_data('ZZZZ'), repeat),
+        'preserialized_payload': time_call(
+            lambda: dashboard.static_fixtures.payload('NVDA', '5y', 'records'), repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', default='21,252,1260,2520',
+                        help='Comma-separated history lengths in bars')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', help='Write results as JSON to this file '
+                                         '(default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    # Settings read at import time must be set before importing the app;
+    # the store and compiled fixtures go to a scratch directory, not instance/
+    # Налаштування, що зчитуються при імпорті, задаються до імпорту застосунку;
+    # сховище та скомпільовані фікстури йдуть у тимчасовий каталог, а не в instance/
+    state = tempfile.mkdtemp(prefix='bench-stages-')
+    os.environ.setdefault('OHLCV_STORE_DIR', os.path.join(state, 'ohlcv'))
+    os.environ.setdefault('STATIC_FIXTURE_DIR', os.path.join(state, 'fixtures'))
+
+    import app as dashboard
+
+    # Keep per-call log lines out of the timings
+    # Виключення рядків журналу з вимірювань
+    logging.disable(logging.INFO)
+
+    results = {
+        'repeat': args.repeat,
+        'stages': {rows: bench_rows(dashboard, rows, args.repeat) for rows in map(int, args.rows.split(','))},
+        'static': bench_static(dashboard, args.repeat)
+    }
+    print(json.dumps(results, indent=2))
+    print(f"Saved to {save_results('stages', results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Startup benchmark: import time and time to first request.
+
+Each sample runs in a fresh interpreter: it imports the app module, builds
+a test client and serves one static /api/stock-data request, reporting the
+import time, the first-request time, the process wall time and which heavy
+modules ended up loaded. --baseline runs the same measurement on another
+commit (checked out into a temporary git worktree) for comparison.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --runs 10 --baseline HEAD~1
+
+Бенчмарк запуску: час імпорту та час до першого запиту.
+
+Кожен замір виконується в новому інтерпретаторі: імпортує модуль
+застосунку, створює тестовий клієнт і обслуговує один статичний запит
+/api/stock-data, звітуючи про час імпорту, час першого запиту, загальний
+час процесу та завантажені важкі модулі. --baseline виконує той самий
+вимір на іншому коміті (у тимчасовому git worktree) для порівняння.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, save_results, summarize
+
+HEAVY_MODULES = ('yfinance', 'requests', 'plotly', 'pandas', 'numpy', 'pyarrow')
+
+CHILD = """
+import json, logging, sys, time
+start = time.perf_counter()
+import app as dashboard
+imported = time.perf_counter()
+logging.disable(logging.WARNING)
+response = dashboard.app.test_client().get('/api/stock-data?symbol=AAPL&period=1mo&static=true')
+served = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'first_request': served - imported,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+    'heavy': sorted(name for name in %r if name in sys.modules)
+}))
+""" % (HEAVY_MODULES,)
+
+
+def sample(tree, env):
+    """
+    Run one fresh interpreter in ``tree`` and return its measurements.
+
+    Запускає один новий інтерпретатор у ``tree`` та повертає його виміри.
+    """
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=tree, env=env,
+                         capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result['wall'] = wall
+    return result
+
+
+def measure(tree, runs, warmup):
+    """
+    Collect ``runs`` samples after ``warmup`` discarded ones.
+
+    Збирає ``runs`` замірів після ``warmup`` відкинутих.
+    """
+    state = tempfile.mkdtemp(prefix='bench-startup-')
+    env = dict(os.environ,
+               OHLCV_STORE_DIR=os.path.join(state, 'ohlcv'),
+               STATIC_FIXTURE_DIR=os.path.join(state, 'fixtures'),
+               PYTHONDONTWRITEBYTECODE='')
+    try:
+        # Warmup also compiles bytecode and the static fixture
+        # Розігрів також компілює байт-код та статичну фікстуру
+        for _ in range(warmup):
+            sample(tree, env)
+        samples = [sample(tree, env) for _ in range(runs)]
+    finally:
+        shutil.rmtree(state, ignore_errors=True)
+    return {
+        'import': summarize([s['import'] for s in samples]),
+        'first_request': summarize([s['first_request'] for s in samples]),
+        'wall': summarize([s['wall'] for s in samples]),
+        'status': samples[-1]['status'],
+        'modules': samples[-1]['modules'],
+        'heavy_modules': samples[-1]['heavy']
+    }
+
+
+def report(label, stats):
+    print(f"{label}: import p50={stats['import']['p50_ms']:.0f}ms "
+          f"first request p50={stats['first_request']['p50_ms']:.0f}ms "
+          f"process p50={stats['wall']['p50_ms']:.0f}ms "
+          f"modules={stats['modules']} heavy={','.join(stats['heavy_modules'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--baseline', help='Git ref to measure for comparison, e.g. HEAD~1')
+    parser.add_argument('--output', help='Write results as JSON to this file '
+                                         '(default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    results = {'runs': args.runs, 'current': measure(ROOT, args.runs, args.warmup)}
+    report('current', results['current'])
+
+    if args.baseline:
+        worktree = tempfile.mkdtemp(prefix='bench-baseline-')
+        subprocess.run(['git', 'worktree', 'add', '--detach', worktree, args.baseline],
+                       cwd=ROOT, check=True, capture_output=True)
+        try:
+            results['baseline_ref'] = args.baseline
+            results['baseline'] = measure(worktree, args.runs, args.warmup)
+        finally:
+            subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=ROOT, capture_output=True)
+        report(f"baseline {args.baseline}", results['baseline'])
+
+    print(f"Saved to {save_results('startup', results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
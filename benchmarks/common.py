@@ -0,0 +1,132 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Timing statistics and JSON result files tagged with the git commit, so
+runs from different commits can be compared.
+
+Спільні допоміжні функції для скриптів бенчмарків.
+
+Статистика часу та JSON-файли результатів з позначкою git-коміту, щоб
+можна було порівнювати запуски з різних комітів.
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def summarize(samples):
+    """
+    Summarize durations in seconds as milliseconds.
+
+    Args:
+        samples (list): Durations in seconds
+
+    Returns:
+        dict: Count, mean, min, max and p50/p95/p99 in milliseconds
+
+    Підсумовує тривалості в секундах у мілісекундах.
+
+    Аргументи:
+        samples (list): Тривалості в секундах
+
+    Повертає:
+        dict: Кількість, середнє, мінімум, максимум та p50/p95/p99 у мілісекундах
+    """
+    if not samples:
+        return {'count': 0}
+    ms = np.asarray(samples, dtype='f8') * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'count': int(len(ms)),
+        'mean_ms': float(ms.mean()),
+        'min_ms': float(ms.min()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(ms.max())
+    }
+
+
+def time_call(func, repeat, warmup=3):
+    """
+    Time ``func()`` ``repeat`` times after a few warmup calls.
+
+    Вимірює час ``func()`` ``repeat`` разів після кількох розігрівних викликів.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def git_revision():
+    """
+    Return the current commit hash, or None outside a git checkout.
+
+    Повертає хеш поточного коміту або None поза git-репозиторієм.
+    """
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def save_results(name, results, output=None):
+    """
+    Write results as JSON together with run metadata.
+    Without ``output`` the file goes to benchmarks/results/<name>-<commit>-<time>.json.
+
+    Args:
+        name (str): Benchmark name
+        results (dict): Benchmark results
+        output (str): Optional explicit output path
+
+    Returns:
+        str: Path of the written file
+
+    Записує результати у JSON разом з метаданими запуску.
+    Без ``output`` файл зберігається у benchmarks/results/<name>-<commit>-<time>.json.
+
+    Аргументи:
+        name (str): Назва бенчмарку
+        results (dict): Результати бенчмарку
+        output (str): Необов'язковий явний шлях виводу
+
+    Повертає:
+        str: Шлях записаного файлу
+    """
+    now = datetime.datetime.now()
+    commit = git_revision()
+    document = {
+        'benchmark': name,
+        'commit': commit,
+        'timestamp': now.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{commit or 'nogit'}-{now:%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    return output
@@ -0,0 +1,122 @@
+"""
+Offline stand-in for ``yf.download`` used by the benchmarks.
+
+Returns deterministic random-walk bars shaped like yfinance output, with
+configurable latency, row count and MultiIndex columns, so benchmarks do
+not depend on the network.
+
+Usage (from a script in benchmarks/):
+    import app
+    from fake_yahoo import FakeDownload
+    app.downloader = FakeDownload(latency=0.05)
+
+Офлайн-замінник ``yf.download`` для бенчмарків.
+
+Повертає детерміновані бари випадкового блукання у форматі yfinance з
+налаштовуваною затримкою, кількістю рядків та стовпцями MultiIndex, тому
+бенчмарки не залежать від мережі.
+"""
+
+import os
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ohlcv_store import period_start
+
+# Column order of recent yfinance releases
+# Порядок стовпців у нових версіях yfinance
+COLUMNS = ('Close', 'High', 'Low', 'Open', 'Volume')
+
+# Price paths start on 2000-01-01 and cover this many days
+# Цінові траєкторії починаються 2000-01-01 і охоплюють стільки днів
+EPOCH = np.datetime64('2000-01-01', 'D')
+PATH_DAYS = 20000
+
+
+class FakeDownload:
+    """
+    Callable with the ``yf.download`` signature returning synthetic bars.
+
+    Args:
+        latency (float): Seconds to sleep per call, simulating the network
+        rows (int): Fixed number of bars; None derives it from period/start
+        multiindex (bool): Return (Price, Ticker) MultiIndex columns like yfinance
+        fail_rate (float): Fraction of calls that raise, 0 to 1
+        seed (int): Seed combined with the symbol for deterministic prices
+
+    Об'єкт з сигнатурою ``yf.download``, що повертає синтетичні бари.
+
+    Аргументи:
+        latency (float): Секунди затримки на виклик, що імітують мережу
+        rows (int): Фіксована кількість барів; None визначає її з period/start
+        multiindex (bool): Повертати стовпці MultiIndex (Price, Ticker), як yfinance
+        fail_rate (float): Частка викликів, що викидають помилку, від 0 до 1
+        seed (int): Зерно, що разом із символом дає детерміновані ціни
+    """
+
+    def __init__(self, latency=0.0, rows=None, multiindex=True, fail_rate=0.0, seed=0):
+        self.latency = latency
+        self.rows = rows
+        self.multiindex = multiindex
+        self.fail_rate = fail_rate
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def __call__(self, tickers, period='1mo', interval='1d', start=None, end=None, progress=True, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self.fail_rate > 0 and self._rng.random() < self.fail_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("Simulated upstream failure")
+        return self.frame(str(tickers).upper(), period, start, end)
+
+    def frame(self, symbol, period='1mo', start=None, end=None):
+        """
+        Build the bars for one symbol without latency or failures.
+
+        Створює бари для одного символу без затримки чи помилок.
+        """
+        end = pd.Timestamp.now().normalize() if end is None else pd.Timestamp(end)
+        if self.rows is not None:
+            start = end - pd.Timedelta(days=self.rows * 7 // 5 + 7)
+        elif start is None:
+            try:
+                start = pd.Timestamp(period_start('10y' if period == 'max' else period, end))
+            except ValueError:
+                start = end - pd.Timedelta(days=30)
+        days = np.arange(pd.Timestamp(start).to_datetime64().astype('datetime64[D]'),
+                         end.to_datetime64().astype('datetime64[D]') + 1)
+        days = days[np.is_busday(days)]
+        if self.rows is not None:
+            days = days[-self.rows:]
+        index = pd.DatetimeIndex(days.astype('datetime64[ns]'), name='Date')
+
+        # Prices depend only on the date, so overlapping requests agree
+        # Ціни залежать лише від дати, тому запити, що перекриваються, узгоджені
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+        days = np.clip((index.values.astype('datetime64[D]') - EPOCH).astype('i8'), 0, PATH_DAYS - 1)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0, 0.017, PATH_DAYS))[days])
+        open_ = np.concatenate([close[:1], close[:-1]])
+        values = {
+            'Close': close,
+            'High': np.maximum(open_, close) * 1.01,
+            'Low': np.minimum(open_, close) * 0.99,
+            'Open': open_,
+            'Volume': np.floor(rng.uniform(1e6, 1e7, PATH_DAYS))[days]
+        }
+        data = pd.DataFrame({field: values[field] for field in COLUMNS}, index=index)
+        if self.multiindex:
+            data.columns = pd.MultiIndex.from_tuples([(field, symbol) for field in COLUMNS],
+                                                     names=['Price', 'Ticker'])
+        return data
@@ -0,0 +1,188 @@
+"""
+Concurrent HTTP load driver for the API.
+
+Sends requests to each endpoint from a pool of client threads and reports
+p50/p95/p99 latency and requests per second per endpoint. By default the
+app is started in-process on a local port with the offline fake
+downloader, an empty temporary OHLCV store and a configurable cache TTL,
+so results are reproducible; --url targets an already running server.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 16 --requests 500 --latency 0.05
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --endpoint "/api/check"
+
+Драйвер конкурентного HTTP-навантаження для API.
+
+Надсилає запити до кожного ендпоінту з пулу клієнтських потоків і звітує
+про затримки p50/p95/p99 та кількість запитів на секунду для кожного
+ендпоінту. За замовчуванням застосунок запускається в процесі на локальному
+порту з офлайн-завантажувачем, порожнім тимчасовим сховищем OHLCV та
+налаштовуваним TTL кешу, тому результати відтворювані; --url спрямовує
+навантаження на вже запущений сервер.
+"""
+
+import argparse
+import http.client
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from common import save_results, summarize
+from fake_yahoo import FakeDownload
+
+ENDPOINTS = (
+    '/api/stock-data?symbol={symbol}&period=1y',
+    '/api/stock-data?symbol={symbol}&period=5y&format=columns&max_points=800',
+    '/api/stock-data?symbol={symbol}&period=1mo&demo=true',
+    '/api/stock-data?symbol={symbol}&period=1mo&static=true',
+    '/api/stock-data/batch?symbols=AAPL,MSFT,GOOG,AMZN&period=6mo',
+    '/api/indicators?symbol={symbol}&period=1y&ind=sma:20,rsi:14'
+)
+
+SYMBOLS = ('AAPL', 'MSFT', 'GOOG', 'AMZN', 'NVDA', 'META', 'TSLA', 'JPM')
+
+
+def start_local_server(latency, cache_ttl, fail_rate):
+    """
+    Start the app in-process with the fake downloader; return (base_url, server).
+
+    Запускає застосунок у процесі з фейковим завантажувачем; повертає (base_url, server).
+    """
+    # Settings read at import time must be set before importing the app
+    # Налаштування, що зчитуються при імпорті, задаються до імпорту застосунку
+    os.environ.setdefault('OHLCV_STORE_DIR', tempfile.mkdtemp(prefix='bench-ohlcv-'))
+    os.environ['STOCK_CACHE_TTL'] = str(cache_ttl)
+    os.environ['OHLCV_REFRESH_SECONDS'] = str(cache_ttl)
+
+    from werkzeug.serving import make_server
+
+    import app as dashboard
+    dashboard.downloader = FakeDownload(latency=latency, fail_rate=fail_rate)
+
+    server = make_server('127.0.0.1', 0, dashboard.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-server', daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+class Client(threading.local):
+    """
+    One keep-alive HTTP connection per client thread.
+
+    Одне постійне HTTP-з'єднання на клієнтський потік.
+    """
+
+    def __init__(self, base_url):
+        self.parsed = urllib.parse.urlsplit(base_url)
+        self.conn = None
+
+    def get(self, path, timeout):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.parsed.hostname, self.parsed.port, timeout=timeout)
+        try:
+            self.conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = None
+            raise
+
+
+def run_endpoint(client, template, total, concurrency, timeout):
+    """
+    Send ``total`` requests for one endpoint and collect latencies.
+
+    Надсилає ``total`` запитів до одного ендпоінту та збирає затримки.
+    """
+    lock = threading.Lock()
+    samples, errors, statuses = [], 0, {}
+
+    def one(i):
+        nonlocal errors
+        path = template.format(symbol=SYMBOLS[i % len(SYMBOLS)])
+        start = time.perf_counter()
+        try:
+            status = client.get(path, timeout)
+        except Exception:
+            status = 'error'
+        elapsed = time.perf_counter() - start
+        with lock:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status == 'error' or status >= 500:
+                errors += 1
+            else:
+                samples.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    result = summarize(samples)
+    result.update({
+        'requests': total,
+        'errors': errors,
+        'statuses': statuses,
+        'wall_seconds': wall,
+        'rps': total / wall if wall else 0.0
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', help='Base URL of a running server (default: start one in-process)')
+    parser.add_argument('--endpoint', action='append',
+                        help='Path template to load, {symbol} is substituted; repeatable')
+    parser.add_argument('--requests', type=int, default=300, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Fake upstream latency in seconds (in-process mode)')
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                        help='Fraction of fake upstream calls that fail (in-process mode)')
+    parser.add_argument('--cache-ttl', type=float, default=60.0,
+                        help='Stock cache TTL in seconds (in-process mode)')
+    parser.add_argument('--output', help='Write results as JSON to this file '
+                                         '(default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        logging.disable(logging.WARNING)
+        base_url, server = start_local_server(args.latency, args.cache_ttl, args.fail_rate)
+
+    client = Client(base_url)
+    endpoints = {}
+    try:
+        for template in args.endpoint or ENDPOINTS:
+            endpoints[template] = run_endpoint(client, template, args.requests, args.concurrency, args.timeout)
+            stats = endpoints[template]
+            print(f"{template}\n  rps={stats['rps']:.1f} p50={stats.get('p50_ms', 0):.1f}ms "
+                  f"p95={stats.get('p95_ms', 0):.1f}ms p99={stats.get('p99_ms', 0):.1f}ms "
+                  f"errors={stats['errors']}")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    results = {
+        'base_url': base_url if args.url else 'in-process',
+        'requests_per_endpoint': args.requests,
+        'concurrency': args.concurrency,
+        'fake_latency': None if args.url else args.latency,
+        'fail_rate': None if args.url else args.fail_rate,
+        'cache_ttl': None if args.url else args.cache_ttl,
+        'endpoints': endpoints
+    }
+    print(f"Saved to {save_results('load', results, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+In-process cache for upstream stock data.
+
+Provides a bounded TTL/LRU cache with single-flight loading and
+stale-while-revalidate, used in front of the Yahoo Finance downloader.
+
+Внутрішньопроцесний кеш для даних акцій.
+
+Надає обмежений TTL/LRU кеш з об'єднанням одночасних завантажень
+та поверненням застарілих даних під час оновлення.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(symbol, period, interval='1d'):
+    """
+    Build a normalized cache key for a stock data request.
+
+    Args:
+        symbol (str): Stock symbol (e.g., ' aapl ')
+        period (str): Time period (e.g., '1MO')
+        interval (str): Bar interval (e.g., '1d')
+
+    Returns:
+        tuple: Normalized (symbol, period, interval) key
+
+    Формує нормалізований ключ кешу для запиту даних акцій.
+
+    Аргументи:
+        symbol (str): Символ акції (напр., ' aapl ')
+        period (str): Часовий період (напр., '1MO')
+        interval (str): Інтервал бару (напр., '1d')
+
+    Повертає:
+        tuple: Нормалізований ключ (symbol, period, interval)
+    """
+    return (symbol.strip().upper(), period.strip().lower(), interval.strip().lower())
+
+
+class _Entry:
+    """
+    A cached value together with the time it was stored.
+
+    Кешоване значення разом із часом його збереження.
+    """
+
+    __slots__ = ('value', 'stored_at')
+
+    def __init__(self, value, stored_at):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class _Flight:
+    """
+    An in-progress load that concurrent callers can wait on.
+
+    Завантаження, що виконується, на яке можуть чекати одночасні виклики.
+    """
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with LRU eviction and single-flight loading.
+
+    Entries younger than ``ttl`` seconds are fresh. Entries older than
+    ``ttl`` but younger than ``ttl + stale_ttl`` are served as-is while a
+    single background refresh runs. Concurrent misses for the same key
+    share one call to the loader. If reloading an expired entry fails, the
+    expired value is returned instead of the error.
+
+    Args:
+        maxsize (int): Maximum number of entries before LRU eviction
+        ttl (float): Seconds an entry stays fresh
+        stale_ttl (float): Extra seconds an expired entry may be served
+            while it is revalidated in the background
+        clock (callable): Monotonic time source, replaceable in tests
+
+    Потокобезпечний TTL кеш з LRU витісненням та єдиним завантаженням.
+
+    Записи, молодші за ``ttl`` секунд, вважаються свіжими. Записи, старші
+    за ``ttl``, але молодші за ``ttl + stale_ttl``, повертаються як є,
+    поки у фоні виконується одне оновлення. Одночасні промахи для одного
+    ключа використовують один виклик завантажувача. Якщо перезавантаження
+    застарілого запису не вдається, замість помилки повертається застаріле значення.
+
+    Аргументи:
+        maxsize (int): Максимальна кількість записів до LRU витіснення
+        ttl (float): Кількість секунд, протягом яких запис свіжий
+        stale_ttl (float): Додаткові секунди, протягом яких застарілий
+            запис може повертатися під час фонового оновлення
+        clock (callable): Монотонне джерело часу, замінюване в тестах
+    """
+
+    def __init__(self, maxsize=256, ttl=60.0, stale_ttl=300.0, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_errors = 0
+        self.stale_on_error = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for ``key``, loading it on a miss.
+
+        Args:
+            key (hashable): Cache key, usually from ``make_key``
+            loader (callable): Zero-argument function producing the value
+
+        Returns:
+            object: Cached or freshly loaded value
+
+        Повертає кешоване значення для ``key``, завантажуючи його при промаху.
+
+        Аргументи:
+            key (hashable): Ключ кешу, зазвичай із ``make_key``
+            loader (callable): Функція без аргументів, що повертає значення
+
+        Повертає:
+            object: Кешоване або щойно завантажене значення
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._flights:
+                        self._start_background_refresh(key, loader)
+                    return entry.value
+
+            self.misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if leader:
+            self._run_flight(key, loader, flight)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            if entry is not None:
+                # Serve the expired value rather than failing
+                # Повернення застарілого значення замість помилки
+                with self._lock:
+                    self.stale_on_error += 1
+                return entry.value
+            raise flight.error
+        return flight.value
+
+    def _start_background_refresh(self, key, loader):
+        """
+        Start one background reload of ``key``. Caller must hold the lock.
+
+        Запускає одне фонове перезавантаження ``key``. Викликач має тримати блокування.
+        """
+        flight = _Flight()
+        self._flights[key] = flight
+        thread = threading.Thread(target=self._run_flight, args=(key, loader, flight),
+                                  name=f"cache-refresh-{key}", daemon=True)
+        thread.start()
+
+    def _run_flight(self, key, loader, flight):
+        """
+        Call the loader, store the result and release waiting callers.
+
+        Викликає завантажувач, зберігає результат та звільняє очікуючих.
+        """
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            logger.warning(f"Cache load failed for {key}: {e}")
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._store(key, flight.value)
+                else:
+                    self.load_errors += 1
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key, value):
+        """
+        Insert a value and evict least recently used entries. Caller must hold the lock.
+
+        Додає значення та витісняє найдавніше використані записи. Викликач має тримати блокування.
+        """
+        self._entries[key] = _Entry(value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(self, key, loader):
+        """
+        Reload ``key`` now and store the result, joining a load already in progress.
+        The current entry keeps being served until the new value is stored.
+
+        Args:
+            key (hashable): Cache key, usually from ``make_key``
+            loader (callable): Zero-argument function producing the value
+
+        Returns:
+            object: Freshly loaded value
+
+        Перезавантажує ``key`` зараз і зберігає результат, приєднуючись до вже
+        запущеного завантаження. Поточний запис повертається, доки нове значення
+        не буде збережено.
+
+        Аргументи:
+            key (hashable): Ключ кешу, зазвичай із ``make_key``
+            loader (callable): Функція без аргументів, що повертає значення
+
+        Повертає:
+            object: Щойно завантажене значення
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if leader:
+            self._run_flight(key, loader, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def invalidate(self, key=None):
+        """
+        Drop one entry, or every entry when ``key`` is None.
+
+        Видаляє один запис або всі записи, якщо ``key`` дорівнює None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Return cache counters as a dictionary.
+
+        Повертає лічильники кешу у вигляді словника.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_errors": self.load_errors,
+                "stale_on_error": self.stale_on_error,
+                "in_flight": len(self._flights)
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
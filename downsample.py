@@ -0,0 +1,228 @@
+"""
+Server-side downsampling of long price histories.
+
+Largest-Triangle-Three-Buckets (LTTB) for line charts, OHLC-preserving
+bucket aggregation for candlestick charts and calendar resampling of
+daily bars into weekly, monthly or quarterly bars, all over NumPy arrays.
+
+Зменшення кількості точок довгих історій цін на сервері.
+
+Алгоритм Largest-Triangle-Three-Buckets (LTTB) для лінійних графіків,
+агрегація бакетів зі збереженням OHLC для графіків "японських свічок" та
+календарне перегрупування денних барів у тижневі, місячні чи квартальні,
+усе над масивами NumPy.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Calendar intervals built from daily bars
+# Календарні інтервали, що будуються з денних барів
+RESAMPLE_INTERVALS = ('1wk', '1mo', '1q')
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select the indices of points to keep using Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Each inner bucket keeps the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. The choice depends on the previous
+    bucket, so buckets are visited in order, but all candidates of a
+    bucket are scored in one NumPy operation.
+
+    Args:
+        x (ndarray): Monotonic x values (e.g., timestamps as numbers)
+        y (ndarray): y values of the same length
+        n_out (int): Number of points to keep
+
+    Returns:
+        ndarray: Sorted indices of the kept points
+
+    Вибирає індекси точок для збереження за алгоритмом Largest-Triangle-Three-Buckets.
+
+    Перша та остання точки зберігаються завжди. Кожен внутрішній бакет
+    зберігає точку, що утворює найбільший трикутник з попередньою
+    збереженою точкою та середнім наступного бакета. Вибір залежить від
+    попереднього бакета, тому бакети обробляються по черзі, але всі
+    кандидати бакета оцінюються однією операцією NumPy.
+
+    Аргументи:
+        x (ndarray): Монотонні значення x (напр., мітки часу як числа)
+        y (ndarray): Значення y тієї ж довжини
+        n_out (int): Кількість точок для збереження
+
+    Повертає:
+        ndarray: Відсортовані індекси збережених точок
+    """
+    x = np.asarray(x, dtype='f8')
+    y = np.asarray(y, dtype='f8')
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.unique([0, n - 1])[:max(n_out, 0)]
+
+    # NaN gaps must not win or poison the triangle areas
+    # Пропуски NaN не повинні перемагати або псувати площі трикутників
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+def bucket_starts(n, n_out):
+    """
+    Split ``n`` rows into at most ``n_out`` contiguous, nearly equal buckets.
+
+    Returns:
+        ndarray: Start index of every bucket
+
+    Розбиває ``n`` рядків на не більше ніж ``n_out`` суцільних, майже рівних бакетів.
+
+    Повертає:
+        ndarray: Початковий індекс кожного бакета
+    """
+    return np.unique(np.linspace(0, n, n_out, endpoint=False).astype(np.int64))
+
+
+def aggregate_ohlc(data, starts):
+    """
+    Aggregate OHLCV rows into buckets starting at ``starts``.
+    Each bucket keeps the first open, max high, min low, last close and
+    summed volume, and is labeled with the date of its first row.
+
+    Args:
+        data (DataFrame): OHLCV data with a DatetimeIndex
+        starts (ndarray): Sorted start index of every bucket, beginning with 0
+
+    Returns:
+        DataFrame: One row per bucket
+
+    Агрегує рядки OHLCV у бакети, що починаються з ``starts``.
+    Кожен бакет зберігає перше відкриття, максимум, мінімум, останнє
+    закриття та суму обсягів і позначається датою свого першого рядка.
+
+    Аргументи:
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+        starts (ndarray): Відсортовані початкові індекси бакетів, починаючи з 0
+
+    Повертає:
+        DataFrame: Один рядок на бакет
+    """
+    if len(data) == 0:
+        return data
+    ends = np.append(starts[1:], len(data)) - 1
+    columns = {}
+    if 'Open' in data.columns:
+        columns['Open'] = data['Open'].to_numpy(dtype='f8', na_value=np.nan)[starts]
+    if 'High' in data.columns:
+        columns['High'] = np.fmax.reduceat(data['High'].to_numpy(dtype='f8', na_value=np.nan), starts)
+    if 'Low' in data.columns:
+        columns['Low'] = np.fmin.reduceat(data['Low'].to_numpy(dtype='f8', na_value=np.nan), starts)
+    if 'Close' in data.columns:
+        columns['Close'] = data['Close'].to_numpy(dtype='f8', na_value=np.nan)[ends]
+    if 'Volume' in data.columns:
+        volume = np.nan_to_num(data['Volume'].to_numpy(dtype='f8', na_value=np.nan))
+        columns['Volume'] = np.add.reduceat(volume, starts)
+    return pd.DataFrame(columns, index=data.index[starts])
+
+
+def downsample_ohlc(data, max_points):
+    """
+    Reduce OHLCV data to at most ``max_points`` bucket-aggregated bars.
+
+    Зменшує дані OHLCV до не більше ніж ``max_points`` агрегованих барів.
+    """
+    if len(data) <= max_points:
+        return data
+    return aggregate_ohlc(data, bucket_starts(len(data), max_points))
+
+
+def downsample_trend(data, max_points):
+    """
+    Reduce the close-price series to at most ``max_points`` points with LTTB.
+
+    Args:
+        data (DataFrame): OHLCV data with a DatetimeIndex
+        max_points (int): Maximum number of points to keep
+
+    Returns:
+        DataFrame: Selected rows of ``data``
+
+    Зменшує ряд цін закриття до не більше ніж ``max_points`` точок за допомогою LTTB.
+
+    Аргументи:
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+        max_points (int): Максимальна кількість точок для збереження
+
+    Повертає:
+        DataFrame: Вибрані рядки ``data``
+    """
+    if len(data) <= max_points:
+        return data
+    x = pd.DatetimeIndex(data.index).asi8
+    indices = lttb_indices(x, data['Close'].to_numpy(dtype='f8', na_value=np.nan), max_points)
+    return data.iloc[indices]
+
+
+def calendar_starts(index, interval):
+    """
+    Find where each calendar week, month or quarter begins in a sorted index.
+    Weeks start on Monday.
+
+    Args:
+        index (DatetimeIndex): Sorted bar dates
+        interval (str): One of RESAMPLE_INTERVALS
+
+    Returns:
+        ndarray: Start index of every calendar bucket, beginning with 0
+
+    Знаходить, де починається кожен календарний тиждень, місяць або квартал
+    у відсортованому індексі. Тижні починаються з понеділка.
+
+    Аргументи:
+        index (DatetimeIndex): Відсортовані дати барів
+        interval (str): Одне з RESAMPLE_INTERVALS
+
+    Повертає:
+        ndarray: Початковий індекс кожного календарного бакета, починаючи з 0
+    """
+    if interval not in RESAMPLE_INTERVALS:
+        raise ValueError(f"Unsupported resample interval: {interval}")
+    stamps = pd.DatetimeIndex(index).to_numpy(dtype='datetime64[ns]')
+    if interval == '1wk':
+        # 1970-01-01 was a Thursday, shift by 3 days so weeks start on Monday
+        # 1970-01-01 був четвер, зсув на 3 дні, щоб тижні починалися з понеділка
+        keys = (stamps.astype('datetime64[D]').astype(np.int64) + 3) // 7
+    else:
+        keys = stamps.astype('datetime64[M]').astype(np.int64)
+        if interval == '1q':
+            keys = keys // 3
+    return np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1))
+
+
+def resample_ohlc(data, interval):
+    """
+    Aggregate daily OHLCV bars into weekly ('1wk'), monthly ('1mo') or quarterly ('1q') bars.
+
+    Агрегує денні бари OHLCV у тижневі ('1wk'), місячні ('1mo') або квартальні ('1q').
+    """
+    if len(data) == 0:
+        return data
+    return aggregate_ohlc(data, calendar_starts(data.index, interval))
@@ -0,0 +1,227 @@
+"""
+Streaming encoders for bulk stock data exports.
+
+Each writer turns one symbol's OHLCV frame at a time into bytes, so an
+export of any number of symbols can be sent as a chunked response while
+only the current symbol is held in memory. CSV and NDJSON are written in
+row chunks; Parquet (requires pyarrow) writes one row group per symbol.
+
+Потокові кодувальники для масового експорту даних акцій.
+
+Кожен записувач перетворює DataFrame з OHLCV одного символу за раз на
+байти, тому експорт будь-якої кількості символів можна надіслати
+частинами, тримаючи в пам'яті лише поточний символ. CSV та NDJSON
+записуються частинами рядків; Parquet (потребує pyarrow) записує одну
+групу рядків на символ.
+"""
+
+import numpy as np
+import pandas as pd
+
+from serialization import FIELDS, dumps_json, format_dates
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Formats accepted by /api/export
+# Формати, які приймає /api/export
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+
+# Rows encoded per chunk by the text writers
+# Кількість рядків на частину для текстових записувачів
+CHUNK_ROWS = 10000
+
+COLUMNS = ('Symbol', 'Date') + FIELDS + ('IsDemo', 'Source')
+
+
+def export_columns(symbol, data, source, is_demo=None):
+    """
+    Build the export columns for one symbol.
+
+    Args:
+        symbol (str): Stock symbol
+        data (DataFrame): OHLCV data with a DatetimeIndex
+        source (str): Data source returned by load_stock_frame
+        is_demo (bool): IsDemo value; defaults to whether the source is 'demo'
+
+    Returns:
+        DataFrame: Columns in COLUMNS order with formatted dates
+
+    Формує стовпці експорту для одного символу.
+
+    Аргументи:
+        symbol (str): Символ акції
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+        source (str): Джерело даних, повернуте load_stock_frame
+        is_demo (bool): Значення IsDemo; за замовчуванням - чи є джерелом 'demo'
+
+    Повертає:
+        DataFrame: Стовпці в порядку COLUMNS з відформатованими датами
+    """
+    n = len(data)
+    columns = {'Symbol': np.full(n, symbol, dtype=object), 'Date': format_dates(data.index)}
+    for field in FIELDS:
+        if field in data.columns:
+            columns[field] = data[field].to_numpy(dtype='f8', na_value=np.nan)
+        else:
+            columns[field] = np.full(n, np.nan)
+    columns['IsDemo'] = np.full(n, source == 'demo' if is_demo is None else bool(is_demo))
+    columns['Source'] = np.full(n, source, dtype=object)
+    return pd.DataFrame(columns, columns=list(COLUMNS))
+
+
+class CsvWriter:
+    """
+    CSV with one header line; missing values are left empty.
+
+    CSV з одним рядком заголовка; відсутні значення залишаються порожніми.
+    """
+
+    mimetype = 'text/csv'
+    extension = 'csv'
+
+    def header(self):
+        return (','.join(COLUMNS) + '\n').encode('utf-8')
+
+    def write(self, symbol, data, source, is_demo=None):
+        frame = export_columns(symbol, data, source, is_demo)
+        for start in range(0, len(frame), CHUNK_ROWS):
+            yield frame.iloc[start:start + CHUNK_ROWS].to_csv(header=False, index=False).encode('utf-8')
+
+    def close(self):
+        return b''
+
+
+class NdjsonWriter:
+    """
+    One JSON object per bar and line; NaN becomes null.
+
+    Один JSON-об'єкт на бар і рядок; NaN стає null.
+    """
+
+    mimetype = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def header(self):
+        return b''
+
+    def write(self, symbol, data, source, is_demo=None):
+        frame = export_columns(symbol, data, source, is_demo)
+        for start in range(0, len(frame), CHUNK_ROWS):
+            records = frame.iloc[start:start + CHUNK_ROWS].to_dict(orient='records')
+            yield b''.join(dumps_json(record) + b'\n' for record in records)
+
+    def close(self):
+        return b''
+
+
+class _ChunkSink:
+    """
+    Write-only file object that hands out what was written since the last drain.
+
+    Файловий об'єкт лише для запису, що віддає записане з останнього спорожнення.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        body = b''.join(self._chunks)
+        self._chunks = []
+        return body
+
+
+class ParquetWriter:
+    """
+    Parquet file written as one row group per symbol; requires pyarrow.
+
+    Файл Parquet, що записується однією групою рядків на символ; потребує pyarrow.
+    """
+
+    mimetype = 'application/vnd.apache.parquet'
+    extension = 'parquet'
+
+    def __init__(self):
+        import pyarrow.parquet as pq
+        self._schema = pa.schema([('Symbol', pa.string()), ('Date', pa.timestamp('ms'))]
+                                 + [(field, pa.float64()) for field in FIELDS]
+                                 + [('IsDemo', pa.bool_()), ('Source', pa.string())])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression='snappy')
+
+    def header(self):
+        return self._sink.drain()
+
+    def write(self, symbol, data, source, is_demo=None):
+        n = len(data)
+        is_demo = source == 'demo' if is_demo is None else bool(is_demo)
+        arrays = [pa.array(np.full(n, symbol, dtype=object), pa.string()),
+                  pa.array(pd.DatetimeIndex(data.index).tz_localize(None).to_numpy(dtype='datetime64[ms]'))]
+        for field in FIELDS:
+            values = data[field].to_numpy(dtype='f8', na_value=np.nan) if field in data.columns else np.full(n, np.nan)
+            arrays.append(pa.array(values, from_pandas=True))
+        arrays.append(pa.array(np.full(n, is_demo)))
+        arrays.append(pa.array(np.full(n, source, dtype=object), pa.string()))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        yield self._sink.drain()
+
+    def close(self):
+        self._writer.close()
+        return self._sink.drain()
+
+
+def export_available(fmt):
+    """
+    Check whether an export format can be produced in this environment.
+
+    Перевіряє, чи можна створити формат експорту в цьому середовищі.
+    """
+    return fmt != 'parquet' or pa is not None
+
+
+def make_writer(fmt):
+    """
+    Create the streaming writer for an export format.
+
+    Args:
+        fmt (str): One of EXPORT_FORMATS
+
+    Returns:
+        object: Writer with mimetype, extension, header(), write() and close()
+
+    Створює потоковий записувач для формату експорту.
+
+    Аргументи:
+        fmt (str): Одне з EXPORT_FORMATS
+
+    Повертає:
+        object: Записувач з mimetype, extension, header(), write() та close()
+    """
+    if fmt == 'csv':
+        return CsvWriter()
+    if fmt == 'ndjson':
+        return NdjsonWriter()
+    if fmt == 'parquet':
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        return ParquetWriter()
+    raise ValueError(f"Unsupported export format: {fmt}")
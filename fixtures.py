@@ -0,0 +1,294 @@
+"""
+Preloaded static/offline fixture data.
+
+The packaged fixture file (data/static_fixture.json) holds curated bars,
+a default series for unknown symbols and a universe of symbols with
+generated multi-year history. It is compiled once into a memory-mapped
+NumPy file, so gunicorn workers share the same pages, and responses are
+pre-serialized per (symbol, period, format) together with an ETag.
+Only the curated bars are real; generated universe symbols and rescaled
+default series are synthetic and flagged with IsDemo. The file is compiled
+on first use, or explicitly before workers fork (see gunicorn.conf.py).
+
+Попередньо завантажені статичні/офлайн дані.
+
+Файл фікстур (data/static_fixture.json) містить підібрані бари, стандартний
+ряд для невідомих символів та набір символів зі згенерованою багаторічною
+історією. Він один раз компілюється у NumPy-файл з відображенням у пам'ять,
+тому воркери gunicorn спільно використовують ті самі сторінки, а відповіді
+заздалегідь серіалізуються для кожної комбінації (символ, період, формат)
+разом з ETag. Реальними є лише підібрані бари; згенеровані символи набору та
+масштабовані стандартні ряди синтетичні й позначаються IsDemo. Файл
+компілюється при першому використанні або явно до створення воркерів
+(див. gunicorn.conf.py).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import TTLCache
+from ohlcv_store import BAR_DTYPE, FIELDS, bars_to_frame, frame_to_bars, period_start
+from serialization import dumps_json, frame_to_columns, format_dates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'static_fixture.json')
+
+
+def _rows_to_bars(rows):
+    """
+    Convert fixture rows [date, open, high, low, close, volume] to bars.
+
+    Перетворює рядки фікстури [дата, відкриття, максимум, мінімум, закриття, обсяг] на бари.
+    """
+    bars = np.empty(len(rows), dtype=BAR_DTYPE)
+    bars['ts'] = pd.DatetimeIndex([row[0] for row in rows]).as_unit('ns').asi8
+    values = np.array([row[1:] for row in rows], dtype='f8')
+    for i, field in enumerate(FIELDS):
+        bars[field] = values[:, i]
+    return bars
+
+
+def symbol_factor(symbol):
+    """
+    Price multiplier between 0.5 and 1.5 derived from the symbol.
+    Gives unknown symbols unique but consistent prices.
+
+    Множник ціни від 0.5 до 1.5, отриманий із символу.
+    Дає невідомим символам унікальні, але консистентні ціни.
+    """
+    seed = sum(ord(c) for c in symbol.upper())
+    return (seed % 10) / 10 + 0.5
+
+
+class StaticFixtures:
+    """
+    Memory-mapped fixture data with pre-serialized responses.
+
+    Args:
+        path (str): Fixture JSON file
+        cache_dir (str): Directory for the compiled memory-mapped file
+        generate (callable): Function (symbol, period, seed, end) returning an
+            OHLCV DataFrame, used for universe symbols
+        generator_version (int): Version of ``generate``; a change recompiles the fixture
+        max_payloads (int): Maximum number of pre-serialized responses kept
+
+    Фікстурні дані з відображенням у пам'ять та заздалегідь серіалізованими відповідями.
+
+    Аргументи:
+        path (str): JSON-файл фікстури
+        cache_dir (str): Каталог для скомпільованого файлу з відображенням у пам'ять
+        generate (callable): Функція (symbol, period, seed, end), що повертає
+            DataFrame з OHLCV для символів набору
+        generator_version (int): Версія ``generate``; її зміна перекомпілює фікстуру
+        max_payloads (int): Максимальна кількість збережених серіалізованих відповідей
+    """
+
+    def __init__(self, path, cache_dir, generate, generator_version=1, max_payloads=4096):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.generate = generate
+        self.generator_version = generator_version
+        self._payloads = TTLCache(maxsize=max_payloads, ttl=float('inf'), stale_ttl=0)
+        self._lock = threading.Lock()
+        self._bars = None
+        self._index = None
+        self._default = None
+        self._curated = frozenset()
+
+    def load(self):
+        """
+        Load the compiled fixture, compiling it first if it is missing or outdated.
+        The digest covers the fixture file and the generator version, since
+        universe symbols are generated. Call before forking workers so they
+        share the mapping.
+
+        Завантажує скомпільовану фікстуру, спершу компілюючи її, якщо вона
+        відсутня або застаріла. Дайджест охоплює файл фікстури та версію
+        генератора, оскільки символи набору генеруються. Викликайте до
+        створення воркерів, щоб вони спільно використовували відображення.
+        """
+        with self._lock:
+            if self._bars is not None:
+                return self
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw + b'\0generator=%d' % self.generator_version).hexdigest()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            base = os.path.join(self.cache_dir, 'static_fixture')
+            try:
+                with open(base + '.json') as f:
+                    meta = json.load(f)
+                if meta.get('digest') != digest:
+                    raise ValueError("Fixture changed")
+            except (OSError, ValueError):
+                meta = self._compile(json.loads(raw), digest, base)
+            self._bars = np.load(base + '.npy', mmap_mode='r')
+            self._index = {symbol: tuple(span) for symbol, span in meta['index'].items()}
+            fixture = json.loads(raw)
+            self._default = _rows_to_bars(fixture['default'])
+            self._curated = frozenset(symbol.upper() for symbol in fixture['symbols'])
+            logger.info(f"Loaded static fixtures for {len(self._index)} symbols")
+            return self
+
+    def _compile(self, fixture, digest, base):
+        """
+        Build the combined bar array for every fixture symbol and write it atomically.
+
+        Створює об'єднаний масив барів для всіх символів фікстури та атомарно записує його.
+        """
+        logger.info("Compiling static fixtures")
+        parts, index, offset = [], {}, 0
+        for symbol, rows in fixture['symbols'].items():
+            parts.append(_rows_to_bars(rows))
+        symbols = list(fixture['symbols'])
+        universe = fixture.get('universe', {})
+        for symbol in universe.get('symbols', []):
+            if symbol in fixture['symbols']:
+                continue
+            frame = self.generate(symbol, universe['period'], universe['seed'], universe['end'])
+            parts.append(frame_to_bars(frame))
+            symbols.append(symbol)
+        for symbol, bars in zip(symbols, parts):
+            index[symbol] = [offset, offset + len(bars)]
+            offset += len(bars)
+
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.concatenate(parts) if parts else np.empty(0, dtype=BAR_DTYPE))
+        os.replace(tmp, base + '.npy')
+        meta = {'digest': digest, 'index': index}
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.json.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, base + '.json')
+        return meta
+
+    def bars(self, symbol, period=None):
+        """
+        Return fixture bars for a symbol, optionally limited to a period.
+        Unknown symbols get the default series rescaled by ``symbol_factor``.
+        Periods are counted back from the last fixture bar.
+
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period (e.g., '1mo'); None returns every bar
+
+        Returns:
+            ndarray: Bars with BAR_DTYPE
+
+        Повертає бари фікстури для символу, за потреби обмежені періодом.
+        Невідомі символи отримують стандартний ряд, масштабований ``symbol_factor``.
+        Періоди відраховуються від останнього бару фікстури.
+
+        Аргументи:
+            symbol (str): Символ акції
+            period (str): Часовий період (напр., '1mo'); None повертає всі бари
+
+        Повертає:
+            ndarray: Бари з BAR_DTYPE
+        """
+        self.load()
+        symbol = symbol.upper()
+        span = self._index.get(symbol)
+        if span is not None:
+            bars = self._bars[span[0]:span[1]]
+        else:
+            bars = self._default.copy()
+            factor = symbol_factor(symbol)
+            for field in FIELDS:
+                bars[field] *= factor
+            bars['Volume'] = np.floor(bars['Volume'])
+        if period and len(bars):
+            try:
+                start = period_start(period, pd.Timestamp(int(bars['ts'][-1])))
+            except ValueError:
+                return bars
+            bars = bars[np.searchsorted(bars['ts'], start, side='left'):]
+        return bars
+
+    def is_synthetic(self, symbol):
+        """
+        Whether the fixture bars of ``symbol`` are generated rather than curated.
+
+        Чи є бари фікстури для ``symbol`` згенерованими, а не підібраними.
+        """
+        self.load()
+        return symbol.upper() not in self._curated
+
+    def frame(self, symbol, period=None):
+        """
+        Return fixture bars as an OHLCV DataFrame indexed by 'Date'.
+
+        Повертає бари фікстури як DataFrame з OHLCV та індексом 'Date'.
+        """
+        return bars_to_frame(self.bars(symbol, period))
+
+    def records(self, symbol, period=None):
+        """
+        Return fixture bars as a list of stock records.
+
+        Повертає бари фікстури як список записів акцій.
+        """
+        bars = self.bars(symbol, period)
+        is_demo = self.is_synthetic(symbol)
+        columns = {'Date': format_dates(pd.DatetimeIndex(np.asarray(bars['ts']).astype('datetime64[ns]'))).tolist()}
+        for field in FIELDS:
+            columns[field] = bars[field].tolist()
+        columns['Volume'] = [int(v) for v in columns['Volume']]
+        return [
+            {'Date': date, 'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v, 'IsDemo': is_demo}
+            for date, o, h, l, c, v in zip(columns['Date'], columns['Open'], columns['High'],
+                                          columns['Low'], columns['Close'], columns['Volume'])
+        ]
+
+    def payload(self, symbol, period, fmt):
+        """
+        Return the pre-serialized JSON body and its ETag.
+        The body is built on first use and then served from memory.
+
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period
+            fmt (str): 'records' or 'columns'
+
+        Returns:
+            tuple: (JSON bytes, ETag string)
+
+        Повертає заздалегідь серіалізоване JSON-тіло та його ETag.
+        Тіло створюється при першому використанні, а потім віддається з пам'яті.
+
+        Аргументи:
+            symbol (str): Символ акції
+            period (str): Часовий період
+            fmt (str): 'records' або 'columns'
+
+        Повертає:
+            tuple: (JSON-байти, рядок ETag)
+        """
+        key = (symbol.upper(), period, fmt)
+
+        def build():
+            if fmt == 'columns':
+                body = dumps_json(frame_to_columns(self.frame(symbol, period), self.is_synthetic(symbol)))
+            else:
+                body = dumps_json(self.records(symbol, period))
+            return body, hashlib.blake2b(body, digest_size=12).hexdigest()
+
+        return self._payloads.get_or_load(key, build)
+
+    def symbols(self):
+        """
+        Return the symbols with fixture data.
+
+        Повертає символи, для яких є дані фікстури.
+        """
+        self.load()
+        return list(self._index)
@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for serving the dashboard.
+
+The app is built once in the master (``preload_app``) and the static
+fixtures are compiled and mapped there in ``when_ready``, before workers
+fork, so they are shared copy-on-write. Heavy optional modules such as yfinance are
+imported lazily on first use, so worker boot stays cheap. Each worker keeps
+its own /metrics registry, labelled with the worker pid.
+
+Usage:
+    gunicorn          # picks up this file from the working directory
+
+Налаштування Gunicorn для обслуговування панелі.
+
+Застосунок створюється один раз у головному процесі (``preload_app``), а
+статичні фікстури компілюються та відображаються там у ``when_ready`` до
+створення воркерів, тому спільно використовуються за принципом
+копіювання при записі. Важкі необов'язкові модулі, як-от yfinance, імпортуються
+ліниво при першому використанні, тож запуск воркера лишається дешевим. Кожен
+воркер має власний реєстр /metrics з міткою pid воркера.
+"""
+
+import gc
+import os
+
+wsgi_app = 'app:app'
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = True
+
+
+def when_ready(server):
+    # Explicit fixture build step; importing the app does not compile it
+    # Явний крок збирання фікстур; імпорт застосунку їх не компілює
+    from app import static_fixtures
+    static_fixtures.load()
+
+    # Move preloaded objects out of the collector's reach so its
+    # bookkeeping does not dirty shared pages in the workers
+    # Виключення попередньо завантажених об'єктів зі збирача сміття, щоб
+    # його облік не змінював спільні сторінки у воркерах
+    gc.freeze()
@@ -0,0 +1,614 @@
+"""
+Vectorized technical indicators.
+
+Computes SMA, EMA, RSI, MACD, Bollinger bands, ATR, rolling volatility and
+VWAP over OHLCV arrays. Several indicators and window lengths share their
+intermediate results within one pass, and every indicator keeps a small
+state so it can be updated when new bars are appended without
+recomputing the full history.
+
+Векторизовані технічні індикатори.
+
+Обчислює SMA, EMA, RSI, MACD, смуги Боллінджера, ATR, ковзну волатильність
+та VWAP над масивами OHLCV. Кілька індикаторів та довжин вікон спільно
+використовують проміжні результати в межах одного проходу, а кожен
+індикатор зберігає невеликий стан, щоб оновлюватися при додаванні нових
+барів без перерахунку всієї історії.
+"""
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# Bars per year used to annualize daily volatility
+# Кількість барів на рік для річної волатильності
+TRADING_DAYS = 252
+
+# Updates with at most this many bars use a plain recursion loop
+# Оновлення з не більше ніж такою кількістю барів використовують простий цикл
+SHORT_UPDATE = 16
+
+
+def _arrays(data):
+    """
+    Extract float arrays for every OHLCV field of a DataFrame.
+
+    Витягує масиви float для кожного поля OHLCV з DataFrame.
+    """
+    return {field: data[field].to_numpy(dtype='f8', na_value=np.nan)
+            for field in FIELDS if field in data.columns}
+
+
+def _concat(tail, arrays):
+    """
+    Prepend stored tail arrays to new arrays, field by field.
+
+    Додає збережені хвостові масиви перед новими, поле за полем.
+    """
+    return {field: np.concatenate([tail[field], values]) for field, values in arrays.items()}
+
+
+def ema(values, alpha, prev=None):
+    """
+    Exponential moving average, optionally continuing from a previous value.
+
+    Args:
+        values (ndarray): Input series
+        alpha (float): Smoothing factor in (0, 1]
+        prev (float): Last EMA value of the preceding bars, if any
+
+    Returns:
+        ndarray: EMA of ``values``
+
+    Експоненційне ковзне середнє, за потреби продовжене від попереднього значення.
+
+    Аргументи:
+        values (ndarray): Вхідний ряд
+        alpha (float): Коефіцієнт згладжування в (0, 1]
+        prev (float): Останнє значення EMA попередніх барів, якщо є
+
+    Повертає:
+        ndarray: EMA для ``values``
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    # NaN bars are skipped and carry the last value; ignore_na keeps the
+    # recursion free of gap weights, so a continued EMA matches a full one
+    # Бари NaN пропускаються й зберігають останнє значення; ignore_na прибирає
+    # ваги пропусків з рекурсії, тож продовжене EMA збігається з повним
+    if prev is None or np.isnan(prev):
+        return pd.Series(values).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
+    if len(values) <= SHORT_UPDATE:
+        # A plain loop beats pandas overhead for a few appended bars
+        # Простий цикл швидший за накладні витрати pandas для кількох нових барів
+        out = np.empty(len(values))
+        for i, value in enumerate(values.tolist()):
+            prev = prev + alpha * (value - prev) if value == value else prev
+            out[i] = prev
+        return out
+    # Seeding with the previous value continues the recursion exactly
+    # Додавання попереднього значення точно продовжує рекурсію
+    seeded = np.concatenate([[prev], values])
+    return pd.Series(seeded).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()[1:]
+
+
+def _last(values):
+    """
+    Return the last element of an array as a float, NaN when empty.
+
+    Повертає останній елемент масиву як float, NaN якщо масив порожній.
+    """
+    return float(values[-1]) if len(values) else float('nan')
+
+
+class _Context:
+    """
+    Memoized intermediate results shared by indicators within one pass.
+
+    Мемоізовані проміжні результати, спільні для індикаторів в одному проході.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self._memo = {}
+
+    def _cached(self, key, func):
+        if key not in self._memo:
+            self._memo[key] = func()
+        return self._memo[key]
+
+    def cumsum(self, field, power=1):
+        """
+        Cumulative sum of a centered field (or its square) with a leading zero.
+        Centering keeps rolling variances numerically stable. NaN bars add
+        zero; ``counts`` tells which windows contain them.
+
+        Кумулятивна сума центрованого поля (або його квадрата) з початковим нулем.
+        Центрування зберігає чисельну стабільність ковзних дисперсій. Бари NaN
+        додають нуль; ``counts`` показує, які вікна їх містять.
+        """
+        def compute():
+            values = np.nan_to_num(self.arrays[field] - self.center(field), nan=0.0)
+            return np.concatenate([[0.0], np.cumsum(values ** power)])
+        return self._cached(('cumsum', field, power), compute)
+
+    def counts(self, field):
+        """
+        Cumulative count of valid (non-NaN) values with a leading zero.
+
+        Кумулятивна кількість коректних (не NaN) значень з початковим нулем.
+        """
+        return self._cached(('counts', field), lambda: np.concatenate(
+            [[0], np.cumsum(~np.isnan(self.arrays[field]), dtype=np.int64)]))
+
+    def center(self, field):
+        def compute():
+            values = self.arrays[field]
+            return float(np.nanmean(values)) if np.isfinite(values).any() else 0.0
+        return self._cached(('center', field), compute)
+
+    def _full_windows(self, field, window):
+        """
+        Mask of bars whose trailing ``window`` bars are all valid.
+
+        Маска барів, останні ``window`` барів яких усі коректні.
+        """
+        cc = self.counts(field)
+        return (cc[window:] - cc[:-window]) == window
+
+    def rolling_mean(self, field, window):
+        """
+        Rolling mean over ``window`` bars; NaN until the window is full and
+        wherever the window contains a NaN, like pandas ``rolling``.
+
+        Ковзне середнє за ``window`` барів; NaN, доки вікно не заповнене, та
+        там, де вікно містить NaN, як у pandas ``rolling``.
+        """
+        def compute():
+            cs = self.cumsum(field)
+            out = np.full(len(cs) - 1, np.nan)
+            if len(out) >= window:
+                mean = (cs[window:] - cs[:-window]) / window + self.center(field)
+                out[window - 1:] = np.where(self._full_windows(field, window), mean, np.nan)
+            return out
+        return self._cached(('mean', field, window), compute)
+
+    def rolling_std(self, field, window):
+        """
+        Rolling population standard deviation over ``window`` bars; NaN
+        wherever the window is incomplete or contains a NaN.
+
+        Ковзне стандартне відхилення генеральної сукупності за ``window`` барів;
+        NaN там, де вікно неповне або містить NaN.
+        """
+        def compute():
+            cs = self.cumsum(field)
+            cs2 = self.cumsum(field, 2)
+            out = np.full(len(cs) - 1, np.nan)
+            if len(out) >= window:
+                mean = (cs[window:] - cs[:-window]) / window
+                var = (cs2[window:] - cs2[:-window]) / window - mean ** 2
+                std = np.sqrt(np.maximum(var, 0.0))
+                out[window - 1:] = np.where(self._full_windows(field, window), std, np.nan)
+            return out
+        return self._cached(('std', field, window), compute)
+
+    def ema(self, field, alpha):
+        return self._cached(('ema', field, alpha), lambda: ema(self.arrays[field], alpha))
+
+    def log_returns(self):
+        """
+        Log returns of the close price, NaN for the first bar.
+
+        Логарифмічні прибутковості ціни закриття, NaN для першого бару.
+        """
+        def compute():
+            close = self.arrays['Close']
+            out = np.full(len(close), np.nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out[1:] = np.log(close[1:] / close[:-1])
+            return out
+        return self._cached(('logret',), compute)
+
+
+class Indicator:
+    """
+    Base class for indicators.
+
+    ``run(arrays, state)`` returns the outputs for ``arrays`` and the state
+    needed to continue with the next bars. A ``state`` of None means the
+    arrays start at the beginning of the history.
+
+    Базовий клас для індикаторів.
+
+    ``run(arrays, state)`` повертає результати для ``arrays`` та стан,
+    потрібний для продовження з наступними барами. ``state``, що дорівнює
+    None, означає, що масиви починаються з початку історії.
+    """
+
+    name = None
+    defaults = ()
+    # Leading parameters that are window lengths in bars, and their minimum
+    # Початкові параметри, що є довжинами вікон у барах, та їхній мінімум
+    windows = 0
+    min_window = 1
+
+    def __init__(self, *params):
+        self.params = params or self.defaults
+        self.key = '_'.join([self.name] + [_format_param(p) for p in self.params])
+
+    def run(self, arrays, state=None, ctx=None):
+        raise NotImplementedError
+
+
+class _WindowedIndicator(Indicator):
+    """
+    Indicator depending only on the last ``lookback`` bars.
+    Updates recompute over the stored tail plus the new bars.
+
+    Індикатор, що залежить лише від останніх ``lookback`` барів.
+    Оновлення перераховуються над збереженим хвостом та новими барами.
+    """
+
+    def lookback(self):
+        return int(self.params[0])
+
+    def run(self, arrays, state=None, ctx=None):
+        skip = 0
+        if state is not None:
+            skip = len(state['tail']['Close'])
+            arrays = _concat(state['tail'], arrays)
+            ctx = None
+        if ctx is None:
+            ctx = _Context(arrays)
+        outputs = {key: values[skip:] for key, values in self.compute(ctx).items()}
+        keep = self.lookback()
+        tail = {field: values[-keep:].copy() for field, values in arrays.items()}
+        return outputs, {'tail': tail}
+
+    def compute(self, ctx):
+        raise NotImplementedError
+
+
+class SMA(_WindowedIndicator):
+    """
+    Simple moving average of the close price.
+
+    Просте ковзне середнє ціни закриття.
+    """
+
+    name = 'sma'
+    defaults = (20,)
+    windows = 1
+
+    def compute(self, ctx):
+        return {self.key: ctx.rolling_mean('Close', int(self.params[0]))}
+
+
+class BollingerBands(_WindowedIndicator):
+    """
+    Bollinger bands: rolling mean plus/minus k standard deviations.
+
+    Смуги Боллінджера: ковзне середнє плюс/мінус k стандартних відхилень.
+    """
+
+    name = 'bb'
+    defaults = (20, 2)
+    windows = 1
+    min_window = 2
+
+    def compute(self, ctx):
+        window, k = int(self.params[0]), float(self.params[1])
+        mid = ctx.rolling_mean('Close', window)
+        std = ctx.rolling_std('Close', window)
+        suffix = self.key[len(self.name):]
+        return {
+            'bb_mid' + suffix: mid,
+            'bb_upper' + suffix: mid + k * std,
+            'bb_lower' + suffix: mid - k * std
+        }
+
+
+class Volatility(_WindowedIndicator):
+    """
+    Rolling annualized volatility of log returns.
+
+    Ковзна річна волатильність логарифмічних прибутковостей.
+    """
+
+    name = 'vol'
+    defaults = (20,)
+    windows = 1
+    min_window = 2
+
+    def lookback(self):
+        return int(self.params[0]) + 1
+
+    def compute(self, ctx):
+        window = int(self.params[0])
+        returns = ctx.log_returns()
+        valid = np.isfinite(returns)
+        clean = np.where(valid, returns, 0.0)
+        cs = np.concatenate([[0.0], np.cumsum(clean)])
+        cs2 = np.concatenate([[0.0], np.cumsum(clean ** 2)])
+        cc = np.concatenate([[0], np.cumsum(valid, dtype=np.int64)])
+        out = np.full(len(returns), np.nan)
+        if len(returns) > window:
+            # Windows start after the first bar, which has no return;
+            # a window with a missing return stays NaN
+            # Вікна починаються після першого бару, що не має прибутковості;
+            # вікно з пропущеною прибутковістю залишається NaN
+            sums = cs[window + 1:] - cs[1:-window]
+            sums2 = cs2[window + 1:] - cs2[1:-window]
+            full = (cc[window + 1:] - cc[1:-window]) == window
+            var = (sums2 - sums ** 2 / window) / max(window - 1, 1)
+            out[window:] = np.where(full, np.sqrt(np.maximum(var, 0.0) * TRADING_DAYS), np.nan)
+        return {self.key: out}
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average of the close price.
+
+    Експоненційне ковзне середнє ціни закриття.
+    """
+
+    name = 'ema'
+    defaults = (20,)
+    windows = 1
+
+    def run(self, arrays, state=None, ctx=None):
+        alpha = 2.0 / (int(self.params[0]) + 1)
+        if state is None and ctx is not None:
+            values = ctx.ema('Close', alpha)
+        else:
+            values = ema(arrays['Close'], alpha, state['ema'] if state else None)
+        return {self.key: values}, {'ema': _last(values) if len(values) else (state or {}).get('ema')}
+
+
+class MACD(Indicator):
+    """
+    Moving average convergence/divergence with signal line and histogram.
+
+    Конвергенція/дивергенція ковзних середніх із сигнальною лінією та гістограмою.
+    """
+
+    name = 'macd'
+    defaults = (12, 26, 9)
+    windows = 3
+
+    def run(self, arrays, state=None, ctx=None):
+        fast, slow, signal = (2.0 / (int(p) + 1) for p in self.params)
+        state = state or {}
+        if not state and ctx is not None:
+            fast_ema, slow_ema = ctx.ema('Close', fast), ctx.ema('Close', slow)
+        else:
+            fast_ema = ema(arrays['Close'], fast, state.get('fast'))
+            slow_ema = ema(arrays['Close'], slow, state.get('slow'))
+        line = fast_ema - slow_ema
+        signal_line = ema(line, signal, state.get('signal'))
+        suffix = self.key[len(self.name):]
+        outputs = {
+            'macd' + suffix: line,
+            'macd_signal' + suffix: signal_line,
+            'macd_hist' + suffix: line - signal_line
+        }
+        if len(line) == 0:
+            return outputs, state
+        return outputs, {'fast': _last(fast_ema), 'slow': _last(slow_ema), 'signal': _last(signal_line)}
+
+
+class RSI(Indicator):
+    """
+    Relative strength index with Wilder smoothing.
+
+    Індекс відносної сили зі згладжуванням Вайлдера.
+    """
+
+    name = 'rsi'
+    defaults = (14,)
+    windows = 1
+
+    def run(self, arrays, state=None, ctx=None):
+        alpha = 1.0 / int(self.params[0])
+        close = arrays['Close']
+        state = state or {}
+        prev_close = state.get('close')
+        if prev_close is None:
+            change = np.diff(close)
+            offset = 1
+        else:
+            change = np.diff(np.concatenate([[prev_close], close]))
+            offset = 0
+        gains = ema(np.clip(change, 0, None), alpha, state.get('gain'))
+        losses = ema(np.clip(-change, 0, None), alpha, state.get('loss'))
+        out = np.full(len(close), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[offset:] = np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + gains / losses))
+        if len(close) == 0:
+            return {self.key: out}, state
+        return {self.key: out}, {
+            'close': _last(close),
+            'gain': _last(gains) if len(gains) else state.get('gain'),
+            'loss': _last(losses) if len(losses) else state.get('loss')
+        }
+
+
+class ATR(Indicator):
+    """
+    Average true range with Wilder smoothing.
+
+    Середній істинний діапазон зі згладжуванням Вайлдера.
+    """
+
+    name = 'atr'
+    defaults = (14,)
+    windows = 1
+
+    def run(self, arrays, state=None, ctx=None):
+        alpha = 1.0 / int(self.params[0])
+        high, low, close = arrays['High'], arrays['Low'], arrays['Close']
+        state = state or {}
+        prev_close = np.empty(len(close))
+        if len(close):
+            prev_close[0] = state.get('close', np.nan)
+            prev_close[1:] = close[:-1]
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        values = ema(true_range, alpha, state.get('atr'))
+        if len(close) == 0:
+            return {self.key: values}, state
+        return {self.key: values}, {'close': _last(close), 'atr': _last(values)}
+
+
+class VWAP(Indicator):
+    """
+    Cumulative volume-weighted average price of the typical price.
+
+    Кумулятивна середньозважена за обсягом ціна для типової ціни.
+    """
+
+    name = 'vwap'
+
+    def run(self, arrays, state=None, ctx=None):
+        typical = (arrays['High'] + arrays['Low'] + arrays['Close']) / 3.0
+        volume = np.nan_to_num(arrays['Volume'])
+        state = state or {'pv': 0.0, 'v': 0.0}
+        pv = state['pv'] + np.cumsum(np.nan_to_num(typical) * volume)
+        v = state['v'] + np.cumsum(volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(v > 0, pv / v, np.nan)
+        if len(values) == 0:
+            return {self.key: values}, state
+        return {self.key: values}, {'pv': float(pv[-1]), 'v': float(v[-1])}
+
+
+INDICATORS = {cls.name: cls for cls in (SMA, EMA, RSI, MACD, BollingerBands, ATR, Volatility, VWAP)}
+
+
+def _format_param(value):
+    """
+    Format a parameter for output names: 2.0 -> '2', 2.5 -> '2.5'.
+
+    Форматує параметр для імен результатів: 2.0 -> '2', 2.5 -> '2.5'.
+    """
+    value = float(value)
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def parse_specs(text):
+    """
+    Parse an indicator specification such as 'sma:20,rsi:14,macd:12:26:9'.
+
+    Args:
+        text (str): Comma-separated 'name[:param[:param...]]' items
+
+    Returns:
+        list: Indicator instances
+
+    Raises:
+        ValueError: If an indicator name or parameter is invalid
+
+    Розбирає специфікацію індикаторів, напр. 'sma:20,rsi:14,macd:12:26:9'.
+
+    Аргументи:
+        text (str): Елементи 'name[:param[:param...]]', розділені комами
+
+    Повертає:
+        list: Екземпляри індикаторів
+
+    Викидає:
+        ValueError: Якщо ім'я або параметр індикатора некоректні
+    """
+    indicators = []
+    for item in filter(None, (part.strip().lower() for part in text.split(','))):
+        name, *raw = item.split(':')
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}', expected one of {', '.join(INDICATORS)}")
+        cls = INDICATORS[name]
+        if len(raw) > len(cls.defaults):
+            raise ValueError(f"Too many parameters for '{name}'")
+        try:
+            params = [float(p) for p in raw]
+        except ValueError:
+            raise ValueError(f"Invalid parameter in '{item}'")
+        for i, p in enumerate(params):
+            if i < cls.windows:
+                if not p.is_integer() or p < cls.min_window:
+                    raise ValueError(f"Window lengths must be whole numbers of at least {cls.min_window} in '{item}'")
+            elif p <= 0:
+                raise ValueError(f"Parameters must be positive in '{item}'")
+        indicators.append(cls(*(tuple(params) + cls.defaults[len(params):])))
+    if not indicators:
+        raise ValueError("No indicators requested")
+    return indicators
+
+
+class IndicatorEngine:
+    """
+    Computes a set of indicators in one pass and updates them incrementally.
+
+    Args:
+        specs (str or list): Specification string or Indicator instances
+
+    Обчислює набір індикаторів за один прохід та оновлює їх інкрементально.
+
+    Аргументи:
+        specs (str or list): Рядок специфікації або екземпляри Indicator
+    """
+
+    def __init__(self, specs):
+        self.indicators = parse_specs(specs) if isinstance(specs, str) else list(specs)
+
+    def compute(self, data):
+        """
+        Compute every indicator over the full history.
+
+        Args:
+            data (DataFrame): OHLCV data
+
+        Returns:
+            tuple: (dict of output name -> ndarray, state for ``update``)
+
+        Обчислює всі індикатори для повної історії.
+
+        Аргументи:
+            data (DataFrame): Дані OHLCV
+
+        Повертає:
+            tuple: (словник ім'я результату -> ndarray, стан для ``update``)
+        """
+        arrays = _arrays(data)
+        ctx = _Context(arrays)
+        outputs, state = {}, {}
+        for indicator in self.indicators:
+            values, state[indicator.key] = indicator.run(arrays, None, ctx)
+            outputs.update(values)
+        return outputs, state
+
+    def update(self, state, new_data):
+        """
+        Compute indicator values for newly appended bars only.
+
+        Args:
+            state (dict): State returned by ``compute`` or a previous ``update``
+            new_data (DataFrame): Bars following the ones already processed
+
+        Returns:
+            tuple: (dict of output name -> ndarray for the new bars, new state)
+
+        Обчислює значення індикаторів лише для щойно доданих барів.
+
+        Аргументи:
+            state (dict): Стан, повернутий ``compute`` або попереднім ``update``
+            new_data (DataFrame): Бари, що йдуть після вже оброблених
+
+        Повертає:
+            tuple: (словник ім'я результату -> ndarray для нових барів, новий стан)
+        """
+        arrays = _arrays(new_data)
+        outputs, new_state = {}, {}
+        for indicator in self.indicators:
+            values, new_state[indicator.key] = indicator.run(arrays, state.get(indicator.key))
+            outputs.update(values)
+        return outputs, new_state
@@ -0,0 +1,268 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+Provides counters, histograms and callback metrics that are cheap enough
+to update on every request, plus a registry that renders them in the
+Prometheus text format for a /metrics endpoint.
+
+Легковагові внутрішньопроцесні метрики з експортом у текстовому форматі Prometheus.
+
+Надає лічильники, гістограми та метрики зі зворотним викликом, оновлення
+яких достатньо дешеве для кожного запиту, а також реєстр, що відображає
+їх у текстовому форматі Prometheus для ендпоінту /metrics.
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Default latency buckets in seconds, from 1 ms to 30 s
+# Стандартні бакети затримки в секундах, від 1 мс до 30 с
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    labels = list(labels)
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class _Metric:
+    """
+    Common base: name, help text and label names.
+
+    Спільна основа: назва, опис та назви міток.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, optionally split by labels.
+
+    Монотонно зростаючий лічильник, за потреби розділений мітками.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self, extra=()):
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self.header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels([*extra, *zip(self.labelnames, key)])} {_format_value(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed cumulative buckets.
+
+    Args:
+        name (str): Metric name
+        documentation (str): Help text
+        labelnames (tuple): Label names
+        buckets (tuple): Increasing upper bounds; +Inf is added automatically
+
+    Розподіл спостережених значень за фіксованими кумулятивними бакетами.
+
+    Аргументи:
+        name (str): Назва метрики
+        documentation (str): Опис
+        labelnames (tuple): Назви міток
+        buckets (tuple): Зростаючі верхні межі; +Inf додається автоматично
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of a ``with`` block in seconds.
+
+        Спостерігає тривалість блоку ``with`` у секундах.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """
+        Return (bucket counts, sum, count) for one label set.
+
+        Повертає (кількості за бакетами, сума, кількість) для одного набору міток.
+        """
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return [0] * (len(self.buckets) + 1), 0.0, 0
+            return list(series.counts), series.sum, series.count
+
+    def render(self, extra=()):
+        with self._lock:
+            items = sorted((key, list(s.counts), s.sum, s.count) for key, s in self._series.items())
+        lines = self.header()
+        bounds = self.buckets + (math.inf,)
+        for key, counts, total, count in items:
+            labels = [*extra, *zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Gauge or counter whose samples are read from a callback at render time.
+    Used to expose counters that other components already keep.
+    The callback returns a number, or a dict mapping label tuples to numbers.
+
+    Гейдж або лічильник, значення якого зчитуються зі зворотного виклику під час відображення.
+    Використовується для експорту лічильників, які вже ведуть інші компоненти.
+    Виклик повертає число або словник, що відображає кортежі міток у числа.
+    """
+
+    def __init__(self, name, documentation, callback, labelnames=(), kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def render(self, extra=()):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = self.header()
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels([*extra, *zip(self.labelnames, key)])} {_format_value(float(value))}")
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered together.
+
+    Args:
+        labels (callable): Optional; returns a dict of labels added to every
+            sample, read at render time (e.g. the worker process id)
+
+    Колекція метрик, що відображаються разом.
+
+    Аргументи:
+        labels (callable): Необов'язково; повертає словник міток, що додаються
+            до кожного значення, зчитується під час відображення (напр. id процесу воркера)
+    """
+
+    def __init__(self, labels=None):
+        self._metrics = {}
+        self._labels = labels
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, callback, labelnames=(), kind='gauge'):
+        return self._add(CallbackMetric(name, documentation, callback, labelnames, kind))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Відображає всі метрики у текстовому форматі Prometheus.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        extra = sorted(self._labels().items()) if self._labels else []
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(extra))
+        return '\n'.join(lines) + '\n'
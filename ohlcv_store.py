@@ -0,0 +1,428 @@
+"""
+Persistent columnar OHLCV store.
+
+Keeps one memory-mapped NumPy file per symbol and interval on disk.
+A refresh downloads only the bars after the last stored one and any
+period is served by slicing the stored arrays. Files are replaced
+atomically and refreshes are serialized with a file lock, so the store
+survives restarts and can be shared by all gunicorn workers.
+
+Постійне стовпчикове сховище OHLCV.
+
+Зберігає на диску один NumPy-файл (з відображенням у пам'ять) на символ
+та інтервал. Оновлення завантажує лише бари після останнього збереженого,
+а будь-який період повертається зрізом збережених масивів. Файли
+замінюються атомарно, а оновлення серіалізуються блокуванням файлу,
+тому сховище переживає перезапуски та спільне для всіх воркерів gunicorn.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl / Windows не має fcntl
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+BAR_DTYPE = np.dtype([('ts', '<i8')] + [(field, '<f8') for field in FIELDS])
+
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10)
+}
+
+# Coverage marker for data downloaded with period='max'
+# Маркер покриття для даних, завантажених з period='max'
+MAX_COVERAGE = np.iinfo(np.int64).min
+
+
+def period_start(period, now=None):
+    """
+    Compute the first timestamp covered by a period string.
+
+    Args:
+        period (str): Time period (e.g., '1mo', 'ytd', 'max')
+        now (Timestamp): Reference time, defaults to the current time
+
+    Returns:
+        int: Start as nanoseconds since epoch (MAX_COVERAGE for 'max')
+
+    Обчислює першу мітку часу, яку охоплює рядок періоду.
+
+    Аргументи:
+        period (str): Часовий період (напр., '1mo', 'ytd', 'max')
+        now (Timestamp): Опорний час, за замовчуванням поточний
+
+    Повертає:
+        int: Початок у наносекундах від епохи (MAX_COVERAGE для 'max')
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    period = period.lower()
+    if period == 'max':
+        return MAX_COVERAGE
+    if period == 'ytd':
+        start = pd.Timestamp(year=now.year, month=1, day=1)
+    elif period in PERIOD_OFFSETS:
+        start = now.normalize() - PERIOD_OFFSETS[period]
+    else:
+        raise ValueError(f"Unsupported period: {period}")
+    return start.value
+
+
+def period_covering(start, now=None):
+    """
+    Find the shortest period string whose history reaches back to ``start``.
+
+    Args:
+        start (Timestamp): First date that must be covered
+        now (Timestamp): Reference time, defaults to the current time
+
+    Returns:
+        str: A key of PERIOD_OFFSETS, or 'max' if none reaches far enough
+
+    Знаходить найкоротший рядок періоду, історія якого сягає ``start``.
+
+    Аргументи:
+        start (Timestamp): Перша дата, яку потрібно охопити
+        now (Timestamp): Опорний час, за замовчуванням поточний
+
+    Повертає:
+        str: Ключ PERIOD_OFFSETS або 'max', якщо жоден не сягає достатньо далеко
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    start = pd.Timestamp(start).value
+    for period in PERIOD_OFFSETS:
+        if period_start(period, now) <= start:
+            return period
+    return 'max'
+
+
+def slice_frame(data, start=None, end=None):
+    """
+    Select the rows with ``start <= date < end`` by binary search on the sorted index.
+
+    Args:
+        data (DataFrame): OHLCV data with a sorted DatetimeIndex
+        start (Timestamp): Inclusive lower bound, or None
+        end (Timestamp): Exclusive upper bound, or None
+
+    Returns:
+        DataFrame: A view of the selected rows
+
+    Вибирає рядки з ``start <= date < end`` двійковим пошуком у відсортованому індексі.
+
+    Аргументи:
+        data (DataFrame): Дані OHLCV з відсортованим DatetimeIndex
+        start (Timestamp): Включна нижня межа або None
+        end (Timestamp): Виключна верхня межа або None
+
+    Повертає:
+        DataFrame: Представлення вибраних рядків
+    """
+    stamps = pd.DatetimeIndex(data.index).as_unit('ns').asi8
+    lo = 0 if start is None else np.searchsorted(stamps, pd.Timestamp(start).value, side='left')
+    hi = len(stamps) if end is None else np.searchsorted(stamps, pd.Timestamp(end).value, side='left')
+    return data.iloc[lo:max(lo, hi)]
+
+
+def frame_to_bars(data):
+    """
+    Convert a downloaded DataFrame into a structured bar array.
+    Flattens MultiIndex columns and drops the time zone from the index.
+
+    Args:
+        data (DataFrame): Data as returned by yf.download
+
+    Returns:
+        ndarray: Sorted array with BAR_DTYPE
+
+    Перетворює завантажений DataFrame на структурований масив барів.
+    Сплющує багаторівневі стовпці та прибирає часовий пояс з індексу.
+
+    Аргументи:
+        data (DataFrame): Дані у форматі yf.download
+
+    Повертає:
+        ndarray: Відсортований масив з BAR_DTYPE
+    """
+    if data is None or data.empty:
+        return np.empty(0, dtype=BAR_DTYPE)
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    bars = np.empty(len(data), dtype=BAR_DTYPE)
+    bars['ts'] = index.as_unit('ns').asi8
+    for field in FIELDS:
+        if field in data.columns:
+            bars[field] = data[field].to_numpy(dtype='f8', na_value=np.nan)
+        else:
+            bars[field] = np.nan
+    order = np.argsort(bars['ts'], kind='stable')
+    return bars[order]
+
+
+def bars_to_frame(bars):
+    """
+    Convert a structured bar array into a DataFrame indexed by 'Date'.
+
+    Args:
+        bars (ndarray): Array with BAR_DTYPE
+
+    Returns:
+        DataFrame: OHLCV columns with a DatetimeIndex named 'Date'
+
+    Перетворює структурований масив барів на DataFrame з індексом 'Date'.
+
+    Аргументи:
+        bars (ndarray): Масив з BAR_DTYPE
+
+    Повертає:
+        DataFrame: Стовпці OHLCV з DatetimeIndex на ім'я 'Date'
+    """
+    index = pd.DatetimeIndex(np.asarray(bars['ts']).astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame({field: np.array(bars[field]) for field in FIELDS}, index=index)
+
+
+def merge_bars(old, new):
+    """
+    Merge newly fetched bars into stored ones.
+    Stored bars from the first new timestamp onwards are replaced, so the
+    still-forming last bar gets updated.
+
+    Об'єднує щойно отримані бари зі збереженими.
+    Збережені бари, починаючи з першої нової мітки часу, замінюються,
+    тому останній незавершений бар оновлюється.
+    """
+    if len(new) == 0:
+        return old
+    if len(old) == 0:
+        return new
+    cut = np.searchsorted(old['ts'], new['ts'][0], side='left')
+    return np.concatenate([old[:cut], new])
+
+
+class OHLCVStore:
+    """
+    On-disk OHLCV store with incremental tail-only refresh.
+
+    Args:
+        root (str): Directory holding the store files
+        fetch (callable): Downloader with the yf.download signature
+        min_refresh (float): Seconds between tail refreshes of one file
+        clock (callable): Wall-clock time source, replaceable in tests
+
+    Дискове сховище OHLCV з інкрементальним оновленням лише хвоста.
+
+    Аргументи:
+        root (str): Каталог з файлами сховища
+        fetch (callable): Завантажувач із сигнатурою yf.download
+        min_refresh (float): Секунди між оновленнями хвоста одного файлу
+        clock (callable): Джерело реального часу, замінюване в тестах
+    """
+
+    def __init__(self, root, fetch, min_refresh=60.0, clock=time.time):
+        self.root = root
+        self.fetch = fetch
+        self.min_refresh = min_refresh
+        self._clock = clock
+        self._thread_locks = {}
+        self._guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _base_path(self, symbol, interval):
+        """
+        Return the path prefix for a symbol's files.
+
+        Повертає префікс шляху до файлів символу.
+        """
+        safe = re.sub(r'[^A-Za-z0-9._-]', lambda m: '%%%02X' % ord(m.group()), symbol.upper())
+        directory = os.path.join(self.root, interval)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, safe)
+
+    def load(self, symbol, interval='1d'):
+        """
+        Load stored bars and metadata without contacting the upstream.
+
+        Args:
+            symbol (str): Stock symbol
+            interval (str): Bar interval
+
+        Returns:
+            tuple: (memory-mapped bar array or None, metadata dict)
+
+        Завантажує збережені бари та метадані без звернення до джерела.
+
+        Аргументи:
+            symbol (str): Символ акції
+            interval (str): Інтервал бару
+
+        Повертає:
+            tuple: (масив барів з відображенням у пам'ять або None, словник метаданих)
+        """
+        base = self._base_path(symbol, interval)
+        try:
+            with open(base + '.json') as f:
+                meta = json.load(f)
+            bars = np.load(base + '.npy', mmap_mode='r')
+        except (OSError, ValueError):
+            return None, {}
+        return bars, meta
+
+    def get(self, symbol, period, interval='1d'):
+        """
+        Return bars for a period, refreshing the stored file as needed.
+
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period (e.g., '1mo', '5y')
+            interval (str): Bar interval
+
+        Returns:
+            DataFrame: OHLCV data with a DatetimeIndex named 'Date'
+
+        Повертає бари за період, оновлюючи збережений файл за потреби.
+
+        Аргументи:
+            symbol (str): Символ акції
+            period (str): Часовий період (напр., '1mo', '5y')
+            interval (str): Інтервал бару
+
+        Повертає:
+            DataFrame: Дані OHLCV з DatetimeIndex на ім'я 'Date'
+        """
+        start = period_start(period)
+        bars, meta = self.load(symbol, interval)
+        if bars is None or not self._is_fresh(meta, start):
+            bars = self._refresh(symbol, period, interval, start)
+        cut = np.searchsorted(bars['ts'], start, side='left') if start != MAX_COVERAGE else 0
+        return bars_to_frame(bars[cut:])
+
+    def _is_fresh(self, meta, start):
+        """
+        Check whether metadata covers ``start`` and was refreshed recently.
+
+        Перевіряє, чи метадані охоплюють ``start`` та чи оновлювалися нещодавно.
+        """
+        covered = meta.get('coverage_start', 0) <= start
+        recent = self._clock() - meta.get('updated', 0) < self.min_refresh
+        return covered and recent
+
+    def _refresh(self, symbol, period, interval, start):
+        """
+        Fetch missing bars under the file lock and rewrite the stored file.
+
+        Отримує відсутні бари під блокуванням файлу та перезаписує збережений файл.
+        """
+        base = self._base_path(symbol, interval)
+        with self._locked(base):
+            # Another worker may have refreshed while we waited
+            # Інший воркер міг оновити файл, поки ми чекали
+            bars, meta = self.load(symbol, interval)
+            if bars is not None and self._is_fresh(meta, start):
+                return bars
+
+            coverage = meta.get('coverage_start')
+            if bars is None or len(bars) == 0 or coverage is None or coverage > start:
+                logger.info("Store: full fetch of %s period=%s interval=%s", symbol, period, interval)
+                new = frame_to_bars(self.fetch(symbol, period=period, interval=interval, progress=False))
+                coverage = start if coverage is None else min(coverage, start)
+                old = bars if bars is not None else np.empty(0, dtype=BAR_DTYPE)
+            else:
+                last = pd.Timestamp(int(bars['ts'][-1]))
+                since = last.strftime('%Y-%m-%d') if interval.endswith(('d', 'wk', 'mo')) else last
+                logger.info("Store: tail fetch of %s since %s interval=%s", symbol, since, interval)
+                try:
+                    new = frame_to_bars(self.fetch(symbol, start=since, interval=interval, progress=False))
+                except Exception as e:
+                    logger.warning("Store: tail fetch failed for %s, serving stored bars: %s", symbol, e)
+                    return bars
+                old = bars
+
+            if len(new) == 0 and len(old) == 0:
+                return new
+            merged = merge_bars(np.array(old), new)
+            self._write(base, merged, {
+                'symbol': symbol.upper(),
+                'interval': interval,
+                'coverage_start': int(coverage),
+                'updated': self._clock(),
+                'rows': int(len(merged))
+            })
+            return merged
+
+    def _write(self, base, bars, meta):
+        """
+        Atomically replace the stored bars and metadata.
+
+        Атомарно замінює збережені бари та метадані.
+        """
+        directory = os.path.dirname(base)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, bars)
+        os.replace(tmp, base + '.npy')
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, base + '.json')
+
+    def _locked(self, base):
+        """
+        Return a context manager locking a file across threads and processes.
+
+        Повертає менеджер контексту, що блокує файл між потоками та процесами.
+        """
+        with self._guard:
+            thread_lock = self._thread_locks.setdefault(base, threading.Lock())
+        return _FileLock(base + '.lock', thread_lock)
+
+
+class _FileLock:
+    """
+    Exclusive lock held by one thread and one process at a time.
+
+    Ексклюзивне блокування, яке одночасно тримає лише один потік і один процес.
+    """
+
+    def __init__(self, path, thread_lock):
+        self.path = path
+        self.thread_lock = thread_lock
+        self._file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self.thread_lock.release()
+        return False
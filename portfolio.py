@@ -0,0 +1,381 @@
+"""
+Vectorized cross-asset portfolio analytics.
+
+Aligns the close prices of many symbols into one date-by-symbol float
+matrix (forward-filling missing bars) and derives returns, rolling
+volatility, covariance and correlation matrices, betas against a
+benchmark and portfolio value-at-risk with NumPy matrix operations.
+The aligned matrix memoizes its returns and covariance so it can be
+cached and reused for queries with different weights.
+
+Векторизована аналітика портфеля з багатьох активів.
+
+Вирівнює ціни закриття багатьох символів в одну матрицю float «дата ×
+символ» (заповнюючи пропущені бари попередніми значеннями) та обчислює
+прибутковості, ковзну волатильність, матриці коваріації та кореляції, бети
+відносно еталону та вартість під ризиком портфеля матричними операціями
+NumPy. Вирівняна матриця запам'ятовує свої прибутковості та коваріацію, тому
+її можна кешувати й повторно використовувати для запитів з різними вагами.
+"""
+
+import threading
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from indicators import TRADING_DAYS
+from serialization import format_dates
+
+# Bars per year for annualizing, by bar interval
+# Кількість барів на рік для перерахунку в річні показники, за інтервалом бару
+PERIODS_PER_YEAR = {
+    '1wk': 52, '1mo': 12, '3mo': 4, '1q': 4,
+    '1h': TRADING_DAYS * 7, '60m': TRADING_DAYS * 7, '90m': TRADING_DAYS * 5,
+    '30m': TRADING_DAYS * 13, '15m': TRADING_DAYS * 26, '5m': TRADING_DAYS * 78,
+    '2m': TRADING_DAYS * 195, '1m': TRADING_DAYS * 390
+}
+
+
+def periods_per_year(interval):
+    return PERIODS_PER_YEAR.get(interval, TRADING_DAYS)
+
+
+def _number(value):
+    """
+    Convert a NumPy scalar to float, NaN and infinity become None.
+
+    Перетворює скаляр NumPy на float, NaN та нескінченність стають None.
+    """
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def forward_fill(matrix):
+    """
+    Forward-fill NaN values down each column; leading NaN values stay NaN.
+
+    Заповнює значення NaN попередніми вниз по кожному стовпцю; початкові NaN залишаються.
+    """
+    rows = np.arange(matrix.shape[0])[:, None]
+    index = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return matrix[index, np.arange(matrix.shape[1])]
+
+
+def rolling_std(returns, window):
+    """
+    Rolling sample standard deviation along axis 0 using cumulative sums.
+
+    Args:
+        returns (ndarray): 1-D series or 2-D matrix with one column per asset
+        window (int): Window length in bars
+
+    Returns:
+        ndarray: Values for every complete window, len(returns) - window + 1 rows
+
+    Ковзне вибіркове стандартне відхилення вздовж осі 0 через кумулятивні суми.
+
+    Аргументи:
+        returns (ndarray): 1-D ряд або 2-D матриця з одним стовпцем на актив
+        window (int): Довжина вікна в барах
+
+    Повертає:
+        ndarray: Значення для кожного повного вікна, len(returns) - window + 1 рядків
+    """
+    if len(returns) < window or window < 2:
+        return np.empty((0,) + returns.shape[1:])
+    # Centre first so the sums stay small and the subtraction stays accurate
+    # Попереднє центрування, щоб суми були малими, а віднімання точним
+    centred = returns - returns.mean(axis=0)
+    zeros = np.zeros((1,) + returns.shape[1:])
+    s1 = np.concatenate([zeros, np.cumsum(centred, axis=0)])
+    s2 = np.concatenate([zeros, np.cumsum(centred * centred, axis=0)])
+    total = s1[window:] - s1[:-window]
+    squares = s2[window:] - s2[:-window]
+    variance = (squares - total * total / window) / (window - 1)
+    return np.sqrt(np.clip(variance, 0.0, None))
+
+
+class AlignedPrices:
+    """
+    Close prices of several symbols on one shared, forward-filled date index.
+
+    Args:
+        dates (ndarray): Bar timestamps in nanoseconds, increasing
+        symbols (list): Column symbols
+        prices (ndarray): Matrix of shape (len(dates), len(symbols))
+        sources (dict): Data source per symbol
+        excluded (dict): Symbols left out with the reason
+
+    Ціни закриття кількох символів на спільному індексі дат із заповненням пропусків.
+
+    Аргументи:
+        dates (ndarray): Мітки часу барів у наносекундах, за зростанням
+        symbols (list): Символи стовпців
+        prices (ndarray): Матриця розміру (len(dates), len(symbols))
+        sources (dict): Джерело даних для кожного символу
+        excluded (dict): Пропущені символи з причиною
+    """
+
+    def __init__(self, dates, symbols, prices, sources=None, excluded=None):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.prices = prices
+        self.sources = sources or {}
+        self.excluded = excluded or {}
+        self.last_dates = {}
+        self._columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._lock = threading.Lock()
+        self._returns = None
+        self._covariance = None
+
+    @classmethod
+    def from_series(cls, series, sources=None):
+        """
+        Align (timestamps, closes) pairs per symbol into one matrix.
+        The matrix starts where every symbol has data; symbols whose data
+        ends before that are excluded.
+
+        Args:
+            series (dict): Symbol -> (int64 ns timestamps, float closes)
+            sources (dict): Data source per symbol
+
+        Вирівнює пари (мітки часу, закриття) для кожного символу в одну матрицю.
+        Матриця починається там, де дані є для всіх символів; символи, дані
+        яких закінчуються раніше, виключаються.
+
+        Аргументи:
+            series (dict): Символ -> (мітки часу int64 у нс, ціни закриття float)
+            sources (dict): Джерело даних для кожного символу
+        """
+        excluded = {symbol: "no data" for symbol, (stamps, _) in series.items() if len(stamps) == 0}
+        series = {symbol: value for symbol, value in series.items() if len(value[0])}
+        symbols = list(series)
+        if not symbols:
+            return cls(np.empty(0, dtype='i8'), [], np.empty((0, 0)), sources, excluded)
+
+        stamps = [np.asarray(series[symbol][0], dtype='i8') for symbol in symbols]
+        closes = [np.asarray(series[symbol][1], dtype='f8') for symbol in symbols]
+        lengths = np.array([len(s) for s in stamps])
+        dates = np.unique(np.concatenate(stamps))
+        matrix = np.full((len(dates), len(symbols)), np.nan)
+        rows = np.searchsorted(dates, np.concatenate(stamps))
+        matrix[rows, np.repeat(np.arange(len(symbols)), lengths)] = np.concatenate(closes)
+
+        # Trim to the span every remaining symbol covers, then fill gaps
+        # Обрізання до проміжку, який покривають усі символи, потім заповнення пропусків
+        valid = ~np.isnan(matrix)
+        has_data = valid.any(axis=0)
+        first = np.where(has_data, valid.argmax(axis=0), len(dates))
+        last = np.where(has_data, len(dates) - 1 - valid[::-1].argmax(axis=0), -1)
+        start = first[has_data].max() if has_data.any() else 0
+        keep = has_data & (last >= start)
+        if keep.any():
+            start = first[keep].max()
+        for i in np.flatnonzero(~keep):
+            excluded[symbols[i]] = "no data" if not has_data[i] else "history ends before the other symbols start"
+
+        kept = [symbols[i] for i in np.flatnonzero(keep)]
+        aligned = cls(dates[start:], kept, forward_fill(matrix[start:][:, keep]), sources, excluded)
+        aligned.last_dates = {symbols[i]: int(dates[last[i]]) for i in np.flatnonzero(keep)}
+        return aligned
+
+    @classmethod
+    def from_frames(cls, frames, sources=None):
+        """
+        Align the Close column of OHLCV DataFrames indexed by date.
+
+        Вирівнює стовпець Close з DataFrame з OHLCV, індексованих датою.
+        """
+        return cls.from_series({
+            symbol: (frame.index.values.astype('datetime64[ns]').astype('i8'),
+                     frame['Close'].to_numpy(dtype='f8', na_value=np.nan))
+            for symbol, frame in frames.items()
+        }, sources)
+
+    def column(self, symbol):
+        return self._columns[symbol]
+
+    @property
+    def returns(self):
+        """
+        Simple returns between consecutive bars, shape (len(dates) - 1, len(symbols)).
+
+        Прості прибутковості між сусідніми барами, розмір (len(dates) - 1, len(symbols)).
+        """
+        with self._lock:
+            if self._returns is None:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    returns = self.prices[1:] / self.prices[:-1] - 1.0
+                self._returns = np.where(np.isfinite(returns), returns, 0.0)
+            return self._returns
+
+    @property
+    def covariance(self):
+        """
+        Sample covariance matrix of returns, computed once.
+
+        Вибіркова матриця коваріації прибутковостей, обчислюється один раз.
+        """
+        returns = self.returns
+        with self._lock:
+            if self._covariance is None:
+                centred = returns - returns.mean(axis=0)
+                self._covariance = centred.T @ centred / max(len(returns) - 1, 1)
+            return self._covariance
+
+
+def correlation(covariance):
+    """
+    Correlation matrix from a covariance matrix; zero-variance rows become NaN.
+
+    Матриця кореляції з матриці коваріації; рядки з нульовою дисперсією стають NaN.
+    """
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = covariance / np.outer(std, std)
+    np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+    return corr
+
+
+def value_at_risk(portfolio_returns, sigma, confidence=0.95, horizon=1):
+    """
+    Historical and parametric (normal) value-at-risk as positive loss fractions.
+
+    Args:
+        portfolio_returns (ndarray): Per-bar portfolio returns
+        sigma (float): Per-bar portfolio standard deviation
+        confidence (float): Confidence level, e.g. 0.95
+        horizon (int): Horizon in bars, scaled by the square root of time
+
+    Returns:
+        dict: 'historical' and 'parametric' VaR
+
+    Історична та параметрична (нормальна) вартість під ризиком як додатні частки втрат.
+
+    Аргументи:
+        portfolio_returns (ndarray): Прибутковості портфеля за бар
+        sigma (float): Стандартне відхилення портфеля за бар
+        confidence (float): Рівень довіри, напр. 0.95
+        horizon (int): Горизонт у барах, масштабується квадратним коренем часу
+
+    Повертає:
+        dict: VaR 'historical' та 'parametric'
+    """
+    if len(portfolio_returns) == 0:
+        return {'historical': None, 'parametric': None}
+    scale = np.sqrt(horizon)
+    mean = float(portfolio_returns.mean())
+    z = NormalDist().inv_cdf(confidence)
+    return {
+        'historical': float(-np.quantile(portfolio_returns, 1 - confidence) * scale),
+        'parametric': float(-(mean * horizon - z * sigma * scale))
+    }
+
+
+def portfolio_report(aligned, symbols, weights=None, benchmark=None, window=20,
+                     confidence=0.95, horizon=1, interval='1d', matrices=True):
+    """
+    Compute per-asset and portfolio risk statistics in one vectorized pass.
+
+    Args:
+        aligned (AlignedPrices): Aligned prices including the benchmark
+        symbols (list): Portfolio symbols, all present in ``aligned``
+        weights (ndarray): Portfolio weights in ``symbols`` order; equal if None
+        benchmark (str): Benchmark symbol for beta, optional
+        window (int): Rolling volatility window in bars
+        confidence (float): VaR confidence level
+        horizon (int): VaR horizon in bars
+        interval (str): Bar interval, used to annualize
+        matrices (bool): Include the correlation and covariance matrices
+
+    Returns:
+        dict: JSON-ready report
+
+    Обчислює статистику ризику для активів та портфеля за один векторизований прохід.
+
+    Аргументи:
+        aligned (AlignedPrices): Вирівняні ціни разом з еталоном
+        symbols (list): Символи портфеля, усі присутні в ``aligned``
+        weights (ndarray): Ваги портфеля в порядку ``symbols``; рівні, якщо None
+        benchmark (str): Символ еталону для бети, необов'язково
+        window (int): Вікно ковзної волатильності в барах
+        confidence (float): Рівень довіри VaR
+        horizon (int): Горизонт VaR у барах
+        interval (str): Інтервал бару для перерахунку в річні показники
+        matrices (bool): Додати матриці кореляції та коваріації
+
+    Повертає:
+        dict: Звіт, готовий для JSON
+    """
+    columns = np.array([aligned.column(symbol) for symbol in symbols], dtype=int)
+    returns = aligned.returns[:, columns]
+    cov = aligned.covariance[np.ix_(columns, columns)]
+    annual = periods_per_year(interval)
+    if weights is None:
+        weights = np.full(len(symbols), 1.0 / len(symbols))
+
+    mean = returns.mean(axis=0) if len(returns) else np.full(len(symbols), np.nan)
+    vol = np.sqrt(np.diag(cov))
+    rolling = rolling_std(returns, window)
+    latest_rolling = rolling[-1] if len(rolling) else np.full(len(symbols), np.nan)
+
+    portfolio_returns = returns @ weights
+    portfolio_var = float(weights @ cov @ weights)
+    portfolio_sigma = np.sqrt(max(portfolio_var, 0.0))
+    portfolio_rolling = rolling_std(portfolio_returns, window)
+
+    betas = np.full(len(symbols), np.nan)
+    portfolio_beta = None
+    if benchmark is not None:
+        b = aligned.column(benchmark)
+        bench_var = aligned.covariance[b, b]
+        if bench_var > 0:
+            betas = aligned.covariance[columns, b] / bench_var
+            portfolio_beta = float(weights @ betas)
+
+    dates = pd.DatetimeIndex(aligned.dates.astype('datetime64[ns]'))
+    last_dates = pd.DatetimeIndex(np.array([aligned.last_dates.get(symbol, aligned.dates[-1]) for symbol in symbols],
+                                           dtype='datetime64[ns]'))
+    last_dates = format_dates(last_dates).tolist()
+    scale = np.sqrt(annual)
+
+    report = {
+        'symbols': list(symbols),
+        'benchmark': benchmark,
+        'start': format_dates(dates[:1])[0] if len(dates) else None,
+        'end': format_dates(dates[-1:])[0] if len(dates) else None,
+        'observations': int(len(returns)),
+        'assets': {
+            symbol: {
+                'mean_return': _number(mean[i] * annual),
+                'volatility': _number(vol[i] * scale),
+                'rolling_volatility': _number(latest_rolling[i] * scale),
+                'beta': _number(betas[i]),
+                'last_date': last_dates[i],
+                'source': aligned.sources.get(symbol)
+            }
+            for i, symbol in enumerate(symbols)
+        },
+        'portfolio': {
+            'weights': {symbol: float(w) for symbol, w in zip(symbols, weights)},
+            'expected_return': _number(portfolio_returns.mean() * annual) if len(returns) else None,
+            'volatility': _number(portfolio_sigma * scale),
+            'beta': portfolio_beta,
+            'var': dict(value_at_risk(portfolio_returns, portfolio_sigma, confidence, horizon),
+                        confidence=confidence, horizon=horizon),
+            'rolling_volatility': {
+                'Date': format_dates(dates[window:]).tolist() if len(portfolio_rolling) else [],
+                'Value': portfolio_rolling * scale
+            }
+        },
+        'window': window,
+        'excluded': aligned.excluded
+    }
+    if matrices:
+        # Arrays are serialized directly, NaN becomes null
+        # Масиви серіалізуються напряму, NaN стає null
+        report['covariance'] = cov * annual
+        report['correlation'] = correlation(cov)
+    return report
@@ -0,0 +1,423 @@
+"""
+Background prefetch of a watchlist of symbols.
+
+Keeps frequently viewed symbols warm by refreshing them on a schedule
+aligned to US market hours: every ``open_interval`` seconds while the
+market is open, once shortly before the open and once after the close.
+Jobs run with a concurrency limit and random jitter, ordered by how often
+each symbol was requested recently. Runs inside the app process or as a
+sidecar that warms the shared on-disk OHLCV store:
+
+    python prefetch.py --watchlist AAPL:1mo,MSFT:1y --once
+
+Exchange holidays are not modelled; on those days the scheduler simply
+refreshes unchanged data.
+
+Фонове попереднє завантаження списку спостереження символів.
+
+Підтримує часто переглядувані символи «теплими», оновлюючи їх за
+розкладом, прив'язаним до годин роботи ринку США: кожні ``open_interval``
+секунд під час торгів, один раз незадовго до відкриття та один раз після
+закриття. Завдання виконуються з обмеженням паралельності та випадковим
+зсувом, у порядку частоти нещодавніх запитів символу. Працює в процесі
+застосунку або як окремий процес, що прогріває спільне дискове сховище OHLCV.
+
+Біржові свята не враховуються; у ці дні планувальник просто оновлює
+незмінені дані.
+"""
+
+import argparse
+import datetime
+import logging
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import make_key
+
+logger = logging.getLogger(__name__)
+
+# Market time zone; without a tz database fall back to US Eastern standard time
+# Часовий пояс ринку; без бази часових поясів використовується стандартний час США (схід)
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ = ZoneInfo(os.environ.get('MARKET_TZ', 'America/New_York'))
+except Exception:
+    MARKET_TZ = datetime.timezone(datetime.timedelta(hours=-5), 'EST')
+
+MARKET_OPEN = datetime.time(9, 30)
+MARKET_CLOSE = datetime.time(16, 0)
+
+# Warm before the open and pick up final bars after the close
+# Прогрівання перед відкриттям та отримання фінальних барів після закриття
+PRE_OPEN = datetime.time(9, 25)
+POST_CLOSE = datetime.time(16, 5)
+
+
+def parse_watchlist(text, default_period='1mo', default_interval='1d'):
+    """
+    Parse a watchlist like 'AAPL:1mo,MSFT:1y:1d,TSLA'.
+
+    Args:
+        text (str): Comma-separated SYMBOL[:PERIOD[:INTERVAL]] entries
+        default_period (str): Period for entries without one
+        default_interval (str): Interval for entries without one
+
+    Returns:
+        list: Normalized (symbol, period, interval) keys without duplicates
+
+    Розбирає список спостереження виду 'AAPL:1mo,MSFT:1y:1d,TSLA'.
+
+    Аргументи:
+        text (str): Записи SYMBOL[:PERIOD[:INTERVAL]], розділені комами
+        default_period (str): Період для записів без нього
+        default_interval (str): Інтервал для записів без нього
+
+    Повертає:
+        list: Нормалізовані ключі (symbol, period, interval) без повторів
+    """
+    keys = []
+    for entry in (text or '').split(','):
+        parts = entry.strip().split(':')
+        if not parts[0]:
+            continue
+        if len(parts) > 3:
+            raise ValueError(f"Invalid watchlist entry '{entry.strip()}'")
+        symbol = parts[0]
+        period = parts[1] if len(parts) > 1 and parts[1] else default_period
+        interval = parts[2] if len(parts) > 2 and parts[2] else default_interval
+        key = make_key(symbol, period, interval)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def is_market_open(now, tz=MARKET_TZ):
+    """
+    Whether the regular session is open at ``now`` (epoch seconds).
+
+    Чи відкрита основна сесія в момент ``now`` (секунди епохи).
+    """
+    local = datetime.datetime.fromtimestamp(now, tz)
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+
+def next_run(now, open_interval, tz=MARKET_TZ):
+    """
+    Return the next scheduled refresh time after ``now``.
+    While the market is open runs are aligned to multiples of
+    ``open_interval`` since the open; otherwise the next run is the
+    post-close or the next pre-open refresh.
+
+    Args:
+        now (float): Current time in epoch seconds
+        open_interval (float): Seconds between refreshes during the session
+        tz (tzinfo): Market time zone
+
+    Returns:
+        float: Epoch seconds of the next run
+
+    Повертає час наступного запланованого оновлення після ``now``.
+    Під час торгів запуски вирівнюються на кратні ``open_interval`` від
+    відкриття; інакше наступним є оновлення після закриття або перед
+    наступним відкриттям.
+
+    Аргументи:
+        now (float): Поточний час у секундах епохи
+        open_interval (float): Секунди між оновленнями під час сесії
+        tz (tzinfo): Часовий пояс ринку
+
+    Повертає:
+        float: Секунди епохи наступного запуску
+    """
+    local = datetime.datetime.fromtimestamp(now, tz)
+    day = local.date()
+
+    def at(date, clock_time):
+        return datetime.datetime.combine(date, clock_time, tzinfo=tz).timestamp()
+
+    if local.weekday() < 5:
+        opened, closed = at(day, MARKET_OPEN), at(day, MARKET_CLOSE)
+        if opened <= now < closed:
+            steps = math.floor((now - opened) / open_interval) + 1
+            return min(opened + steps * open_interval, at(day, POST_CLOSE))
+        if now < at(day, PRE_OPEN):
+            return at(day, PRE_OPEN)
+        if now < opened:
+            return opened
+        if now < at(day, POST_CLOSE):
+            return at(day, POST_CLOSE)
+
+    day += datetime.timedelta(days=1)
+    while day.weekday() >= 5:
+        day += datetime.timedelta(days=1)
+    return at(day, PRE_OPEN)
+
+
+class RequestTracker:
+    """
+    Exponentially decayed request counts per (symbol, period, interval).
+
+    Args:
+        half_life (float): Seconds after which a request counts half as much
+        max_keys (int): Maximum number of tracked keys; the coldest are dropped
+        clock (callable): Time source in seconds, replaceable in tests
+
+    Експоненційно згасаючі лічильники запитів для (symbol, period, interval).
+
+    Аргументи:
+        half_life (float): Секунди, після яких запит важить удвічі менше
+        max_keys (int): Максимальна кількість ключів; найхолодніші видаляються
+        clock (callable): Джерело часу в секундах, замінюване в тестах
+    """
+
+    def __init__(self, half_life=3600.0, max_keys=1000, clock=time.time):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._clock = clock
+        self._scores = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score, stamp, now):
+        return score * 0.5 ** ((now - stamp) / self.half_life)
+
+    def record(self, symbol, period, interval='1d'):
+        key = make_key(symbol, period, interval)
+        now = self._clock()
+        with self._lock:
+            score, stamp = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, stamp, now) + 1.0, now)
+            if len(self._scores) > self.max_keys:
+                coldest = min(self._scores, key=lambda k: self._decayed(*self._scores[k], now))
+                del self._scores[coldest]
+
+    def scores(self):
+        """
+        Return current scores by key.
+
+        Повертає поточні оцінки за ключами.
+        """
+        now = self._clock()
+        with self._lock:
+            return {key: self._decayed(score, stamp, now) for key, (score, stamp) in self._scores.items()}
+
+    def top(self, n):
+        """
+        Return the ``n`` most requested keys, hottest first.
+
+        Повертає ``n`` найчастіше запитуваних ключів, найгарячіші першими.
+        """
+        scores = self.scores()
+        return sorted(scores, key=scores.get, reverse=True)[:n]
+
+
+class PrefetchScheduler:
+    """
+    Refreshes the watchlist and the hottest requested symbols on a schedule.
+
+    Args:
+        warm (callable): Function (symbol, period, interval) that refreshes one key
+        watchlist (list): Configured (symbol, period, interval) keys
+        tracker (RequestTracker): Request frequencies used for priority, optional
+        top_n (int): Most requested keys added to the watchlist
+        max_concurrency (int): Refreshes running at the same time
+        jitter (float): Maximum random delay in seconds before each refresh
+        open_interval (float): Seconds between runs while the market is open
+        clock (callable): Time source in epoch seconds, replaceable in tests
+        sleep (callable): Sleep function for jitter and the wait between runs;
+            defaults to a wait that returns early on stop(), replaceable in tests
+        seed (int): Optional seed for reproducible jitter
+
+    Оновлює список спостереження та найзатребуваніші символи за розкладом.
+
+    Аргументи:
+        warm (callable): Функція (symbol, period, interval), що оновлює один ключ
+        watchlist (list): Налаштовані ключі (symbol, period, interval)
+        tracker (RequestTracker): Частоти запитів для пріоритету, необов'язково
+        top_n (int): Кількість найзатребуваніших ключів, доданих до списку
+        max_concurrency (int): Кількість одночасних оновлень
+        jitter (float): Максимальна випадкова затримка в секундах перед оновленням
+        open_interval (float): Секунди між запусками під час торгів
+        clock (callable): Джерело часу в секундах епохи, замінюване в тестах
+        sleep (callable): Функція очікування для зсуву та паузи між запусками;
+            за замовчуванням очікування, що завершується раніше при stop(), замінювана в тестах
+        seed (int): Необов'язкове зерно для відтворюваного зсуву
+    """
+
+    def __init__(self, warm, watchlist=(), tracker=None, top_n=20, max_concurrency=4, jitter=5.0,
+                 open_interval=300.0, clock=time.time, sleep=None, seed=None):
+        self.warm = warm
+        self.watchlist = list(watchlist)
+        self.tracker = tracker
+        self.top_n = top_n
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.open_interval = open_interval
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sleep = sleep if sleep is not None else self._stop.wait
+        self._thread = None
+        self.runs = 0
+        self.warmed = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration = None
+        self.next_run = None
+
+    def jobs(self):
+        """
+        Return the keys to refresh, most requested first.
+        Watchlist keys nobody requested keep their configured order at the end.
+
+        Повертає ключі для оновлення, найзатребуваніші першими.
+        Ключі списку, які ніхто не запитував, зберігають свій порядок у кінці.
+        """
+        scores = self.tracker.scores() if self.tracker is not None else {}
+        hot = sorted(scores, key=scores.get, reverse=True)[:self.top_n]
+        keys = list(dict.fromkeys(hot + self.watchlist))
+        order = {key: i for i, key in enumerate(keys)}
+        return sorted(keys, key=lambda key: (-scores.get(key, 0.0), order[key]))
+
+    def _warm_one(self, key):
+        if self.jitter > 0:
+            self._sleep(self._rng.uniform(0, self.jitter))
+        if self._stop.is_set():
+            return False
+        try:
+            self.warm(*key)
+            return True
+        except Exception as e:
+            logger.warning(f"Prefetch of {key} failed: {e}")
+            return False
+
+    def run_once(self):
+        """
+        Refresh every job once with the concurrency limit.
+
+        Returns:
+            dict: Numbers of warmed and failed keys and the run duration
+
+        Оновлює кожне завдання один раз з обмеженням паралельності.
+
+        Повертає:
+            dict: Кількість прогрітих і невдалих ключів та тривалість запуску
+        """
+        jobs = self.jobs()
+        started = self._clock()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency),
+                                thread_name_prefix='prefetch') as pool:
+            results = list(pool.map(self._warm_one, jobs))
+        warmed = sum(results)
+        duration = self._clock() - started
+        with self._lock:
+            self.runs += 1
+            self.warmed += warmed
+            self.failures += len(results) - warmed
+            self.last_run = started
+            self.last_duration = duration
+        logger.info(f"Prefetch warmed {warmed}/{len(jobs)} keys in {duration:.2f} seconds")
+        return {'jobs': len(jobs), 'warmed': warmed, 'failed': len(results) - warmed, 'duration': duration}
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = self._clock()
+            scheduled = next_run(now, self.open_interval)
+            with self._lock:
+                self.next_run = scheduled
+            self._sleep(max(0.0, scheduled - now))
+            if self._stop.is_set():
+                break
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Prefetch run failed: {e}")
+
+    def start(self, run_now=True):
+        """
+        Start the background thread; optionally warm everything immediately.
+
+        Запускає фоновий потік; за потреби одразу прогріває все.
+        """
+        def target():
+            if run_now:
+                self.run_once()
+            self._loop()
+
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=target, name='prefetch-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "watchlist": ['{}:{}:{}'.format(*key) for key in self.watchlist],
+                "runs": self.runs,
+                "warmed": self.warmed,
+                "failures": self.failures,
+                "last_run": self.last_run,
+                "last_duration": self.last_duration,
+                "next_run": self.next_run
+            }
+
+
+def main():
+    """
+    Sidecar entry point: warm the on-disk OHLCV store shared with the app.
+
+    Точка входу окремого процесу: прогріває дискове сховище OHLCV, спільне із застосунком.
+    """
+    parser = argparse.ArgumentParser(description="Prefetch a watchlist into the shared OHLCV store")
+    parser.add_argument('--watchlist', default=os.environ.get('PREFETCH_WATCHLIST', ''),
+                        help='Comma-separated SYMBOL[:PERIOD[:INTERVAL]] entries')
+    parser.add_argument('--store', default=os.environ.get(
+        'OHLCV_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'ohlcv')))
+    parser.add_argument('--concurrency', type=int, default=int(os.environ.get('PREFETCH_CONCURRENCY', 4)))
+    parser.add_argument('--jitter', type=float, default=float(os.environ.get('PREFETCH_JITTER', 5)))
+    parser.add_argument('--interval', type=float, default=float(os.environ.get('PREFETCH_INTERVAL', 300)),
+                        help='Seconds between refreshes while the market is open')
+    parser.add_argument('--once', action='store_true', help='Refresh once and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    watchlist = parse_watchlist(args.watchlist)
+    if not watchlist:
+        parser.error("the watchlist is empty")
+
+    import yfinance as yf
+    from ohlcv_store import OHLCVStore
+    from upstream import Upstream
+
+    upstream = Upstream(yf.download, max_workers=args.concurrency)
+    store = OHLCVStore(args.store, fetch=upstream.call, min_refresh=0)
+    scheduler = PrefetchScheduler(store.get, watchlist, max_concurrency=args.concurrency,
+                                  jitter=0 if args.once else args.jitter, open_interval=args.interval)
+    if args.once:
+        result = scheduler.run_once()
+        raise SystemExit(1 if result['failed'] else 0)
+
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
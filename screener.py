@@ -0,0 +1,347 @@
+"""
+Array-backed stock screener.
+
+Keeps one row of summary statistics per symbol (last close, period
+returns, average volume, 52-week range and volatility) in NumPy column
+arrays. A row is recomputed from recent daily bars whenever new bars for
+its symbol arrive, and screens run filter and sort expressions over all
+rows at once, so a query over thousands of symbols takes milliseconds.
+
+Скринер акцій на основі масивів.
+
+Зберігає один рядок зведеної статистики на символ (останнє закриття,
+прибутковості за періоди, середній обсяг, 52-тижневий діапазон та
+волатильність) у стовпцях-масивах NumPy. Рядок перераховується з останніх
+денних барів щоразу, коли надходять нові бари його символу, а скринінг
+виконує вирази фільтрації та сортування над усіма рядками одразу, тому
+запит по тисячах символів займає мілісекунди.
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from indicators import TRADING_DAYS
+
+# Return horizons in daily bars
+# Горизонти прибутковості в денних барах
+RETURN_BARS = {'return_1wk': 5, 'return_1mo': 21, 'return_3mo': 63, 'return_6mo': 126, 'return_1y': 252}
+
+# Bars of history a summary row needs
+# Кількість барів історії, потрібна для рядка зведення
+LOOKBACK = max(RETURN_BARS.values()) + 1
+
+# Period whose daily bars cover LOOKBACK, with room for market holidays
+# Період, денні бари якого охоплюють LOOKBACK із запасом на святкові дні
+HISTORY_PERIOD = '2y'
+
+AVG_VOLUME_BARS = 20
+MIN_VOLATILITY_BARS = 20
+
+FIELDS = ('close', 'volume', 'avg_volume_20') + tuple(RETURN_BARS) + ('high_52w', 'low_52w', 'volatility')
+
+OPERATORS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+    '==': np.equal, '!=': np.not_equal
+}
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_CONDITION = re.compile(r'^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(.+?)\s*$')
+_OPERAND = re.compile(rf'^(?:(?P<number>{_NUMBER})|(?P<field>\w+)(?:\s*\*\s*(?P<scale>{_NUMBER}))?'
+                      rf'|(?P<lead>{_NUMBER})\s*\*\s*(?P<scaled>\w+))$')
+
+
+def summarize_bars(data):
+    """
+    Compute one screener row from daily bars.
+    Statistics that need more history than is available are NaN; the
+    52-week range needs a full year (TRADING_DAYS bars).
+
+    Args:
+        data (DataFrame): Daily OHLCV data with a sorted DatetimeIndex
+
+    Returns:
+        dict: Value for every name in FIELDS plus 'as_of' (nanoseconds since epoch)
+
+    Обчислює один рядок скринера з денних барів.
+    Показники, яким потрібно більше історії, ніж є, дорівнюють NaN;
+    52-тижневому діапазону потрібен повний рік (TRADING_DAYS барів).
+
+    Аргументи:
+        data (DataFrame): Денні дані OHLCV з відсортованим DatetimeIndex
+
+    Повертає:
+        dict: Значення для кожної назви з FIELDS та 'as_of' (наносекунди від епохи)
+    """
+    data = data.iloc[-LOOKBACK:]
+    close = data['Close'].to_numpy(dtype='f8', na_value=np.nan)
+    keep = ~np.isnan(close)
+    close = close[keep]
+    high = data['High'].to_numpy(dtype='f8', na_value=np.nan)[keep] if 'High' in data.columns else close
+    low = data['Low'].to_numpy(dtype='f8', na_value=np.nan)[keep] if 'Low' in data.columns else close
+    volume = (data['Volume'].to_numpy(dtype='f8', na_value=np.nan)[keep] if 'Volume' in data.columns
+              else np.full(len(close), np.nan))
+    n = len(close)
+    row = dict.fromkeys(FIELDS, np.nan)
+    row['as_of'] = pd.DatetimeIndex(data.index).as_unit('ns').asi8[keep][-1] if n else 0
+    if n == 0:
+        return row
+
+    row['close'] = close[-1]
+    row['volume'] = volume[-1]
+    recent = volume[-AVG_VOLUME_BARS:]
+    if n >= AVG_VOLUME_BARS and np.isfinite(recent).any():
+        row['avg_volume_20'] = np.nanmean(recent)
+    for name, bars in RETURN_BARS.items():
+        if n > bars:
+            row[name] = close[-1] / close[-1 - bars] - 1
+    if n >= TRADING_DAYS:
+        year = slice(-TRADING_DAYS, None)
+        row['high_52w'] = np.nanmax(high[year]) if np.isfinite(high[year]).any() else np.nan
+        row['low_52w'] = np.nanmin(low[year]) if np.isfinite(low[year]).any() else np.nan
+    if n > MIN_VOLATILITY_BARS:
+        returns = np.diff(np.log(close[-TRADING_DAYS - 1:]))
+        row['volatility'] = returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    return row
+
+
+def _operand(text):
+    """
+    Parse the right-hand side of a condition: a number, a field or a field scaled by a number.
+
+    Розбирає праву частину умови: число, поле або поле, помножене на число.
+    """
+    match = _OPERAND.match(text.strip())
+    if not match:
+        raise ValueError(f"Cannot parse '{text}', expected a number, a field or field*number")
+    if match['number'] is not None:
+        return None, float(match['number'])
+    if match['field'] is not None:
+        return match['field'], float(match['scale']) if match['scale'] else 1.0
+    return match['scaled'], float(match['lead'])
+
+
+def parse_filter(expression):
+    """
+    Parse comma-separated conditions that must all hold.
+    Each condition compares a field with a number, another field or a
+    scaled field, e.g. 'return_1mo>0.05,volume>avg_volume_20,close>=high_52w*0.95'.
+
+    Args:
+        expression (str): Filter expression, may be empty
+
+    Returns:
+        list: (field, operator, other field or None, number) tuples
+
+    Розбирає умови, розділені комами, які мають виконуватися всі разом.
+    Кожна умова порівнює поле з числом, іншим полем або масштабованим полем,
+    напр. 'return_1mo>0.05,volume>avg_volume_20,close>=high_52w*0.95'.
+
+    Аргументи:
+        expression (str): Вираз фільтра, може бути порожнім
+
+    Повертає:
+        list: Кортежі (поле, оператор, інше поле або None, число)
+    """
+    conditions = []
+    for part in filter(str.strip, (expression or '').split(',')):
+        match = _CONDITION.match(part)
+        if not match:
+            raise ValueError(f"Cannot parse condition '{part.strip()}', expected e.g. return_1mo>0.05")
+        field, op, rhs = match.groups()
+        other, number = _operand(rhs)
+        for name in (field, other):
+            if name is not None and name not in FIELDS:
+                raise ValueError(f"Unknown field '{name}', expected one of {', '.join(FIELDS)}")
+        conditions.append((field, op, other, number))
+    return conditions
+
+
+def parse_sort(expression):
+    """
+    Parse comma-separated sort keys; a leading '-' sorts descending.
+
+    Returns:
+        list: (field, descending) tuples
+
+    Розбирає ключі сортування, розділені комами; '-' на початку сортує за спаданням.
+
+    Повертає:
+        list: Кортежі (поле, за спаданням)
+    """
+    keys = []
+    for part in filter(None, (p.strip() for p in (expression or '').split(','))):
+        descending = part.startswith('-')
+        field = part.lstrip('+-')
+        if field not in FIELDS:
+            raise ValueError(f"Unknown sort field '{field}', expected one of {', '.join(FIELDS)}")
+        keys.append((field, descending))
+    return keys
+
+
+class ScreenerIndex:
+    """
+    Thread-safe table of per-symbol summaries stored as NumPy columns.
+
+    Args:
+        capacity (int): Initial number of rows; grows by doubling
+        max_rows (int): Optional row limit; a new symbol beyond it evicts
+            the least recently updated row
+
+    Потокобезпечна таблиця зведень за символами, що зберігається стовпцями NumPy.
+
+    Аргументи:
+        capacity (int): Початкова кількість рядків; зростає подвоєнням
+        max_rows (int): Необов'язкове обмеження рядків; новий символ понад нього
+            витісняє рядок, що оновлювався найдавніше
+    """
+
+    def __init__(self, capacity=1024, max_rows=None):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._symbols = np.empty(capacity, dtype=object)
+        self._as_of = np.zeros(capacity, dtype=np.int64)
+        self._touched = np.zeros(capacity, dtype=np.int64)
+        self._columns = {field: np.full(capacity, np.nan) for field in FIELDS}
+        self.updates = 0
+        self.evictions = 0
+
+    def _grow(self):
+        capacity = len(self._symbols) * 2
+        self._symbols = np.resize(self._symbols, capacity)
+        self._as_of = np.resize(self._as_of, capacity)
+        self._touched = np.resize(self._touched, capacity)
+        self._columns = {field: np.resize(values, capacity) for field, values in self._columns.items()}
+
+    def _evict(self):
+        """
+        Drop the least recently updated row and move the last row into its slot.
+
+        Видаляє рядок, що оновлювався найдавніше, і переносить останній рядок на його місце.
+        """
+        last = len(self._rows) - 1
+        victim = int(np.argmin(self._touched[:last + 1]))
+        del self._rows[self._symbols[victim]]
+        if victim != last:
+            moved = self._symbols[last]
+            self._rows[moved] = victim
+            self._symbols[victim] = moved
+            self._as_of[victim] = self._as_of[last]
+            self._touched[victim] = self._touched[last]
+            for values in self._columns.values():
+                values[victim] = values[last]
+        self.evictions += 1
+
+    def update(self, symbol, data):
+        """
+        Recompute the row of ``symbol`` from its latest daily bars.
+
+        Args:
+            symbol (str): Stock symbol
+            data (DataFrame): Daily OHLCV data; only the last LOOKBACK bars are used
+
+        Перераховує рядок ``symbol`` з його останніх денних барів.
+
+        Аргументи:
+            symbol (str): Символ акції
+            data (DataFrame): Денні дані OHLCV; використовуються лише останні LOOKBACK барів
+        """
+        if data is None or len(data) == 0:
+            return
+        row = summarize_bars(data)
+        symbol = symbol.strip().upper()
+        with self._lock:
+            index = self._rows.get(symbol)
+            if index is None:
+                if self.max_rows is not None and len(self._rows) >= self.max_rows:
+                    self._evict()
+                index = len(self._rows)
+                if index == len(self._symbols):
+                    self._grow()
+                self._rows[symbol] = index
+                self._symbols[index] = symbol
+            self._as_of[index] = row['as_of']
+            for field in FIELDS:
+                self._columns[field][index] = row[field]
+            self.updates += 1
+            self._touched[index] = self.updates
+
+    def __contains__(self, symbol):
+        with self._lock:
+            return symbol in self._rows
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def query(self, conditions=(), sort=(), limit=50, symbols=None):
+        """
+        Filter, sort and truncate the table in vectorized form.
+        NaN never satisfies a condition and sorts last in either direction.
+
+        Args:
+            conditions (list): Output of parse_filter
+            sort (list): Output of parse_sort
+            limit (int): Maximum number of results
+            symbols (list): Optional universe to screen; others are ignored
+
+        Returns:
+            dict: 'matched' count, 'screened' count and 'results' columns
+                ('symbol', 'as_of' and every field) of the returned rows
+
+        Фільтрує, сортує та обрізає таблицю у векторизованій формі.
+        NaN ніколи не задовольняє умову та сортується останнім в обох напрямках.
+
+        Аргументи:
+            conditions (list): Результат parse_filter
+            sort (list): Результат parse_sort
+            limit (int): Максимальна кількість результатів
+            symbols (list): Необов'язковий набір символів для скринінгу; інші ігноруються
+
+        Повертає:
+            dict: Кількість 'matched', кількість 'screened' та стовпці 'results'
+                ('symbol', 'as_of' та всі поля) повернутих рядків
+        """
+        with self._lock:
+            n = len(self._rows)
+            if symbols is None:
+                rows = np.arange(n)
+            else:
+                rows = np.array([self._rows[s] for s in symbols if s in self._rows], dtype=np.int64)
+            columns = {field: values[rows] for field, values in self._columns.items()}
+            names = self._symbols[rows]
+            as_of = self._as_of[rows]
+
+        mask = np.ones(len(rows), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for field, op, other, number in conditions:
+                rhs = number if other is None else columns[other] * number
+                mask &= OPERATORS[op](columns[field], rhs)
+        selected = np.flatnonzero(mask)
+
+        if sort:
+            # lexsort uses the last key as primary; NaN goes last via an isnan key
+            # lexsort використовує останній ключ як основний; NaN іде останнім через ключ isnan
+            keys = []
+            for field, descending in reversed(sort):
+                values = columns[field][selected]
+                keys.append(-values if descending else values)
+                keys.append(np.isnan(values))
+            selected = selected[np.lexsort(keys)]
+        selected = selected[:max(limit, 0)]
+
+        results = {'symbol': names[selected].tolist(), 'as_of': as_of[selected]}
+        results.update({field: values[selected] for field, values in columns.items()})
+        return {'matched': int(mask.sum()), 'screened': int(len(rows)), 'results': results}
+
+    def stats(self):
+        """
+        Return the number of indexed symbols, applied updates and evicted rows.
+
+        Повертає кількість проіндексованих символів, застосованих оновлень та витіснених рядків.
+        """
+        with self._lock:
+            return {'symbols': len(self._rows), 'updates': self.updates, 'evictions': self.evictions}
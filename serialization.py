@@ -0,0 +1,278 @@
+"""
+Response serialization helpers.
+
+Column-oriented JSON, optional Apache Arrow IPC and response compression
+for the stock data endpoints. orjson, pyarrow and brotli are optional;
+the standard library is used when they are not installed.
+
+Допоміжні функції серіалізації відповідей.
+
+Стовпчиковий JSON, необов'язковий формат Apache Arrow IPC та стиснення
+відповідей для ендпоінтів даних акцій. orjson, pyarrow та brotli
+необов'язкові; якщо їх не встановлено, використовується стандартна бібліотека.
+"""
+
+import gzip
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+JSON_MIMETYPE = 'application/json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# Formats accepted by the format= query parameter
+# Формати, які приймає параметр запиту format=
+FORMATS = ('records', 'columns', 'arrow')
+
+# Responses smaller than this are not worth compressing
+# Відповіді, менші за цей розмір, не варто стискати
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSIBLE_MIMETYPES = (JSON_MIMETYPE, ARROW_MIMETYPE, 'text/csv', 'application/x-ndjson')
+
+
+def format_dates(index):
+    """
+    Format a DatetimeIndex as strings in one vectorized call.
+    Daily bars become 'YYYY-MM-DD', intraday bars 'YYYY-MM-DD HH:MM'.
+
+    Args:
+        index (DatetimeIndex): Bar timestamps
+
+    Returns:
+        ndarray: Array of date strings
+
+    Форматує DatetimeIndex у рядки одним векторизованим викликом.
+    Денні бари стають 'YYYY-MM-DD', внутрішньоденні - 'YYYY-MM-DD HH:MM'.
+
+    Аргументи:
+        index (DatetimeIndex): Мітки часу барів
+
+    Повертає:
+        ndarray: Масив рядків дат
+    """
+    values = pd.DatetimeIndex(index).tz_localize(None).to_numpy(dtype='datetime64[ns]')
+    days = values.astype('datetime64[D]')
+    if (values != days).any():
+        return np.char.replace(np.datetime_as_string(values, unit='m'), 'T', ' ')
+    return np.datetime_as_string(days, unit='D')
+
+
+def frame_to_columns(data, is_demo=False):
+    """
+    Convert an OHLCV DataFrame into a column-oriented payload.
+
+    Args:
+        data (DataFrame): OHLCV data with a DatetimeIndex
+        is_demo (bool): Value of the single IsDemo flag
+
+    Returns:
+        dict: One array per field plus a scalar IsDemo flag
+
+    Перетворює DataFrame з OHLCV на стовпчикове представлення.
+
+    Аргументи:
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+        is_demo (bool): Значення єдиної позначки IsDemo
+
+    Повертає:
+        dict: Один масив на поле та скалярна позначка IsDemo
+    """
+    payload = {'Date': format_dates(data.index).tolist()}
+    for field in FIELDS:
+        if field in data.columns:
+            payload[field] = data[field].to_numpy(dtype='f8', na_value=np.nan)
+    payload['IsDemo'] = bool(is_demo)
+    return payload
+
+
+def frame_etag(data, *parts):
+    """
+    Derive an ETag from the raw index and column buffers of a frame.
+    Hashing the arrays is much cheaper than serializing them, so an
+    unchanged version can be answered with 304 before any payload is built.
+
+    Args:
+        data (DataFrame): OHLCV data with a DatetimeIndex
+        *parts: Request parameters that also shape the response body
+
+    Returns:
+        str: Hex digest usable as an ETag
+
+    Обчислює ETag із сирих буферів індексу та стовпців DataFrame.
+    Хешування масивів значно дешевше за серіалізацію, тому на незмінену
+    версію можна відповісти 304 ще до побудови даних відповіді.
+
+    Аргументи:
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+        *parts: Параметри запиту, що також визначають тіло відповіді
+
+    Повертає:
+        str: Шістнадцятковий дайджест, придатний як ETag
+    """
+    digest = hashlib.blake2b('\0'.join(map(str, parts)).encode('utf-8'), digest_size=12)
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(data.index).as_unit('ns').asi8).data)
+    for field in FIELDS:
+        if field in data.columns:
+            digest.update(field.encode('utf-8'))
+            digest.update(np.ascontiguousarray(data[field].to_numpy(dtype='f8', na_value=np.nan)).data)
+    return digest.hexdigest()
+
+
+def _to_builtin(value):
+    """
+    Convert NumPy values for the standard json module, NaN becomes None.
+
+    Перетворює значення NumPy для стандартного модуля json, NaN стає None.
+    """
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return np.where(np.isnan(value), None, value).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _sanitize(value):
+    """
+    Recursively replace float NaN with None in a plain Python structure.
+
+    Рекурсивно замінює float NaN на None у звичайній структурі Python.
+    """
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, dict):
+        return {k: _sanitize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_sanitize(v) for v in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _to_builtin(value)
+    return value
+
+
+def dumps_json(payload):
+    """
+    Serialize a payload to JSON bytes with the fastest available encoder.
+    NumPy arrays are supported and NaN is encoded as null.
+
+    Args:
+        payload (object): Dicts, lists, scalars and NumPy arrays
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+
+    Серіалізує дані в JSON-байти найшвидшим доступним кодувальником.
+    Підтримуються масиви NumPy, NaN кодується як null.
+
+    Аргументи:
+        payload (object): Словники, списки, скаляри та масиви NumPy
+
+    Повертає:
+        bytes: JSON у кодуванні UTF-8
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_to_builtin, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_sanitize(payload), separators=(',', ':')).encode('utf-8')
+
+
+def arrow_available():
+    """
+    Check whether the Arrow IPC format can be produced.
+
+    Перевіряє, чи можна сформувати формат Arrow IPC.
+    """
+    return pa is not None
+
+
+def frame_to_arrow(data, is_demo=False):
+    """
+    Serialize an OHLCV DataFrame as an Arrow IPC stream.
+    The IsDemo flag is stored in the schema metadata.
+
+    Args:
+        data (DataFrame): OHLCV data with a DatetimeIndex
+        is_demo (bool): Value of the IsDemo flag
+
+    Returns:
+        bytes: Arrow IPC stream
+
+    Серіалізує DataFrame з OHLCV у потік Arrow IPC.
+    Позначка IsDemo зберігається в метаданих схеми.
+
+    Аргументи:
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+        is_demo (bool): Значення позначки IsDemo
+
+    Повертає:
+        bytes: Потік Arrow IPC
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+    arrays = [pa.array(pd.DatetimeIndex(data.index).tz_localize(None).to_numpy(dtype='datetime64[ms]'))]
+    names = ['Date']
+    for field in FIELDS:
+        if field in data.columns:
+            arrays.append(pa.array(data[field].to_numpy(dtype='f8', na_value=np.nan), from_pandas=True))
+            names.append(field)
+    table = pa.Table.from_arrays(arrays, names=names,
+                                 metadata={'IsDemo': 'true' if is_demo else 'false'})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the best supported content encoding the client accepts.
+
+    Args:
+        accept_encodings (Accept): Parsed Accept-Encoding header
+
+    Returns:
+        str: 'br', 'gzip' or None
+
+    Вибирає найкраще підтримуване кодування, яке приймає клієнт.
+
+    Аргументи:
+        accept_encodings (Accept): Розібраний заголовок Accept-Encoding
+
+    Повертає:
+        str: 'br', 'gzip' або None
+    """
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    """
+    Compress a response body with the given content encoding.
+
+    Стискає тіло відповіді заданим кодуванням.
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=5)
@@ -80,6 +80,76 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 });
 
+// Series currently shown, kept so a refresh only fetches what changed
+// Ряд, що зараз відображається, зберігається, щоб оновлення отримувало лише зміни
+let stockSeries = null;
+
+/**
+ * Replace the tail of a column set from the first date of a delta on
+ * 
+ * @param {Object} base - Columns with a sorted Date array
+ * @param {Object} delta - Columns starting at or after some date of base
+ * @returns {Object} New columns; base is not modified
+ * 
+ * Заміна кінця набору стовпців, починаючи з першої дати дельти
+ * 
+ * @param {Object} base - Стовпці з відсортованим масивом Date
+ * @param {Object} delta - Стовпці, що починаються з деякої дати base або пізніше
+ * @returns {Object} Нові стовпці; base не змінюється
+ */
+function spliceColumns(base, delta) {
+    let cut = base.Date.length;
+    if (delta.Date.length > 0) {
+        const index = base.Date.findIndex(date => date >= delta.Date[0]);
+        if (index >= 0) {
+            cut = index;
+        }
+    }
+    const merged = {};
+    Object.keys(base).forEach(function(key) {
+        if (Array.isArray(base[key])) {
+            merged[key] = base[key].slice(0, cut).concat(delta[key] || []);
+        }
+    });
+    return merged;
+}
+
+/**
+ * Merge a since= delta response into the kept series
+ * 
+ * @param {Object} series - Column-oriented data already shown
+ * @param {Object} delta - Column-oriented bars from the last shown date on
+ * @returns {Object} Merged column-oriented data
+ * 
+ * Об'єднання відповіді-дельти since= зі збереженим рядом
+ * 
+ * @param {Object} series - Стовпчикові дані, що вже відображаються
+ * @param {Object} delta - Стовпчикові бари від останньої показаної дати
+ * @returns {Object} Об'єднані стовпчикові дані
+ */
+function mergeStockDelta(series, delta) {
+    const merged = spliceColumns(series, delta);
+    merged.IsDemo = delta.IsDemo;
+    if (series.Trend && delta.Trend) {
+        merged.Trend = spliceColumns(series.Trend, delta.Trend);
+    }
+    return merged;
+}
+
+/**
+ * Copy column arrays so chart updates cannot modify the kept series
+ * 
+ * Копіювання масивів стовпців, щоб оновлення графіків не змінювали збережений ряд
+ */
+function copyColumns(data) {
+    const copy = spliceColumns(data, {Date: []});
+    copy.IsDemo = data.IsDemo;
+    if (data.Trend) {
+        copy.Trend = spliceColumns(data.Trend, {Date: []});
+    }
+    return copy;
+}
+
 /**
  * Loads stock data from the API and updates the dashboard
  * 
@@ -88,6 +158,10 @@ document.addEventListener('DOMContentLoaded', function() {
 function loadStockData() {
     const symbol = document.getElementById('stockSymbol').value || 'AAPL';
     const period = document.getElementById('timePeriod').value || '1mo';
+    // Weekly, monthly and quarterly bars are aggregated by the server
+    // Тижневі, місячні та квартальні бари агрегуються сервером
+    const intervalSelect = document.getElementById('barInterval');
+    const interval = (intervalSelect && intervalSelect.value) || '1d';
     
     // Get selected data source
     // Отримання вибраного джерела даних
@@ -102,6 +176,23 @@ function loadStockData() {
     
     console.log(`Fetching data for ${symbol} over ${period} period. Data source: ${dataSource}`);
     
+    // No more points than the chart has pixels
+    // Не більше точок, ніж пікселів у графіку
+    const maxPoints = Math.max(100, Math.round(document.getElementById('stockChart').clientWidth || 1000));
+    
+    // The same series is refreshed with a delta, anything else is loaded in full;
+    // demo data is regenerated on every request, so it is never merged
+    // Той самий ряд оновлюється дельтою, будь-що інше завантажується повністю;
+    // демо-дані генеруються заново при кожному запиті, тому не об'єднуються
+    const seriesKey = [symbol, period, interval, dataSource, maxPoints].join('|');
+    const kept = !useDemo && stockSeries && stockSeries.key === seriesKey && stockSeries.data.Date.length > 0 ?
+        stockSeries : null;
+    if (kept) {
+        refreshStockData(kept, symbol, period, interval, dataSource);
+        return;
+    }
+    stockSeries = null;
+    
     // Show loading state
     // Відображення стану завантаження
     document.getElementById('stockChart').innerHTML = 'Loading data...';
@@ -116,7 +207,8 @@ function loadStockData() {
     document.getElementById('volume').textContent = 'Loading...';
     
     // Створюємо URL API з параметрами
-    const apiUrl = `/api/stock-data?symbol=${symbol}&period=${period}&demo=${useDemo}&static=${useStatic}`;
+    // Column-oriented format: one array per field and a single IsDemo flag
+    const apiUrl = `/api/stock-data?symbol=${symbol}&period=${period}&interval=${interval}&demo=${useDemo}&static=${useStatic}&format=columns&max_points=${maxPoints}`;
     
     // Використовуємо XMLHttpRequest для отримання даних
     const xhr = new XMLHttpRequest();
@@ -127,25 +219,16 @@ function loadStockData() {
             try {
                 const data = JSON.parse(xhr.responseText);
                 
-                if (!data || data.length === 0) {
+                if (!data || !data.Date || data.Date.length === 0) {
                     document.getElementById('stockChart').innerHTML = 'No data available for this symbol';
                     document.getElementById('trendChart').innerHTML = 'No trend data available';
                     resetPerformanceMetrics();
                     return;
                 }
                 
-                try {
-                    // Update the charts and metrics
-                    // Оновлення графіків та метрик
-                    createStockChart(data, symbol);
-                    createTrendChart(data);
-                    updatePerformanceMetrics(data);
-                } catch (error) {
-                    console.error('Error processing data:', error);
-                    document.getElementById('stockChart').innerHTML = `Error processing data: ${error.message}`;
-                    document.getElementById('trendChart').innerHTML = 'Error creating trend chart';
-                    resetPerformanceMetrics();
-                }
+                stockSeries = {key: seriesKey, data: data, etag: xhr.getResponseHeader('ETag'),
+                    downsampled: xhr.getResponseHeader('X-Downsampled') === 'true'};
+                showStockData(data, symbol, dataSource, interval, stockSeries.downsampled);
             } catch (e) {
                 console.error('Error parsing JSON response:', e);
                 document.getElementById('stockChart').innerHTML = 'Error parsing API response';
@@ -164,9 +247,248 @@ function loadStockData() {
     // Відправляємо запит
     xhr.send();
     
-    // For demonstration, add some market summary data
-    // Для демонстрації додаємо дані зведення по ринку
-    updateMarketSummary(symbol);
+    // Market summary is filled in by the quote stream
+    // Зведення по ринку заповнюється потоком котирувань
+    updateMarketSummary(symbol, null);
+}
+
+/**
+ * Draw the charts and metrics for a column-oriented series
+ * 
+ * @param {Object} data - Column-oriented stock price data
+ * @param {string} symbol - Stock symbol
+ * @param {string} dataSource - 'live', 'static' or 'demo'
+ * @param {string} interval - Bar interval of the data
+ * @param {boolean} downsampled - Whether the points are max_points buckets
+ * 
+ * Малювання графіків та метрик для стовпчикового ряду
+ * 
+ * @param {Object} data - Дані про ціну акцій у стовпчиковому форматі
+ * @param {string} symbol - Символ акції
+ * @param {string} dataSource - 'live', 'static' або 'demo'
+ * @param {string} interval - Інтервал барів даних
+ * @param {boolean} downsampled - Чи є точки бакетами max_points
+ */
+function showStockData(data, symbol, dataSource, interval, downsampled) {
+    try {
+        // Update the charts and metrics
+        // Оновлення графіків та метрик
+        const view = copyColumns(data);
+        createStockChart(view, symbol);
+        createTrendChart(view);
+        updatePerformanceMetrics(view);
+        
+        // Keep the charts current with streamed quotes; demo charts are
+        // regenerated per request, so their summary comes from the series itself
+        // Підтримка актуальності графіків за допомогою потокових котирувань; демо-графіки
+        // генеруються для кожного запиту, тому їхнє зведення береться з самого ряду
+        startQuoteStream(symbol, dataSource, interval, downsampled);
+        if (dataSource === 'demo') {
+            updateMarketSummary(symbol, seriesQuote(view));
+        }
+    } catch (error) {
+        console.error('Error processing data:', error);
+        document.getElementById('stockChart').innerHTML = `Error processing data: ${error.message}`;
+        document.getElementById('trendChart').innerHTML = 'Error creating trend chart';
+        resetPerformanceMetrics();
+    }
+}
+
+/**
+ * Refresh the shown series with bars from its last date on
+ * The server answers 304 when the series has not changed and sends
+ * a downsampled series whole, which then replaces the kept one
+ * 
+ * @param {Object} kept - Kept series with its key, data and ETag
+ * @param {string} symbol - Stock symbol
+ * @param {string} period - Time period
+ * @param {string} interval - Bar interval
+ * @param {string} dataSource - 'live', 'static' or 'demo'
+ * 
+ * Оновлення показаного ряду барами від його останньої дати
+ * Сервер відповідає 304, якщо ряд не змінився, а зменшений ряд
+ * надсилає повністю, і він замінює збережений
+ * 
+ * @param {Object} kept - Збережений ряд з ключем, даними та ETag
+ * @param {string} symbol - Символ акції
+ * @param {string} period - Часовий період
+ * @param {string} interval - Інтервал барів
+ * @param {string} dataSource - 'live', 'static' або 'demo'
+ */
+function refreshStockData(kept, symbol, period, interval, dataSource) {
+    const maxPoints = kept.key.split('|').pop();
+    const since = kept.data.Date[kept.data.Date.length - 1];
+    const apiUrl = `/api/stock-data?symbol=${symbol}&period=${period}&interval=${interval}` +
+        `&demo=${dataSource === 'demo'}&static=${dataSource === 'static'}&format=columns` +
+        `&max_points=${maxPoints}&since=${encodeURIComponent(since)}`;
+    
+    const xhr = new XMLHttpRequest();
+    xhr.open('GET', apiUrl, true);
+    if (kept.etag) {
+        xhr.setRequestHeader('If-None-Match', kept.etag);
+    }
+    
+    xhr.onload = function() {
+        if (xhr.status === 304) {
+            console.log(`No new data for ${symbol}`);
+            return;
+        }
+        if (xhr.status !== 200) {
+            console.error('Delta request failed, status:', xhr.status);
+            return;
+        }
+        try {
+            const delta = JSON.parse(xhr.responseText);
+            // A downsampled series comes back whole: its buckets cannot be merged bar by bar
+            // Зменшений ряд повертається повністю: його бакети не можна об'єднувати побарово
+            const downsampled = xhr.getResponseHeader('X-Downsampled') === 'true';
+            const data = downsampled ? delta : mergeStockDelta(kept.data, delta);
+            console.log(downsampled ? `Reloaded ${delta.Date.length} points for ${symbol}` :
+                `Merged ${delta.Date.length} bars for ${symbol}`);
+            stockSeries = {key: kept.key, data: data, etag: xhr.getResponseHeader('ETag'), downsampled: downsampled};
+            showStockData(data, symbol, dataSource, interval, downsampled);
+        } catch (e) {
+            console.error('Error merging delta response:', e);
+        }
+    };
+    
+    xhr.onerror = function() {
+        console.error('Delta request failed due to network error');
+    };
+    
+    xhr.send();
+}
+
+/**
+ * Build a market summary quote from the last two points of a series
+ * 
+ * @param {Object} data - Column-oriented stock price data
+ * @returns {Object|null} Quote with price, change and the last bar date
+ * 
+ * Формування котирування для зведення з двох останніх точок ряду
+ * 
+ * @param {Object} data - Дані про ціну акцій у стовпчиковому форматі
+ * @returns {Object|null} Котирування з ціною, зміною та датою останнього бару
+ */
+function seriesQuote(data) {
+    const last = data.Close.length - 1;
+    if (last < 0) {
+        return null;
+    }
+    const price = data.Close[last];
+    const prevClose = last > 0 ? data.Close[last - 1] : data.Open[last];
+    return {
+        price: price,
+        change_pct: prevClose ? (price - prevClose) / prevClose * 100 : 0,
+        bar: {Date: data.Date[last]}
+    };
+}
+
+// Currently open quote stream
+// Поточний відкритий потік котирувань
+let quoteStream = null;
+
+/**
+ * Subscribe to streamed quotes for the displayed symbol
+ * Static and demo data and aggregated (weekly and longer) bars are not
+ * streamed: the demo stream is its own random walk, unrelated to the
+ * demo series on the chart;
+ * quotes for a downsampled series only update the market summary, since
+ * its last point is a bucket of many bars rather than the current bar
+ * 
+ * @param {string} symbol - Stock symbol
+ * @param {string} dataSource - 'live', 'static' or 'demo'
+ * @param {string} interval - Bar interval of the charts
+ * @param {boolean} downsampled - Whether the charts show max_points buckets
+ * 
+ * Підписка на потокові котирування для відображеного символу
+ * Статичні та демо-дані й агреговані (тижневі й довші) бари не передаються
+ * потоком: демо-потік - окреме випадкове блукання, не пов'язане з
+ * демо-рядом на графіку;
+ * котирування для зменшеного ряду оновлюють лише зведення по ринку, адже
+ * його остання точка - бакет із багатьох барів, а не поточний бар
+ * 
+ * @param {string} symbol - Символ акції
+ * @param {string} dataSource - 'live', 'static' або 'demo'
+ * @param {string} interval - Інтервал барів графіків
+ * @param {boolean} downsampled - Чи показують графіки бакети max_points
+ */
+function startQuoteStream(symbol, dataSource, interval, downsampled) {
+    if (quoteStream) {
+        quoteStream.close();
+        quoteStream = null;
+    }
+    if (dataSource !== 'live' || interval !== '1d' || !window.EventSource) {
+        return;
+    }
+    
+    quoteStream = new EventSource(`/api/stream?symbol=${symbol}`);
+    quoteStream.addEventListener('quote', function(event) {
+        try {
+            const quote = JSON.parse(event.data);
+            if (!downsampled) {
+                applyQuote(quote);
+            }
+            updateMarketSummary(symbol, quote);
+        } catch (error) {
+            console.error('Error applying quote:', error);
+        }
+    });
+    quoteStream.onerror = function() {
+        console.warn('Quote stream interrupted, the browser will reconnect');
+    };
+}
+
+/**
+ * Apply a streamed quote to the charts without redrawing them
+ * A new bar is appended with Plotly.extendTraces, an update of the
+ * current bar changes the last point in place
+ * 
+ * @param {Object} quote - Quote with the latest bar
+ * 
+ * Застосування потокового котирування до графіків без повного перемальовування
+ * Новий бар додається через Plotly.extendTraces, оновлення поточного
+ * бару змінює останню точку на місці
+ * 
+ * @param {Object} quote - Котирування з останнім баром
+ */
+function applyQuote(quote) {
+    const stockChart = document.getElementById('stockChart');
+    const trendChart = document.getElementById('trendChart');
+    if (!stockChart.data || !trendChart.data) {
+        return;
+    }
+    
+    const bar = quote.bar;
+    const candles = stockChart.data[0];
+    const last = candles.x.length - 1;
+    
+    if (last < 0 || bar.Date > candles.x[last]) {
+        Plotly.extendTraces('stockChart', {
+            x: [[bar.Date]],
+            open: [[bar.Open]],
+            high: [[bar.High]],
+            low: [[bar.Low]],
+            close: [[bar.Close]]
+        }, [0]);
+        Plotly.extendTraces('trendChart', {x: [[bar.Date]], y: [[bar.Close]]}, [0]);
+    } else if (bar.Date === candles.x[last]) {
+        candles.high[last] = Math.max(candles.high[last], bar.High);
+        candles.low[last] = Math.min(candles.low[last], bar.Low);
+        candles.close[last] = bar.Close;
+        Plotly.redraw('stockChart');
+        
+        const trend = trendChart.data[0];
+        trend.y[trend.y.length - 1] = bar.Close;
+        Plotly.redraw('trendChart');
+    } else {
+        return;
+    }
+    
+    document.getElementById('closingPrice').textContent = '$' + bar.Close.toFixed(2);
+    document.getElementById('highPrice').textContent = '$' + bar.High.toFixed(2);
+    document.getElementById('lowPrice').textContent = '$' + bar.Low.toFixed(2);
+    document.getElementById('volume').textContent = bar.Volume.toLocaleString();
 }
 
 /**
@@ -185,30 +507,30 @@ function resetPerformanceMetrics() {
 /**
  * Create a candlestick chart for stock price data
  * 
- * @param {Array} data - Stock price data
+ * @param {Object} data - Column-oriented stock price data
  * @param {string} symbol - Stock symbol
  * 
  * Створення графіка "японських свічок" для даних про ціну акцій
  * 
- * @param {Array} data - Дані про ціну акцій
+ * @param {Object} data - Дані про ціну акцій у стовпчиковому форматі
  * @param {string} symbol - Символ акції
  */
 function createStockChart(data, symbol) {
     try {
         // Check if using demo data
         // Перевірка, чи використовуються демо-дані
-        const isDemo = data[0]?.IsDemo === true;
+        const isDemo = data.IsDemo === true;
         const chartTitle = isDemo ? 
             `${symbol} Stock Price (DEMO DATA)` : 
             `${symbol} Stock Price (REAL DATA)`;
         
-        // Prepare data for Plotly
-        // Підготовка даних для Plotly
-        const dates = data.map(item => item.Date);
-        const closePrices = data.map(item => item.Close);
-        const openPrices = data.map(item => item.Open);
-        const highPrices = data.map(item => item.High);
-        const lowPrices = data.map(item => item.Low);
+        // Columns arrive ready for Plotly
+        // Стовпці надходять готовими для Plotly
+        const dates = data.Date;
+        const closePrices = data.Close;
+        const openPrices = data.Open;
+        const highPrices = data.High;
+        const lowPrices = data.Low;
         
         // Create a candlestick chart
         // Створення графіка "японських свічок"
@@ -255,25 +577,28 @@ function createStockChart(data, symbol) {
 /**
  * Create a line chart showing the closing price trend
  * 
- * @param {Array} data - Stock price data
+ * @param {Object} data - Column-oriented stock price data
  * 
  * Створення лінійного графіка, що показує тренд ціни закриття
  * 
- * @param {Array} data - Дані про ціну акцій
+ * @param {Object} data - Дані про ціну акцій у стовпчиковому форматі
  */
 function createTrendChart(data) {
     try {
         // Check if using demo data
         // Перевірка, чи використовуються демо-дані
-        const isDemo = data[0]?.IsDemo === true;
+        const isDemo = data.IsDemo === true;
         const chartTitle = isDemo ?
             'Closing Price Trend (DEMO DATA)' :
             'Closing Price Trend (REAL DATA)';
         
-        // Simple line chart showing the closing price trend
-        // Простий лінійний графік, що показує тренд ціни закриття
-        const dates = data.map(item => item.Date);
-        const closePrices = data.map(item => item.Close);
+        // Simple line chart showing the closing price trend,
+        // using the server-side LTTB series when the data was downsampled
+        // Простий лінійний графік, що показує тренд ціни закриття,
+        // з рядом LTTB від сервера, якщо дані були зменшені
+        const trend = data.Trend || data;
+        const dates = trend.Date;
+        const closePrices = trend.Close;
         
         const trace = {
             x: dates,
@@ -306,25 +631,25 @@ function createTrendChart(data) {
 /**
  * Update performance metrics table with latest data
  * 
- * @param {Array} data - Stock price data
+ * @param {Object} data - Column-oriented stock price data
  * 
  * Оновлення таблиці метрик продуктивності з останніми даними
  * 
- * @param {Array} data - Дані про ціну акцій
+ * @param {Object} data - Дані про ціну акцій у стовпчиковому форматі
  */
 function updatePerformanceMetrics(data) {
     try {
         // Get the most recent data point
         // Отримання найновішої точки даних
-        const latestData = data[data.length - 1];
+        const last = data.Date.length - 1;
         
         // Update the metrics in the table
         // Оновлення метрик у таблиці
-        document.getElementById('openingPrice').textContent = '$' + latestData.Open.toFixed(2);
-        document.getElementById('closingPrice').textContent = '$' + latestData.Close.toFixed(2);
-        document.getElementById('highPrice').textContent = '$' + latestData.High.toFixed(2);
-        document.getElementById('lowPrice').textContent = '$' + latestData.Low.toFixed(2);
-        document.getElementById('volume').textContent = latestData.Volume.toLocaleString();
+        document.getElementById('openingPrice').textContent = '$' + data.Open[last].toFixed(2);
+        document.getElementById('closingPrice').textContent = '$' + data.Close[last].toFixed(2);
+        document.getElementById('highPrice').textContent = '$' + data.High[last].toFixed(2);
+        document.getElementById('lowPrice').textContent = '$' + data.Low[last].toFixed(2);
+        document.getElementById('volume').textContent = data.Volume[last].toLocaleString();
     } catch (error) {
         console.error('Error updating performance metrics:', error);
         resetPerformanceMetrics();
@@ -333,40 +658,48 @@ function updatePerformanceMetrics(data) {
 
 /**
  * Update market summary with stock information
- * Uses simulated data for demonstration purposes
+ * Uses the latest streamed quote
  * 
  * @param {string} symbol - Stock symbol
+ * @param {Object} quote - Latest quote, or null while waiting for one
  * 
  * Оновлення зведення по ринку з інформацією про акції
- * Використовує симульовані дані для демонстраційних цілей
+ * Використовує останнє потокове котирування
  * 
  * @param {string} symbol - Символ акції
+ * @param {Object} quote - Останнє котирування або null під час очікування
  */
-function updateMarketSummary(symbol) {
-    // In a real application, you would fetch this data from an API
-    // В реальному додатку ці дані були б отримані з API
+function updateMarketSummary(symbol, quote) {
     const marketSummary = document.getElementById('marketSummary');
     
     try {
-        // Generate a random change percentage between -2% and +2%
-        // Генерація випадкового відсотка зміни між -2% та +2%
-        const changePercent = (Math.random() * 4 - 2).toFixed(2);
-        const changeClass = changePercent >= 0 ? 'text-success' : 'text-danger';
-        const changeIcon = changePercent >= 0 ? '↑' : '↓';
+        if (!quote) {
+            marketSummary.innerHTML = `
+                <div>
+                    <h3>${symbol}</h3>
+                    <p>Waiting for quotes...</p>
+                </div>
+            `;
+            return;
+        }
+        
+        const changePercent = quote.change_pct.toFixed(2);
+        const changeClass = quote.change_pct >= 0 ? 'text-success' : 'text-danger';
+        const changeIcon = quote.change_pct >= 0 ? '↑' : '↓';
         
         marketSummary.innerHTML = `
             <div class="d-flex justify-content-between">
                 <div>
                     <h3>${symbol}</h3>
-                    <p>Current market conditions</p>
+                    <p>$${quote.price.toFixed(2)}</p>
                 </div>
                 <div>
                     <h3 class="${changeClass}">${changeIcon} ${Math.abs(changePercent)}%</h3>
-                    <p>Today's change</p>
+                    <p>Change since previous close</p>
                 </div>
             </div>
             <div class="mt-3">
-                <p><strong>Market Status:</strong> Open</p>
+                <p><strong>Last Bar:</strong> ${quote.bar.Date}</p>
                 <p><strong>Last Updated:</strong> ${new Date().toLocaleTimeString()}</p>
             </div>
         `;
@@ -0,0 +1,293 @@
+"""
+Quote streaming with one upstream poller per symbol.
+
+A QuoteHub runs a single background poller for every symbol that has at
+least one subscriber and fans new quotes out to all subscriber queues.
+The poller stops when the last subscriber leaves.
+
+Потокова передача котирувань з одним опитувачем джерела на символ.
+
+QuoteHub запускає один фоновий опитувач для кожного символу, що має
+хоча б одного підписника, і розсилає нові котирування в черги всіх
+підписників. Опитувач зупиняється, коли йде останній підписник.
+"""
+
+import logging
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def frame_quote(symbol, data):
+    """
+    Build a quote from the last bars of an OHLCV DataFrame.
+
+    Args:
+        symbol (str): Stock symbol
+        data (DataFrame): OHLCV data with a DatetimeIndex
+
+    Returns:
+        dict: Latest bar plus change against the previous close, or None
+
+    Формує котирування з останніх барів DataFrame з OHLCV.
+
+    Аргументи:
+        symbol (str): Символ акції
+        data (DataFrame): Дані OHLCV з DatetimeIndex
+
+    Повертає:
+        dict: Останній бар та зміна відносно попереднього закриття, або None
+    """
+    if data is None or len(data) == 0:
+        return None
+    last = data.iloc[-1]
+    stamp = pd.Timestamp(data.index[-1])
+    fmt = '%Y-%m-%d' if stamp == stamp.normalize() else '%Y-%m-%d %H:%M'
+    price = float(last['Close'])
+    prev_close = float(data['Close'].iloc[-2]) if len(data) > 1 else float(last['Open'])
+    change = price - prev_close
+    return {
+        'symbol': symbol,
+        'bar': {
+            'Date': stamp.strftime(fmt),
+            'Open': float(last['Open']),
+            'High': float(last['High']),
+            'Low': float(last['Low']),
+            'Close': price,
+            'Volume': float(last['Volume'])
+        },
+        'price': price,
+        'prev_close': prev_close,
+        'change': change,
+        'change_pct': change / prev_close * 100 if prev_close else 0.0
+    }
+
+
+class DemoQuoteSource:
+    """
+    Simulated quote source that keeps moving the last bar of demo history.
+    A new bar starts every ``ticks_per_bar`` calls.
+
+    Args:
+        history (callable): Function returning a demo OHLCV DataFrame for a symbol
+        ticks_per_bar (int): Number of quotes before a new bar is started
+        seed (int): Optional seed for reproducible moves
+
+    Симульоване джерело котирувань, що рухає останній бар демо-історії.
+    Новий бар починається кожні ``ticks_per_bar`` викликів.
+
+    Аргументи:
+        history (callable): Функція, що повертає демо DataFrame з OHLCV для символу
+        ticks_per_bar (int): Кількість котирувань до початку нового бару
+        seed (int): Необов'язкове зерно для відтворюваних рухів
+    """
+
+    def __init__(self, history, ticks_per_bar=12, seed=None):
+        self.history = history
+        self.ticks_per_bar = ticks_per_bar
+        self._rng = np.random.default_rng(seed)
+        self._frames = {}
+        self._ticks = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol):
+        with self._lock:
+            data = self._frames.get(symbol)
+            if data is None:
+                data = self.history(symbol).tail(2).copy()
+                self._ticks[symbol] = 0
+            self._ticks[symbol] += 1
+            close = float(data['Close'].iloc[-1])
+            if self._ticks[symbol] % self.ticks_per_bar == 0:
+                # Start the next business-day bar at the previous close
+                # Початок бару наступного робочого дня з попереднього закриття
+                stamp = data.index[-1] + pd.offsets.BDay(1)
+                data.loc[stamp] = [close, close, close, close, 0.0]
+                data = data.tail(2)
+            step = close * np.exp(self._rng.normal(0.0, 0.002))
+            stamp = data.index[-1]
+            data.loc[stamp, 'Close'] = step
+            data.loc[stamp, 'High'] = max(data.loc[stamp, 'High'], step)
+            data.loc[stamp, 'Low'] = min(data.loc[stamp, 'Low'], step)
+            data.loc[stamp, 'Volume'] += float(self._rng.integers(1000, 50000))
+            self._frames[symbol] = data
+            return frame_quote(symbol, data)
+
+
+class Subscription:
+    """
+    A subscriber's queue of quote updates for one symbol.
+
+    Черга оновлень котирувань підписника для одного символу.
+    """
+
+    def __init__(self, symbol, maxsize):
+        self.symbol = symbol
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout=None):
+        """
+        Wait for the next quote; return None on timeout.
+
+        Очікує наступне котирування; повертає None після тайм-ауту.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, quote):
+        """
+        Queue a quote, dropping the oldest one if the subscriber is slow.
+
+        Returns:
+            int: Number of dropped quotes
+
+        Додає котирування в чергу, відкидаючи найстаріше, якщо підписник повільний.
+
+        Повертає:
+            int: Кількість відкинутих котирувань
+        """
+        dropped = 0
+        while True:
+            try:
+                self.queue.put_nowait(quote)
+                return dropped
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class QuoteHub:
+    """
+    Fans quotes from one poller per symbol out to many subscribers.
+
+    Args:
+        source (callable): Function returning the latest quote dict for a symbol
+        poll_interval (float): Seconds between polls of one symbol
+        queue_size (int): Maximum queued quotes per subscriber
+
+    Розсилає котирування від одного опитувача на символ багатьом підписникам.
+
+    Аргументи:
+        source (callable): Функція, що повертає останнє котирування для символу
+        poll_interval (float): Секунди між опитуваннями одного символу
+        queue_size (int): Максимальна кількість котирувань у черзі підписника
+    """
+
+    def __init__(self, source, poll_interval=5.0, queue_size=100):
+        self.source = source
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._pollers = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.poll_errors = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, symbol):
+        """
+        Subscribe to a symbol, starting its poller if needed.
+        The latest known quote, if any, is queued immediately.
+
+        Підписується на символ, за потреби запускаючи його опитувач.
+        Останнє відоме котирування, якщо є, одразу додається в чергу.
+        """
+        symbol = symbol.strip().upper()
+        subscription = Subscription(symbol, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(symbol, set()).add(subscription)
+            if symbol in self._last:
+                subscription.put(self._last[symbol])
+            if symbol not in self._pollers:
+                stop = threading.Event()
+                thread = threading.Thread(target=self._poll, args=(symbol, stop),
+                                          name=f"quote-poller-{symbol}", daemon=True)
+                self._pollers[symbol] = stop
+                thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a subscription, stopping the poller after the last one leaves.
+
+        Видаляє підписку, зупиняючи опитувач після виходу останнього підписника.
+        """
+        symbol = subscription.symbol
+        with self._lock:
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._last.pop(symbol, None)
+                stop = self._pollers.pop(symbol, None)
+                if stop is not None:
+                    stop.set()
+
+    def _poll(self, symbol, stop):
+        """
+        Poll the source for one symbol and publish changed quotes.
+
+        Опитує джерело для одного символу та публікує змінені котирування.
+        """
+        logger.info(f"Quote poller started for {symbol}")
+        while not stop.is_set():
+            try:
+                quote = self.source(symbol)
+                with self._lock:
+                    self.polls += 1
+            except Exception as e:
+                with self._lock:
+                    self.poll_errors += 1
+                logger.warning(f"Quote poll failed for {symbol}: {e}")
+                quote = None
+            if quote is not None:
+                self._publish(symbol, quote, stop)
+            stop.wait(self.poll_interval)
+        logger.info(f"Quote poller stopped for {symbol}")
+
+    def _publish(self, symbol, quote, stop):
+        """
+        Send a quote to every subscriber unless it equals the last one.
+
+        Надсилає котирування кожному підписнику, якщо воно відрізняється від останнього.
+        """
+        with self._lock:
+            if stop.is_set() or self._last.get(symbol) == quote:
+                return
+            self._last[symbol] = quote
+            subscribers = list(self._subscribers.get(symbol, ()))
+            self.published += 1
+        dropped = sum(subscription.put(quote) for subscription in subscribers)
+        if dropped:
+            with self._lock:
+                self.dropped += dropped
+
+    def stats(self):
+        """
+        Return poller and subscriber counters.
+
+        Повертає лічильники опитувачів та підписників.
+        """
+        with self._lock:
+            return {
+                "symbols": sorted(self._pollers),
+                "pollers": len(self._pollers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "polls": self.polls,
+                "poll_errors": self.poll_errors,
+                "published": self.published,
+                "dropped": self.dropped
+            }
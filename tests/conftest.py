@@ -0,0 +1,12 @@
+"""
+Shared pytest setup: make the flat modules at the repository root importable.
+
+Спільне налаштування pytest: модулі в корені репозиторію стають доступними для імпорту.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app import app, generate_demo_frame
+from downsample import resample_ohlc
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_start_and_end_bound_the_returned_bars(client):
+    response = client.get('/api/stock-data?symbol=AAPL&demo=true&seed=1&format=columns'
+                          '&start=2024-01-10&end=2024-02-15&interval=1wk')
+    dates = pd.DatetimeIndex(response.get_json()['Date'])
+
+    assert response.status_code == 200
+    assert dates[0] >= pd.Timestamp('2024-01-10') and dates[-1] <= pd.Timestamp('2024-02-15')
+    assert dates.is_monotonic_increasing and len(dates) == 6
+
+
+def test_batch_resamples_calendar_intervals_from_daily_bars(client):
+    response = client.get('/api/stock-data/batch?symbols=AAPL,MSFT&demo=true&seed=1&period=6mo'
+                          '&interval=1wk&format=columns')
+    daily = generate_demo_frame('MSFT', '6mo', '1d', seed=1)
+    expected = resample_ohlc(daily, '1wk')
+    result = response.get_json()['MSFT']
+
+    assert result['source'] == 'demo'
+    assert result['data']['Date'] == expected.index.strftime('%Y-%m-%d').tolist()
+    assert result['data']['Close'] == pytest.approx(expected['Close'].tolist())
+    assert result['data']['Volume'] == pytest.approx(expected['Volume'].tolist())
+
+
+def test_etag_is_weak_and_shared_by_every_content_coding(client):
+    url = '/api/stock-data?symbol=AAPL&demo=true&seed=1&period=1y&format=columns'
+    plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+    gzipped = client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+    assert gzipped.headers['Content-Encoding'] == 'gzip' and 'Content-Encoding' not in plain.headers
+    assert plain.headers['ETag'].startswith('W/"') and plain.headers['ETag'] == gzipped.headers['ETag']
+    revalidated = client.get(url, headers={'If-None-Match': gzipped.headers['ETag']})
+    assert revalidated.status_code == 304 and revalidated.headers['ETag'] == plain.headers['ETag']
+
+
+def test_stage_and_source_metrics_are_labelled_by_endpoint_and_worker(client):
+    client.get('/api/stock-data/batch?symbols=AAPL,MSFT&demo=true&seed=1')
+    client.get('/api/export?symbols=AAPL&demo=true&seed=1').get_data()
+    body = client.get('/metrics').get_data(as_text=True)
+
+    worker = f'worker="{os.getpid()}"'
+    assert f'stock_data_source_total{{{worker},endpoint="dashboard.stock_data_batch",source="demo"}} ' in body
+    assert f'stock_data_source_total{{{worker},endpoint="dashboard.export_endpoint",source="demo"}} ' in body
+    assert 'endpoint="background"' not in body
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.001)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(clock=FakeClock())
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: cache.stats()['misses'] == 8)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ['value'] * 8
+
+
+def test_expired_entry_is_served_while_revalidating():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=100, clock=clock)
+    cache.get_or_load('k', lambda: 'old')
+    clock.now = 50
+
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return 'new'
+
+    assert cache.get_or_load('k', slow_loader) == 'old'
+    assert cache.get_or_load('k', slow_loader) == 'old'
+    assert cache.stats()['stale_hits'] == 2
+    release.set()
+    wait_until(lambda: cache.stats()['in_flight'] == 0)
+
+    assert cache.get_or_load('k', lambda: pytest.fail("entry should be fresh")) == 'new'
+
+
+def test_failed_reload_serves_the_expired_value():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=10, clock=clock)
+    cache.get_or_load('k', lambda: 'old')
+    clock.now = 100
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    assert cache.get_or_load('k', failing) == 'old'
+    assert cache.stats()['stale_on_error'] == 1
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('other', failing)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, clock=FakeClock())
+    cache.get_or_load('a', lambda: 1)
+    cache.get_or_load('b', lambda: 2)
+    cache.get_or_load('a', lambda: pytest.fail("'a' should be cached"))
+    cache.get_or_load('c', lambda: 3)
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.get_or_load('a', lambda: pytest.fail("'a' should be cached")) == 1
+    assert cache.get_or_load('b', lambda: 'reloaded') == 'reloaded'
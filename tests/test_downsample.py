@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import (aggregate_ohlc, bucket_starts, calendar_starts, downsample_ohlc, downsample_trend,
+                        lttb_indices, resample_ohlc)
+
+
+def make_frame(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = np.append(100.0, close[:-1])
+    index = pd.bdate_range('2015-01-01', periods=n, name='Date')
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close) * 1.01,
+                         'Low': np.minimum(open_, close) * 0.99, 'Close': close,
+                         'Volume': rng.integers(1000, 5000, n).astype('f8')}, index=index)
+
+
+@pytest.mark.parametrize('n, n_out', [(1000, 100), (1000, 3), (257, 50), (10, 9)])
+def test_lttb_keeps_endpoints_and_at_most_n_out_sorted_points(n, n_out):
+    y = make_frame(n)['Close'].to_numpy()
+    kept = lttb_indices(np.arange(n), y, n_out)
+
+    assert len(kept) == n_out
+    assert kept[0] == 0 and kept[-1] == n - 1
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(500)
+    y[321] = 50.0
+    assert 321 in lttb_indices(np.arange(500), y, 20)
+
+
+@pytest.mark.parametrize('n, max_points', [(1000, 100), (1000, 7), (101, 100)])
+def test_ohlc_buckets_keep_first_open_extremes_last_close_and_summed_volume(n, max_points):
+    data = make_frame(n)
+    out = downsample_ohlc(data, max_points)
+    starts = bucket_starts(n, max_points)
+    ends = np.append(starts[1:], n)
+
+    assert len(out) <= max_points
+    assert out.index[0] == data.index[0]
+    assert out['Close'].iloc[-1] == data['Close'].iloc[-1]
+    for row, (lo, hi) in enumerate(zip(starts, ends)):
+        bucket = data.iloc[lo:hi]
+        assert out.index[row] == bucket.index[0]
+        assert out['Open'].iloc[row] == bucket['Open'].iloc[0]
+        assert out['High'].iloc[row] == bucket['High'].max()
+        assert out['Low'].iloc[row] == bucket['Low'].min()
+        assert out['Close'].iloc[row] == bucket['Close'].iloc[-1]
+        assert out['Volume'].iloc[row] == pytest.approx(bucket['Volume'].sum())
+
+
+def test_ohlc_buckets_skip_nan_extremes():
+    data = make_frame(10)
+    data.iloc[2, data.columns.get_loc('High')] = np.nan
+    out = aggregate_ohlc(data, np.array([0, 5]))
+    assert out['High'].iloc[0] == data['High'].iloc[:5].max()
+
+
+@pytest.mark.parametrize('reduce', [downsample_ohlc, downsample_trend])
+def test_short_input_comes_back_unchanged(reduce):
+    data = make_frame(50)
+    assert reduce(data, 50) is data
+    assert reduce(data, 500) is data
+
+
+def test_trend_keeps_rows_of_the_input():
+    data = make_frame(2000)
+    out = downsample_trend(data, 300)
+
+    assert len(out) == 300
+    assert out.index[0] == data.index[0] and out.index[-1] == data.index[-1]
+    pd.testing.assert_frame_equal(out, data.loc[out.index])
+
+
+@pytest.mark.parametrize('interval, period', [('1wk', 'W'), ('1mo', 'M'), ('1q', 'Q')])
+def test_calendar_bars_match_pandas_grouping_on_period_boundaries(interval, period):
+    data = make_frame(400)
+    data = data.drop(data.index[[5, 6, 40]])  # Gaps must not split or merge buckets
+    out = resample_ohlc(data, interval)
+
+    groups = data.groupby(data.index.to_period(period))
+    expected = pd.DataFrame({'Open': groups['Open'].first(), 'High': groups['High'].max(),
+                             'Low': groups['Low'].min(), 'Close': groups['Close'].last(),
+                             'Volume': groups['Volume'].sum()})
+    expected.index = groups.apply(lambda group: group.index[0]).rename('Date').values
+    pd.testing.assert_frame_equal(out, expected, check_names=False, check_freq=False)
+
+
+def test_weeks_start_on_monday_and_months_on_the_first_trading_day():
+    index = pd.DatetimeIndex(['2024-01-26', '2024-01-29', '2024-01-31', '2024-02-01', '2024-02-02', '2024-04-01'])
+    np.testing.assert_array_equal(calendar_starts(index, '1wk'), [0, 1, 5])
+    np.testing.assert_array_equal(calendar_starts(index, '1mo'), [0, 3, 5])
+    np.testing.assert_array_equal(calendar_starts(index, '1q'), [0, 5])
+    with pytest.raises(ValueError):
+        calendar_starts(index, '2wk')
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorEngine, TRADING_DAYS, parse_specs
+
+
+def make_frame(n=300, nan_rows=(100,)):
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    close[list(nan_rows)] = np.nan
+    index = pd.bdate_range('2020-01-01', periods=n, name='Date')
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': np.full(n, 1e6)}, index=index)
+
+
+def test_sma_and_bollinger_match_pandas_rolling_with_nan():
+    data = make_frame()
+    values, _ = IndicatorEngine('sma:20,bb:20:2').compute(data)
+    rolling = data['Close'].rolling(20)
+    mid, std = rolling.mean(), rolling.std(ddof=0)
+
+    np.testing.assert_allclose(values['sma_20'], mid.to_numpy(), equal_nan=True)
+    np.testing.assert_allclose(values['bb_upper_20_2'], (mid + 2 * std).to_numpy(), equal_nan=True)
+    np.testing.assert_allclose(values['bb_lower_20_2'], (mid - 2 * std).to_numpy(), equal_nan=True)
+    assert np.isnan(values['sma_20']).sum() == mid.isna().sum()
+
+
+def test_volatility_matches_pandas_rolling_with_nan():
+    data = make_frame()
+    values, _ = IndicatorEngine('vol:20').compute(data)
+    returns = np.log(data['Close'] / data['Close'].shift())
+    expected = returns.rolling(20).std() * np.sqrt(TRADING_DAYS)
+
+    np.testing.assert_allclose(values['vol_20'], expected.to_numpy(), equal_nan=True)
+
+
+@pytest.mark.parametrize('spec', ['sma:0.5', 'sma:2.5', 'rsi:0.5', 'ema:0', 'bb:1', 'vol:1', 'macd:12:26.5:9'])
+def test_parse_specs_rejects_invalid_windows(spec):
+    with pytest.raises(ValueError):
+        parse_specs(spec)
+
+
+def test_parse_specs_accepts_fractional_band_width():
+    (bands,) = parse_specs('bb:20:2.5')
+    assert bands.key == 'bb_20_2.5'
+
+
+SPEC = 'sma:20,ema:12,bb:20:2,vol:20,macd:12:26:9,rsi:14,atr:14,vwap'
+
+
+@pytest.mark.parametrize('k', [1, 7, 120])
+def test_update_matches_a_full_recompute(k):
+    data = make_frame(nan_rows=(3, 100, 240, 295, 299))
+    engine = IndicatorEngine(SPEC)
+    expected, _ = engine.compute(data)
+    head, state = engine.compute(data.iloc[:-k])
+    tail, _ = engine.update(state, data.iloc[-k:])
+
+    assert set(tail) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_allclose(np.concatenate([head[name], tail[name]]), values,
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_chained_single_bar_updates_match_a_full_recompute():
+    data = make_frame(nan_rows=(100, 250, 251))
+    engine = IndicatorEngine(SPEC)
+    expected, _ = engine.compute(data)
+    outputs, state = engine.compute(data.iloc[:200])
+    parts = [outputs]
+    for i in range(200, len(data)):
+        values, state = engine.update(state, data.iloc[i:i + 1])
+        parts.append(values)
+
+    for name, values in expected.items():
+        np.testing.assert_allclose(np.concatenate([part[name] for part in parts]), values,
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
@@ -0,0 +1,129 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ohlcv_store import OHLCVStore, period_covering, period_start, slice_frame
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubFetch:
+    """yf.download stand-in returning business-day bars up to ``last``; Close is shifted by ``bump``."""
+
+    def __init__(self, last):
+        self.last = pd.Timestamp(last)
+        self.bump = 0.0
+        self.calls = []
+
+    def __call__(self, symbol, period=None, start=None, interval='1d', progress=False):
+        self.calls.append({'period': period, 'start': start})
+        first = pd.Timestamp(period_start(period)) if period else pd.Timestamp(start)
+        index = pd.bdate_range(first, self.last, name='Date')
+        close = index.dayofyear.to_numpy(dtype='f8') + self.bump
+        return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                             'Volume': np.full(len(index), 1e6)}, index=index)
+
+
+def failing_fetch(*args, **kwargs):
+    raise AssertionError("the upstream should not be called")
+
+
+def test_first_get_fetches_the_full_period(tmp_path):
+    fetch = StubFetch(pd.Timestamp.now().normalize())
+    store = OHLCVStore(str(tmp_path), fetch, min_refresh=60, clock=FakeClock())
+    data = store.get('aapl', '1mo')
+
+    assert fetch.calls == [{'period': '1mo', 'start': None}]
+    assert len(data) > 15 and data.index.is_monotonic_increasing
+    assert data.index[0] >= pd.Timestamp(period_start('1mo'))
+    bars, meta = store.load('AAPL')
+    assert len(bars) == len(data) and meta['coverage_start'] == period_start('1mo')
+
+
+def test_stale_get_fetches_only_the_tail_and_replaces_the_last_bar(tmp_path):
+    today = pd.Timestamp.now().normalize()
+    fetch = StubFetch(today - pd.offsets.BDay(3))
+    clock = FakeClock()
+    store = OHLCVStore(str(tmp_path), fetch, min_refresh=60, clock=clock)
+    before = store.get('AAPL', '1mo')
+
+    clock.now += 61
+    fetch.last, fetch.bump = today, 0.5
+    after = store.get('AAPL', '1mo')
+
+    assert fetch.calls[1] == {'period': None, 'start': before.index[-1].strftime('%Y-%m-%d')}
+    assert after.index.is_unique and after.index.is_monotonic_increasing
+    assert len(after) == len(before) + len(pd.bdate_range(before.index[-1], today)) - 1
+    pd.testing.assert_frame_equal(after.iloc[:len(before) - 1], before.iloc[:-1])
+    assert after.loc[before.index[-1], 'Close'] == before['Close'].iloc[-1] + 0.5
+
+
+def test_restart_reads_the_stored_file_without_the_upstream(tmp_path):
+    clock = FakeClock()
+    first = OHLCVStore(str(tmp_path), StubFetch(pd.Timestamp.now().normalize()), clock=clock)
+    expected = first.get('MSFT', '3mo')
+
+    restarted = OHLCVStore(str(tmp_path), failing_fetch, clock=clock)
+    pd.testing.assert_frame_equal(restarted.get('MSFT', '1mo'), slice_frame(expected, period_start('1mo')))
+    pd.testing.assert_frame_equal(restarted.get('MSFT', '3mo'), expected)
+
+
+def test_longer_period_refetches_and_extends_coverage(tmp_path):
+    fetch = StubFetch(pd.Timestamp.now().normalize())
+    store = OHLCVStore(str(tmp_path), fetch, clock=FakeClock())
+    store.get('TSLA', '1mo')
+    data = store.get('TSLA', '6mo')
+
+    assert [call['period'] for call in fetch.calls] == ['1mo', '6mo']
+    assert data.index.is_unique and data.index[0] >= pd.Timestamp(period_start('6mo'))
+    assert store.load('TSLA')[1]['coverage_start'] == period_start('6mo')
+
+
+def test_concurrent_cold_gets_download_once(tmp_path):
+    release = threading.Event()
+    stub = StubFetch(pd.Timestamp.now().normalize())
+
+    def slow_fetch(*args, **kwargs):
+        release.wait(5)
+        return stub(*args, **kwargs)
+
+    store = OHLCVStore(str(tmp_path), slow_fetch, clock=FakeClock())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get('NVDA', '1mo'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(stub.calls) == 1
+    assert all(result.equals(results[0]) for result in results)
+
+
+def test_period_covering_picks_the_shortest_period_reaching_start():
+    now = pd.Timestamp('2024-06-14 12:00')
+    month = pd.Timestamp(period_start('1mo', now))
+
+    assert period_covering(month, now) == '1mo'
+    assert period_covering(month - pd.Timedelta(days=1), now) == '3mo'
+    assert period_covering(now - pd.DateOffset(years=30), now) == 'max'
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    ('2024-01-03', '2024-01-05', ['2024-01-03', '2024-01-04']),
+    ('2024-01-02 12:00', None, ['2024-01-03', '2024-01-04', '2024-01-05']),
+    (None, '2024-01-02', ['2024-01-01']),
+    ('2024-01-05', '2024-01-03', []),
+])
+def test_slice_frame_is_start_inclusive_and_end_exclusive(start, end, expected):
+    index = pd.bdate_range('2024-01-01', '2024-01-05', name='Date')
+    data = pd.DataFrame({'Close': np.arange(len(index), dtype='f8')}, index=index)
+    assert slice_frame(data, start, end).index.strftime('%Y-%m-%d').tolist() == expected
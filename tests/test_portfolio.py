@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio import AlignedPrices, portfolio_report, rolling_std
+
+
+def random_closes(index, seed):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.015, len(index)))), index=index, name='Close')
+
+
+@pytest.fixture
+def frames():
+    days = pd.bdate_range('2023-01-02', periods=300, name='Date')
+    # BENCH starts later, skips a few of ASSET's days and trades on two Saturdays
+    bench_days = days[7:].delete([20, 21, 95, 200]).union(pd.DatetimeIndex(['2023-03-04', '2023-07-15']))
+    return {'ASSET': random_closes(days, 1).to_frame(), 'BENCH': random_closes(bench_days, 2).to_frame()}
+
+
+def pandas_returns(frames):
+    closes = pd.concat({symbol: frame['Close'] for symbol, frame in frames.items()}, axis=1, sort=True).ffill()
+    start = max(frame.index[0] for frame in frames.values())
+    return closes.loc[start:].pct_change().iloc[1:]
+
+
+def test_alignment_forward_fills_mismatched_calendars(frames):
+    aligned = AlignedPrices.from_frames(frames)
+    expected = pandas_returns(frames)
+
+    assert aligned.symbols == ['ASSET', 'BENCH']
+    np.testing.assert_array_equal(aligned.dates[1:], expected.index.values.astype('datetime64[ns]').astype('i8'))
+    np.testing.assert_allclose(aligned.returns, expected.to_numpy(), rtol=1e-12)
+
+
+def test_report_matches_pandas_correlation_beta_and_rolling_volatility(frames):
+    aligned = AlignedPrices.from_frames(frames)
+    report = portfolio_report(aligned, ['ASSET', 'BENCH'], benchmark='BENCH', window=20)
+    expected = pandas_returns(frames)
+
+    np.testing.assert_allclose(report['correlation'], expected.corr().to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(report['covariance'], expected.cov().to_numpy() * 252, rtol=1e-10)
+    beta = expected['ASSET'].cov(expected['BENCH']) / expected['BENCH'].var()
+    assert report['assets']['ASSET']['beta'] == pytest.approx(beta, rel=1e-10)
+    assert report['assets']['BENCH']['beta'] == pytest.approx(1.0)
+    assert report['portfolio']['beta'] == pytest.approx((beta + 1) / 2, rel=1e-10)
+
+    rolling = expected.rolling(20).std().dropna().to_numpy()
+    np.testing.assert_allclose(rolling_std(expected.to_numpy(), 20), rolling, rtol=1e-8)
+    assert report['assets']['ASSET']['rolling_volatility'] == pytest.approx(rolling[-1, 0] * np.sqrt(252))
+
+
+@pytest.mark.parametrize('confidence, horizon', [(0.95, 1), (0.99, 10)])
+def test_historical_var_is_the_loss_quantile_of_portfolio_returns(frames, confidence, horizon):
+    aligned = AlignedPrices.from_frames(frames)
+    weights = np.array([0.7, 0.3])
+    report = portfolio_report(aligned, ['ASSET', 'BENCH'], weights=weights, confidence=confidence, horizon=horizon)
+    portfolio_returns = pandas_returns(frames).to_numpy() @ weights
+
+    expected = -np.quantile(portfolio_returns, 1 - confidence) * np.sqrt(horizon)
+    assert report['portfolio']['var']['historical'] == pytest.approx(expected, rel=1e-12)
+    assert report['portfolio']['var']['historical'] > 0
+
+
+def test_symbols_ending_before_the_others_start_are_excluded(frames):
+    frames['OLD'] = random_closes(pd.bdate_range('2020-01-01', periods=20), 3).to_frame()
+    frames['EMPTY'] = frames['OLD'].iloc[:0]
+    aligned = AlignedPrices.from_frames(frames)
+
+    assert aligned.symbols == ['ASSET', 'BENCH']
+    assert aligned.excluded == {'EMPTY': "no data", 'OLD': "history ends before the other symbols start"}
+    assert not np.isnan(aligned.prices).any()
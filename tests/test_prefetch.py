@@ -0,0 +1,77 @@
+import datetime
+
+import pytest
+
+from prefetch import MARKET_TZ, PrefetchScheduler, RequestTracker, next_run
+
+
+def at(day, hour, minute):
+    return datetime.datetime.combine(day, datetime.time(hour, minute), tzinfo=MARKET_TZ).timestamp()
+
+
+MONDAY = datetime.date(2024, 1, 8)
+FRIDAY = datetime.date(2024, 1, 12)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.parametrize('now, expected', [
+    (at(MONDAY, 8, 0), at(MONDAY, 9, 25)),
+    (at(MONDAY, 9, 27), at(MONDAY, 9, 30)),
+    (at(MONDAY, 9, 30), at(MONDAY, 9, 35)),
+    (at(MONDAY, 10, 1), at(MONDAY, 10, 5)),
+    (at(MONDAY, 15, 58), at(MONDAY, 16, 0)),
+    (at(MONDAY, 16, 0), at(MONDAY, 16, 5)),
+    (at(MONDAY, 16, 5), at(MONDAY + datetime.timedelta(days=1), 9, 25)),
+    (at(FRIDAY, 17, 0), at(MONDAY + datetime.timedelta(days=7), 9, 25)),
+])
+def test_next_run_follows_market_hours(now, expected):
+    assert next_run(now, 300) == expected
+
+
+def test_run_once_warms_hot_keys_first_and_counts_failures():
+    tracker = RequestTracker(clock=lambda: 0.0)
+    for _ in range(3):
+        tracker.record('msft', '1y')
+    warmed = []
+
+    def warm(symbol, period, interval):
+        warmed.append(symbol)
+        if symbol == 'TSLA':
+            raise RuntimeError("upstream down")
+
+    scheduler = PrefetchScheduler(warm, [('AAPL', '1mo', '1d'), ('TSLA', '1mo', '1d')], tracker=tracker,
+                                  max_concurrency=1, jitter=0)
+    result = scheduler.run_once()
+
+    assert warmed == ['MSFT', 'AAPL', 'TSLA']
+    assert (result['jobs'], result['warmed'], result['failed']) == (3, 2, 1)
+    assert scheduler.stats()['failures'] == 1
+
+
+def test_loop_steps_through_the_schedule_with_a_fake_clock():
+    clock = FakeClock(at(MONDAY, 9, 0))
+    runs = []
+
+    def warm(symbol, period, interval):
+        runs.append(clock.now)
+        if len(runs) == 3:
+            scheduler.stop()
+
+    scheduler = PrefetchScheduler(warm, [('AAPL', '1mo', '1d')], jitter=0, open_interval=300,
+                                  clock=clock, sleep=clock.sleep)
+    scheduler._loop()
+
+    assert runs == [at(MONDAY, 9, 25), at(MONDAY, 9, 30), at(MONDAY, 9, 35)]
+    assert clock.sleeps == [25 * 60, 5 * 60, 5 * 60]
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import TRADING_DAYS
+from screener import LOOKBACK, ScreenerIndex, parse_filter, parse_sort, summarize_bars
+
+
+def make_bars(n, start=100.0, growth=0.0, volume=1e6):
+    close = start * (1 + growth) ** np.arange(n)
+    index = pd.bdate_range('2022-01-03', periods=n, name='Date')
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': np.full(n, volume)}, index=index)
+
+
+@pytest.fixture
+def index():
+    index = ScreenerIndex(capacity=2)
+    index.update('up', make_bars(LOOKBACK, growth=0.002, volume=2e6))
+    index.update('FLAT', make_bars(LOOKBACK))
+    index.update('DOWN', make_bars(LOOKBACK, growth=-0.001, volume=5e5))
+    index.update('NEW', make_bars(30, growth=0.01))
+    return index
+
+
+def test_filter_compares_fields_numbers_and_scaled_fields(index):
+    result = index.query(parse_filter('return_1mo>0'), parse_sort('-return_1mo'))
+    assert result['results']['symbol'] == ['NEW', 'UP']
+    assert (result['matched'], result['screened']) == (2, 4)
+
+    result = index.query(parse_filter('close>=high_52w*0.95,volume>1e6'))
+    assert result['results']['symbol'] == ['UP']
+
+
+def test_sort_puts_nan_last_in_both_directions(index):
+    for expression in ('-return_1y', 'return_1y'):
+        symbols = index.query(sort=parse_sort(expression))['results']['symbol']
+        assert symbols[-1] == 'NEW'
+    assert index.query(sort=parse_sort('-return_1y'))['results']['symbol'][:3] == ['UP', 'FLAT', 'DOWN']
+    assert index.query(sort=parse_sort('return_1y'), limit=1)['results']['symbol'] == ['DOWN']
+
+
+def test_query_is_limited_to_the_requested_symbols(index):
+    result = index.query(sort=parse_sort('close'), symbols=['FLAT', 'UP', 'MISSING'])
+    assert result['screened'] == 2
+    assert sorted(result['results']['symbol']) == ['FLAT', 'UP']
+
+
+def test_52_week_range_needs_a_full_year():
+    assert np.isnan(summarize_bars(make_bars(TRADING_DAYS - 1))['high_52w'])
+    row = summarize_bars(make_bars(TRADING_DAYS, growth=0.001))
+    assert row['high_52w'] == pytest.approx(row['close'] * 1.01)
+
+
+def test_full_index_evicts_the_least_recently_updated_row():
+    index = ScreenerIndex(capacity=1, max_rows=2)
+    index.update('A', make_bars(30))
+    index.update('B', make_bars(30, start=50))
+    index.update('A', make_bars(30, start=70))
+    index.update('C', make_bars(30, start=10))
+
+    assert 'B' not in index and len(index) == 2
+    result = index.query(sort=parse_sort('close'))['results']
+    assert result['symbol'] == ['C', 'A']
+    np.testing.assert_allclose(result['close'], [10, 70])
+
+
+@pytest.mark.parametrize('expression', ['close>', 'price>1', 'close>volume*x', 'close~1'])
+def test_parse_filter_rejects_invalid_conditions(expression):
+    with pytest.raises(ValueError):
+        parse_filter(expression)
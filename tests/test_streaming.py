@@ -0,0 +1,69 @@
+import threading
+import time
+
+from streaming import QuoteHub, Subscription
+
+
+class FakeSource:
+    """Returns a new quote per poll and records which symbols were polled."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol):
+        with self._lock:
+            self.calls.append(symbol)
+            return {'symbol': symbol, 'price': float(len(self.calls))}
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.001)
+
+
+def test_one_poller_fans_out_to_every_subscriber():
+    source = FakeSource()
+    hub = QuoteHub(source, poll_interval=60)
+    first, second = hub.subscribe('aapl'), hub.subscribe('AAPL')
+    subscriptions = [first, second]
+    try:
+        quote = first.get(timeout=5)
+        assert quote == {'symbol': 'AAPL', 'price': 1.0}
+        assert second.get(timeout=5) == quote
+        assert hub.stats()['pollers'] == 1
+        assert source.calls == ['AAPL']
+
+        subscriptions.append(hub.subscribe('AAPL'))
+        assert subscriptions[-1].get(timeout=0) == quote
+    finally:
+        for subscription in subscriptions:
+            hub.unsubscribe(subscription)
+
+
+def test_poller_stops_after_the_last_subscriber_leaves():
+    source = FakeSource()
+    hub = QuoteHub(source, poll_interval=0.001)
+    first, second = hub.subscribe('MSFT'), hub.subscribe('MSFT')
+    wait_until(lambda: hub.stats()['published'] > 0)
+
+    hub.unsubscribe(first)
+    assert hub.stats()['symbols'] == ['MSFT']
+    hub.unsubscribe(second)
+    assert hub.stats()['pollers'] == 0
+
+    polled = len(source.calls)
+    time.sleep(0.05)
+    assert len(source.calls) <= polled + 1
+    hub.unsubscribe(second)
+
+
+def test_slow_subscriber_keeps_only_the_newest_quotes():
+    subscription = Subscription('AAPL', maxsize=2)
+    dropped = sum(subscription.put({'price': price}) for price in range(5))
+
+    assert dropped == 3
+    assert [subscription.get(timeout=0)['price'] for _ in range(2)] == [3, 4]
+    assert subscription.get(timeout=0) is None
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from upstream import CircuitBreaker, CircuitOpenError, Upstream, UpstreamBusy, UpstreamTimeout
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.001)
+
+
+def test_breaker_opens_then_lets_a_single_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.stats()['rejected'] == 3
+
+
+def test_failed_probe_reopens_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now = 20
+    assert breaker.allow()
+    assert breaker.stats()['opens'] == 2
+
+
+def test_call_past_its_deadline_raises_timeout():
+    release = threading.Event()
+    upstream = Upstream(lambda: release.wait(5), timeout=0.05, max_workers=1, max_pending=0)
+    try:
+        with pytest.raises(UpstreamTimeout):
+            upstream.call()
+        assert upstream.stats()['timeouts'] == 1
+        assert upstream.breaker.failures == 1
+    finally:
+        release.set()
+
+
+def test_hung_calls_make_the_upstream_busy_and_then_open_the_breaker():
+    hangs = [threading.Event(), threading.Event()]
+    pending = iter(hangs)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=FakeClock())
+    upstream = Upstream(lambda: next(pending).wait(5), timeout=0.05, max_workers=1, max_pending=0, breaker=breaker)
+    try:
+        with pytest.raises(UpstreamTimeout):
+            upstream.call()
+        with pytest.raises(UpstreamBusy):
+            upstream.call()
+        assert upstream.stats()['busy'] == 1
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        hangs[0].set()
+        wait_until(lambda: upstream.stats()['in_flight'] == 0)
+        with pytest.raises(UpstreamTimeout):
+            upstream.call()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert upstream.stats()['timeouts'] == 2
+        with pytest.raises(CircuitOpenError):
+            upstream.call()
+    finally:
+        for hang in hangs:
+            hang.set()
+
+
+def test_successful_call_returns_the_download_result():
+    upstream = Upstream(lambda symbol, period: (symbol, period), timeout=1)
+    assert upstream.call('AAPL', period='1mo') == ('AAPL', '1mo')
+    assert upstream.stats()['successes'] == 1
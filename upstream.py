@@ -0,0 +1,295 @@
+"""
+Non-blocking access to the upstream data provider.
+
+Every call runs on a bounded thread pool with a deadline, so a hung
+upstream request cannot pin a web worker. A circuit breaker fails fast
+after repeated errors and lets a single probe through periodically to
+detect recovery. Both a blocking and an asyncio entry point are provided.
+
+Неблокуючий доступ до зовнішнього постачальника даних.
+
+Кожен виклик виконується в обмеженому пулі потоків із крайнім терміном,
+тому завислий запит не може заблокувати веб-воркер. Запобіжник швидко
+відмовляє після повторних помилок і періодично пропускає одну пробу,
+щоб виявити відновлення. Надаються блокуючий та asyncio інтерфейси.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """
+    Base class for upstream access errors.
+
+    Базовий клас помилок доступу до зовнішнього джерела.
+    """
+
+
+class UpstreamTimeout(UpstreamError):
+    """
+    The upstream call did not finish before its deadline.
+
+    Виклик зовнішнього джерела не завершився до крайнього терміну.
+    """
+
+
+class UpstreamBusy(UpstreamError):
+    """
+    All upstream slots are taken, typically by hung calls.
+
+    Усі слоти зовнішнього джерела зайняті, зазвичай завислими викликами.
+    """
+
+
+class CircuitOpenError(UpstreamError):
+    """
+    The circuit breaker is open and the call was rejected without trying.
+
+    Запобіжник розімкнений, і виклик відхилено без спроби.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with closed, open and half-open states.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls. Once ``reset_timeout`` seconds have passed it lets one
+    probe call through (half-open); success closes it, failure opens it again.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds to wait before probing
+        clock (callable): Monotonic time source, replaceable in tests
+
+    Запобіжник зі станами closed, open та half-open.
+
+    Після ``failure_threshold`` послідовних помилок запобіжник розмикається
+    і відхиляє виклики. Через ``reset_timeout`` секунд він пропускає один
+    пробний виклик (half-open); успіх замикає його, помилка знову розмикає.
+
+    Аргументи:
+        failure_threshold (int): Кількість послідовних помилок для розмикання
+        reset_timeout (float): Секунди очікування перед пробою
+        clock (callable): Монотонне джерело часу, замінюване в тестах
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self):
+        """
+        Decide whether a call may proceed.
+
+        Вирішує, чи може виклик виконуватися.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit breaker closed after successful probe")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened after {self.failures} failures")
+                    self.opens += 1
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+    def release_probe(self):
+        """
+        Give back a probe slot that was granted but not used.
+
+        Повертає слот проби, який було надано, але не використано.
+        """
+        with self._lock:
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opens": self.opens,
+                "rejected": self.rejected
+            }
+
+
+class Upstream:
+    """
+    Guarded wrapper around a blocking download function.
+
+    Args:
+        download (callable): Blocking function, e.g. yf.download
+        timeout (float): Per-call deadline in seconds
+        max_workers (int): Threads running upstream calls
+        max_pending (int): Extra calls allowed to wait for a thread
+        breaker (CircuitBreaker): Breaker guarding the upstream
+
+    Захищена обгортка навколо блокуючої функції завантаження.
+
+    Аргументи:
+        download (callable): Блокуюча функція, напр. yf.download
+        timeout (float): Крайній термін одного виклику в секундах
+        max_workers (int): Потоки, що виконують виклики джерела
+        max_pending (int): Додаткові виклики, яким дозволено чекати потік
+        breaker (CircuitBreaker): Запобіжник, що захищає джерело
+    """
+
+    def __init__(self, download, timeout=10.0, max_workers=8, max_pending=16, breaker=None):
+        self.download = download
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upstream')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.busy = 0
+        self.in_flight = 0
+
+    def _submit(self, args, kwargs):
+        """
+        Check the breaker and a free slot, then start the call on the pool.
+
+        Перевіряє запобіжник та вільний слот, потім запускає виклик у пулі.
+        """
+        with self._lock:
+            self.calls += 1
+        if not self.breaker.allow():
+            raise CircuitOpenError("Upstream circuit breaker is open")
+        if not self._slots.acquire(blocking=False):
+            self.breaker.release_probe()
+            with self._lock:
+                self.busy += 1
+            raise UpstreamBusy("All upstream slots are busy")
+        with self._lock:
+            self.in_flight += 1
+        return self._executor.submit(self._run, args, kwargs)
+
+    def _run(self, args, kwargs):
+        try:
+            return self.download(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def _record(self, error):
+        """
+        Update counters and the breaker with the outcome of a call.
+
+        Оновлює лічильники та запобіжник за результатом виклику.
+        """
+        with self._lock:
+            if error is None:
+                self.successes += 1
+            else:
+                self.failures += 1
+                if isinstance(error, UpstreamTimeout):
+                    self.timeouts += 1
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def call(self, *args, **kwargs):
+        """
+        Call the download function with a deadline.
+
+        Raises:
+            CircuitOpenError: The breaker rejected the call
+            UpstreamBusy: No upstream slot is free
+            UpstreamTimeout: The call exceeded the deadline
+
+        Викликає функцію завантаження з крайнім терміном.
+
+        Викидає:
+            CircuitOpenError: Запобіжник відхилив виклик
+            UpstreamBusy: Немає вільного слоту джерела
+            UpstreamTimeout: Виклик перевищив крайній термін
+        """
+        future = self._submit(args, kwargs)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            error = UpstreamTimeout(f"Upstream call exceeded {self.timeout} seconds")
+            self._record(error)
+            raise error
+        except Exception as e:
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    async def acall(self, *args, **kwargs):
+        """
+        Asyncio variant of ``call``; the event loop is never blocked.
+
+        Варіант ``call`` для asyncio; цикл подій ніколи не блокується.
+        """
+        future = asyncio.wrap_future(self._submit(args, kwargs))
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error = UpstreamTimeout(f"Upstream call exceeded {self.timeout} seconds")
+            self._record(error)
+            raise error
+        except Exception as e:
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "timeout": self.timeout,
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "busy": self.busy,
+                "in_flight": self.in_flight
+            }
+        stats["breaker"] = self.breaker.stats()
+        return stats